@@ -2,6 +2,7 @@
 Authentication API routes.
 """
 
+import uuid
 from datetime import datetime, timedelta
 from typing import Dict, Any
 from fastapi import APIRouter, Depends, HTTPException, status
@@ -13,14 +14,14 @@ from app.core.database import get_db
 from app.core.security import (
     create_access_token,
     create_refresh_token,
-    verify_password,
-    get_password_hash,
     verify_token,
     create_password_reset_token,
     verify_password_reset_token
 )
-from app.core.exceptions import AuthenticationError, ConflictError, ValidationError
+from app.core.exceptions import AuthenticationError, ConflictError, RateLimitError, ValidationError
 from app.models.user import User
+from app.services.password_hasher import password_hasher
+from app.services.auth_cache import AuthState, get_auth_state, cache_auth_state, invalidate_auth_state
 from app.schemas.auth import (
     UserCreate,
     UserResponse,
@@ -54,58 +55,117 @@ async def authenticate_user(db: AsyncSession, email: str, password: str) -> User
     if not user.is_active:
         return None
 
-    if not verify_password(password, user.password_hash):
+    if not await password_hasher.verify(password, user.password_hash):
         return None
 
     return user
 
 
-# Dependency to get current user
-async def get_current_user(
+# Dependency to authenticate the request without loading the user
+async def get_authenticated_user(
     token: str = Depends(oauth2_scheme),
     db: AsyncSession = Depends(get_db)
-) -> User:
-    """Get current authenticated user"""
+) -> AuthState:
+    """
+    Authenticate the request from its access token
+
+    The user's active flag and token version come from the auth state
+    cache, so this normally runs without a database query. Use
+    ``get_current_user`` when the full user record is needed.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+    payload = verify_token(token, "access")
+    if payload is None or payload.get("sub") is None:
+        raise credentials_exception
+
     try:
-        payload = verify_token(token, "access")
+        user_id = uuid.UUID(payload["sub"])
+    except ValueError:
+        raise credentials_exception
 
-        if payload is None or payload.sub is None:
-            raise credentials_exception
+    state = await get_auth_state(db, user_id)
+    if state is None or payload.get("ver", 0) != state.token_version:
+        raise credentials_exception
+
+    if not state.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User account is inactive",
+        )
 
-        user_id = payload.sub
+    return state
 
-        # Get user from database
-        result = await db.execute(
-            select(User).where(User.id == user_id)
+
+# Dependency to get current user
+async def get_current_user(
+    auth: AuthState = Depends(get_authenticated_user),
+    db: AsyncSession = Depends(get_db)
+) -> User:
+    """Get current authenticated user"""
+    result = await db.execute(
+        select(User).where(User.id == auth.user_id)
+    )
+    user = result.scalar_one_or_none()
+
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
         )
-        user = result.scalar_one_or_none()
 
-        if user is None:
-            raise credentials_exception
+    # The cached state may predate a deactivation or revocation elsewhere
+    if not user.is_active:
+        await invalidate_auth_state(user.id)
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User account is inactive",
+        )
+    if user.token_version != auth.token_version:
+        await invalidate_auth_state(user.id)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
 
-        if not user.is_active:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="User account is inactive",
-            )
+    return user
 
-        return user
 
-    except Exception:
-        raise credentials_exception
+def create_user_tokens(user: User) -> Token:
+    """Issue an access and refresh token pair for the user's current token version"""
+    claims = {"sub": str(user.id), "ver": user.token_version}
+
+    # Create access token
+    access_token_expires = timedelta(minutes=30)
+    access_token = create_access_token(
+        data=claims, expires_delta=access_token_expires
+    )
+
+    # Create refresh token
+    refresh_token_expires = timedelta(days=7)
+    refresh_token = create_refresh_token(
+        data=claims, expires_delta=refresh_token_expires
+    )
+
+    return Token(
+        access_token=access_token,
+        refresh_token=refresh_token,
+        token_type="bearer",
+        expires_in=1800  # 30 minutes
+    )
 
 
 @router.post("/register", response_model=UserResponse, status_code=201)
 async def register(
     user_data: UserCreate,
     db: AsyncSession = Depends(get_db)
-) -> UserResponse:
+) -> User:
     """Register a new user"""
     try:
         # Check if user already exists
@@ -120,7 +180,7 @@ async def register(
             )
 
         # Create new user
-        hashed_password = get_password_hash(user_data.password)
+        hashed_password = await password_hasher.hash(user_data.password)
         user = User(
             email=user_data.email,
             password_hash=hashed_password,
@@ -134,9 +194,10 @@ async def register(
         await db.commit()
         await db.refresh(user)
 
-        return UserResponse.from_current_user(user)
+        # Validated once into UserResponse by the response model
+        return user
 
-    except ConflictError:
+    except (ConflictError, RateLimitError):
         raise
     except Exception as e:
         raise ValidationError(
@@ -159,31 +220,16 @@ async def login(
                 "Invalid email or password"
             )
 
-        # Create access token
-        access_token_expires = timedelta(minutes=30)
-        access_token = create_access_token(
-            data={"sub": str(user.id)}, expires_delta=access_token_expires
-        )
-
-        # Create refresh token
-        refresh_token_expires = timedelta(days=7)
-        refresh_token = create_refresh_token(
-            data={"sub": str(user.id)}, expires_delta=refresh_token_expires
-        )
-
         # Update last login time
         user.last_login = datetime.utcnow()
         db.add(user)
         await db.commit()
 
-        return Token(
-            access_token=access_token,
-            refresh_token=refresh_token,
-            token_type="bearer",
-            expires_in=1800  # 30 minutes
-        )
+        await cache_auth_state(user)
 
-    except AuthenticationError:
+        return create_user_tokens(user)
+
+    except (AuthenticationError, RateLimitError):
         raise
     except Exception as e:
         raise ValidationError(
@@ -214,7 +260,7 @@ async def refresh_token(
 
         # Get user
         result = await db.execute(
-            select(User).where(User.id == user_id)
+            select(User).where(User.id == uuid.UUID(user_id))
         )
         user = result.scalar_one_or_none()
 
@@ -223,24 +269,13 @@ async def refresh_token(
                 "User not found or inactive"
             )
 
-        # Create new access token
-        access_token_expires = timedelta(minutes=30)
-        access_token = create_access_token(
-            data={"sub": str(user.id)}, expires_delta=access_token_expires
-        )
-
-        # Create new refresh token
-        refresh_token_expires = timedelta(days=7)
-        new_refresh_token = create_refresh_token(
-            data={"sub": str(user.id)}, expires_delta=refresh_token_expires
-        )
+        # Tokens issued before a logout or password change are revoked
+        if payload.get("ver", 0) != user.token_version:
+            raise AuthenticationError(
+                "Refresh token has been revoked"
+            )
 
-        return Token(
-            access_token=access_token,
-            refresh_token=new_refresh_token,
-            token_type="bearer",
-            expires_in=1800  # 30 minutes
-        )
+        return create_user_tokens(user)
 
     except AuthenticationError:
         raise
@@ -257,10 +292,12 @@ async def logout(
 ) -> Dict[str, Any]:
     """User logout"""
     try:
-        # Clear refresh token from database
+        # Clear refresh token and revoke issued tokens
         current_user.refresh_token = None
+        current_user.token_version += 1
         db.add(current_user)
         await db.commit()
+        await invalidate_auth_state(current_user.id)
 
         return {"message": "Successfully logged out"}
 
@@ -279,19 +316,21 @@ async def change_password(
     """Change user password"""
     try:
         # Verify current password
-        if not verify_password(password_data.current_password, current_user.password_hash):
+        if not await password_hasher.verify(password_data.current_password, current_user.password_hash):
             raise AuthenticationError(
                 "Current password is incorrect"
             )
 
         # Update password
-        current_user.password_hash = get_password_hash(password_data.new_password)
+        current_user.password_hash = await password_hasher.hash(password_data.new_password)
+        current_user.token_version += 1
         db.add(current_user)
         await db.commit()
+        await invalidate_auth_state(current_user.id)
 
         return {"message": "Password changed successfully"}
 
-    except AuthenticationError:
+    except (AuthenticationError, RateLimitError):
         raise
     except Exception as e:
         raise ValidationError(
@@ -366,15 +405,17 @@ async def reset_password(
             )
 
         # Update password
-        user.password_hash = get_password_hash(reset_data.new_password)
+        user.password_hash = await password_hasher.hash(reset_data.new_password)
         user.password_reset_token = None
         user.password_reset_expires = None
+        user.token_version += 1
         db.add(user)
         await db.commit()
+        await invalidate_auth_state(user.id)
 
         return {"message": "Password reset successfully"}
 
-    except AuthenticationError:
+    except (AuthenticationError, RateLimitError):
         raise
     except Exception as e:
         raise ValidationError(
@@ -385,8 +426,8 @@ async def reset_password(
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_info(
     current_user: User = Depends(get_current_user)
-) -> UserResponse:
+) -> User:
     """Get current user information"""
-    return UserResponse.from_current_user(current_user)
+    return current_user
 
 
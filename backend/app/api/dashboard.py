@@ -2,25 +2,118 @@
 Dashboard API routes.
 """
 
-from fastapi import APIRouter
-from typing import Dict, Any
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from typing import AsyncIterator, List, Optional
+
+from app.api.auth import get_authenticated_user
+from app.api.profiles import get_user_profile
+from app.core.database import get_read_db, read_session
+from app.core.exceptions import ValidationError
+from app.core.responses import FastJSONResponse, dumps
+from app.services.auth_cache import AuthState
+from app.services.dashboard import get_dashboard_summary
+from app.services.lab_series import load_lab_series
+from app.services.timeline import SOURCES, EventKey, decode_cursor, encode_cursor, iter_timeline
 
 router = APIRouter()
 
 
 @router.get("/")
-async def get_dashboard_data() -> Dict[str, Any]:
+async def get_dashboard_data(
+    profile_id: str = Query(...),
+    current_user: AuthState = Depends(get_authenticated_user),
+    db: AsyncSession = Depends(get_read_db)
+) -> FastJSONResponse:
     """Get dashboard data"""
-    return {"message": "Get dashboard data endpoint - TODO: Implement"}
+    profile = await get_user_profile(db, current_user.user_id, profile_id)
+    return FastJSONResponse(await get_dashboard_summary(db, profile.id))
 
 
 @router.get("/metrics")
-async def get_health_metrics() -> Dict[str, Any]:
-    """Get health metrics"""
-    return {"message": "Get health metrics endpoint - TODO: Implement"}
+async def get_health_metrics(
+    profile_id: str = Query(...),
+    start: Optional[datetime] = Query(None),
+    end: Optional[datetime] = Query(None),
+    analytes: Optional[List[str]] = Query(None),
+    window: int = Query(5, ge=1, le=100),
+    points: bool = Query(False),
+    current_user: AuthState = Depends(get_authenticated_user),
+    db: AsyncSession = Depends(get_read_db)
+) -> FastJSONResponse:
+    """
+    Get health metrics
+
+    Besides the lab and medication summaries, ``lab_trends`` holds trend
+    statistics per lab series between ``start`` and ``end``. With
+    ``points`` the series' results and rolling means (over ``window``
+    results) are included, typically together with an ``analytes`` filter.
+    """
+    profile = await get_user_profile(db, current_user.user_id, profile_id)
+    summary = await get_dashboard_summary(db, profile.id, sections=["lab_results", "medications"])
+    series = await load_lab_series(db, profile.id)
+
+    return FastJSONResponse({
+        **summary,
+        "lab_trends": series.trends(start, end, analytes, window, include_points=points),
+    })
+
+
+async def _stream_timeline(
+    profile_id,
+    cursor: Optional[EventKey],
+    event_types: Optional[List[str]],
+    limit: int
+) -> AsyncIterator[bytes]:
+    """Stream timeline events as NDJSON, ending with the next page cursor"""
+    # The request's session is closed before a streamed body is sent
+    async with read_session() as db:
+        events = iter_timeline(db, profile_id, cursor, event_types)
+        try:
+            sent, last_key, has_more = 0, None, False
+            async for key, event in events:
+                if sent == limit:
+                    has_more = True
+                    break
+                yield dumps(event) + b"\n"
+                sent, last_key = sent + 1, key
+        finally:
+            await events.aclose()
+
+    next_cursor = encode_cursor(last_key) if has_more else None
+    yield dumps({"type": "page", "count": sent, "next_cursor": next_cursor}) + b"\n"
 
 
 @router.get("/timeline")
-async def get_medical_timeline() -> Dict[str, Any]:
-    """Get medical timeline"""
-    return {"message": "Get medical timeline endpoint - TODO: Implement"}
\ No newline at end of file
+async def get_medical_timeline(
+    profile_id: str = Query(...),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(500, ge=1, le=10000),
+    types: Optional[List[str]] = Query(None),
+    current_user: AuthState = Depends(get_authenticated_user),
+    db: AsyncSession = Depends(get_read_db)
+) -> StreamingResponse:
+    """
+    Get medical timeline
+
+    Events are streamed newest first as NDJSON. The last line is a
+    ``{"type": "page"}`` record whose ``next_cursor`` continues the
+    timeline, or is null at the end.
+    """
+    profile = await get_user_profile(db, current_user.user_id, profile_id)
+
+    if types:
+        unknown = set(types) - set(SOURCES)
+        if unknown:
+            raise ValidationError(
+                f"Unknown timeline event types: {', '.join(sorted(unknown))}",
+                details={"allowed_types": list(SOURCES)}
+            )
+    position = decode_cursor(cursor) if cursor else None
+
+    return StreamingResponse(
+        _stream_timeline(profile.id, position, types, limit),
+        media_type="application/x-ndjson"
+    )
@@ -2,22 +2,198 @@
 Document management API routes.
 """
 
-from fastapi import APIRouter
-from typing import Dict, Any
+import logging
+import uuid
+from datetime import datetime, timezone
+from fastapi import APIRouter, Depends, Query, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from typing import Dict, Any, Optional
+
+from app.api.auth import get_authenticated_user
+from app.api.profiles import get_user_profile
+from app.core.database import get_db, get_read_db
+from app.core.exceptions import NotFoundError
+from app.models.document import Document
+from app.services.auth_cache import AuthState
+from app.services.dashboard import invalidate_dashboard
+from app.services.search import index_document, search_documents
+from app.services.blobs import acquire_blob, release_blob, find_processed_duplicate
+from app.services.storage import remove_object
+from app.services.uploads import receive_upload
+from app.services.vector_index import semantic_search
+from app.tasks.ai_processing import embed_document
+from app.tasks.ocr import process_document_ocr
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
+async def get_user_document(db: AsyncSession, user_id: uuid.UUID, document_id: str) -> Document:
+    """Get a document owned by the user"""
+    try:
+        document_uuid = uuid.UUID(document_id)
+    except ValueError:
+        raise NotFoundError("Document not found")
+
+    result = await db.execute(
+        select(Document).where(Document.id == document_uuid, Document.user_id == user_id)
+    )
+    document = result.scalar_one_or_none()
+    if document is None:
+        raise NotFoundError("Document not found")
+
+    return document
+
+
 @router.get("/")
 async def get_documents() -> Dict[str, Any]:
     """Get all documents"""
     return {"message": "Get documents endpoint - TODO: Implement"}
 
 
-@router.post("/upload")
-async def upload_document() -> Dict[str, Any]:
-    """Upload a new document"""
-    return {"message": "Upload document endpoint - TODO: Implement"}
+@router.post("/upload", status_code=status.HTTP_201_CREATED)
+async def upload_document(
+    request: Request,
+    current_user: AuthState = Depends(get_authenticated_user),
+    db: AsyncSession = Depends(get_db)
+) -> Dict[str, Any]:
+    """
+    Upload a new document
+
+    Expects a multipart/form-data body with a single ``file`` part and the
+    optional fields ``title``, ``document_type``, ``profile_id``,
+    ``institution`` and ``notes``. The file is streamed to object storage as
+    it arrives and is never buffered in memory as a whole.
+    """
+    document_id = uuid.uuid4()
+    upload = await receive_upload(
+        request,
+        lambda file_type: f"{current_user.user_id}/{document_id}.{file_type}"
+    )
+
+    try:
+        object_name = await acquire_blob(db, upload)
+    except Exception:
+        await db.rollback()
+        await remove_object(upload.object_name)
+        raise
+
+    fields = upload.fields
+    try:
+        profile_id = None
+        if fields.get("profile_id"):
+            profile = await get_user_profile(db, current_user.user_id, fields["profile_id"])
+            profile_id = profile.id
+
+        # Identical content the user already had processed needs no OCR
+        duplicate = await find_processed_duplicate(db, current_user.user_id, upload.content_hash)
+
+        document = Document(
+            id=document_id,
+            user_id=current_user.user_id,
+            profile_id=profile_id,
+            title=fields.get("title") or upload.filename,
+            document_type=fields.get("document_type") or "other",
+            filename=upload.filename,
+            file_size=upload.size,
+            file_path=object_name,
+            mime_type=upload.mime_type,
+            content_hash=upload.content_hash,
+            institution=fields.get("institution"),
+            notes=fields.get("notes"),
+            status="completed" if duplicate else "queued",
+            claimed_at=None if duplicate else datetime.now(timezone.utc),
+            ocr_text=duplicate.ocr_text if duplicate else None,
+            extraction_metadata=duplicate.extraction_metadata if duplicate else None,
+        )
+        db.add(document)
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        await release_blob(db, upload.content_hash)
+        raise
+
+    await index_document(db, document.id)
+    await invalidate_dashboard(document.profile_id, "documents")
+
+    if duplicate is None:
+        try:
+            process_document_ocr.delay(str(document.id))
+        except Exception as e:
+            # Leave it to the periodic dispatcher to pick up
+            logger.warning(f"Failed to enqueue OCR for document {document.id}: {e}")
+            document.status = "pending"
+            await db.commit()
+    else:
+        try:
+            embed_document.delay(str(document.id))
+        except Exception as e:
+            logger.warning(f"Failed to enqueue embedding for document {document.id}: {e}")
+
+    return {
+        "id": str(document.id),
+        "title": document.title,
+        "document_type": document.document_type,
+        "filename": document.filename,
+        "file_size": document.file_size,
+        "mime_type": document.mime_type,
+        "content_hash": document.content_hash,
+        "status": document.status,
+        "deduplicated": duplicate is not None,
+    }
+
+
+@router.get("/search")
+async def search(
+    q: str = Query(..., min_length=1, max_length=500),
+    profile_id: Optional[uuid.UUID] = None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    current_user: AuthState = Depends(get_authenticated_user),
+    db: AsyncSession = Depends(get_read_db)
+) -> Dict[str, Any]:
+    """
+    Search the user's documents by title and OCR text
+
+    ``q`` accepts web search syntax (quoted phrases, ``or``, ``-word``).
+    Results are ranked by relevance and carry a highlighted snippet. When
+    nothing matches, misspelt words are corrected against the terms of the
+    user's documents and ``corrected_query`` reports the query used.
+    """
+    return await search_documents(
+        db,
+        current_user.user_id,
+        q,
+        profile_id=profile_id,
+        limit=limit,
+        offset=offset
+    )
+
+
+@router.get("/semantic-search")
+async def semantic_search_documents(
+    q: str = Query(..., min_length=1, max_length=1000),
+    profile_id: Optional[uuid.UUID] = None,
+    limit: int = Query(10, ge=1, le=50),
+    current_user: AuthState = Depends(get_authenticated_user),
+    db: AsyncSession = Depends(get_read_db)
+) -> Dict[str, Any]:
+    """
+    Find documents about a topic by embedding similarity
+
+    Each result is a document with its most similar chunk of OCR text.
+    Documents are embedded in the background after OCR, so new uploads
+    appear once that has run.
+    """
+    return await semantic_search(
+        db,
+        current_user.user_id,
+        q,
+        profile_id=profile_id,
+        limit=limit
+    )
 
 
 @router.get("/{document_id}")
@@ -27,6 +203,24 @@ async def get_document(document_id: str) -> Dict[str, Any]:
 
 
 @router.delete("/{document_id}")
-async def delete_document(document_id: str) -> Dict[str, Any]:
+async def delete_document(
+    document_id: str,
+    current_user: AuthState = Depends(get_authenticated_user),
+    db: AsyncSession = Depends(get_db)
+) -> Dict[str, Any]:
     """Delete a document"""
-    return {"message": f"Delete document {document_id} endpoint - TODO: Implement"}
\ No newline at end of file
+    document = await get_user_document(db, current_user.user_id, document_id)
+    content_hash, file_path = document.content_hash, document.file_path
+    profile_id = document.profile_id
+
+    await db.delete(document)
+    await db.commit()
+    await invalidate_dashboard(profile_id, "documents")
+
+    # Stored content is shared between duplicates and reference counted
+    if content_hash:
+        await release_blob(db, content_hash)
+    elif file_path:
+        await remove_object(file_path)
+
+    return {"message": "Document deleted successfully"}
\ No newline at end of file
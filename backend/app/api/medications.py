@@ -2,22 +2,136 @@
 Medication management API routes.
 """
 
-from fastapi import APIRouter
-from typing import Dict, Any
+import logging
+from fastapi import APIRouter, Depends, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, Any, List, Optional
+
+from app.api.auth import get_authenticated_user
+from app.api.profiles import get_user_profile
+from app.core.database import get_db, get_read_db
+from app.core.exceptions import ValidationError
+from app.models.medication import Medication
+from app.schemas.base import dump_list_json
+from app.schemas.medication import (
+    DrugInteraction,
+    MedicationCreate,
+    MedicationCreateResponse,
+    MedicationImportResult,
+    MedicationResponse,
+)
+from app.services.auth_cache import AuthState
+from app.services.dashboard import invalidate_dashboard
+from app.services.interactions import check_interactions
+from app.services.medication_import import detect_format, import_medications, profile_visit_ids
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
-@router.get("/")
-async def get_medications() -> Dict[str, Any]:
-    """Get all medications"""
-    return {"message": "Get medications endpoint - TODO: Implement"}
+@router.get("/", response_model=List[MedicationResponse])
+async def get_medications(
+    profile_id: str = Query(...),
+    active: Optional[bool] = None,
+    current_user: AuthState = Depends(get_authenticated_user),
+    db: AsyncSession = Depends(get_read_db)
+) -> Response:
+    """
+    Get a profile's medications
+
+    Active medications come first, then by name. The list is validated and
+    serialised in one pass by ``dump_list_json``.
+    """
+    profile = await get_user_profile(db, current_user.user_id, profile_id)
+
+    query = select(Medication).where(Medication.profile_id == profile.id)
+    if active is not None:
+        query = query.where(Medication.is_active.is_(active))
+    medications = await db.scalars(
+        query.order_by(Medication.is_active.desc(), Medication.name, Medication.id)
+    )
+    return Response(
+        content=dump_list_json(MedicationResponse, medications),
+        media_type="application/json",
+    )
+
+
+@router.post("/", response_model=MedicationCreateResponse, status_code=status.HTTP_201_CREATED)
+async def create_medication(
+    medication_data: MedicationCreate,
+    current_user: AuthState = Depends(get_authenticated_user),
+    db: AsyncSession = Depends(get_db)
+) -> MedicationCreateResponse:
+    """
+    Add a new medication
+
+    The response lists the new medication's interactions with the profile's
+    active medications, checked against the local interaction index. An
+    inactive medication is not checked.
+    """
+    profile = await get_user_profile(db, current_user.user_id, medication_data.profile_id)
+    visit_id = medication_data.visit_id
+    if visit_id and not await profile_visit_ids(db, profile.id, [visit_id]):
+        raise ValidationError("Visit not found in this profile", details={"visit_id": str(visit_id)})
+
+    medication = Medication(**medication_data.model_dump())
+    db.add(medication)
+    await db.commit()
+    await db.refresh(medication)
+
+    await invalidate_dashboard(profile.id, "medications")
+
+    response = MedicationCreateResponse.model_validate(medication)
+    if not medication.is_active:
+        # Past medications are not taken together with the current ones
+        return response
+
+    active = (await db.scalars(
+        select(Medication.name).where(
+            Medication.profile_id == profile.id,
+            Medication.is_active.is_(True),
+            Medication.id != medication.id,
+        )
+    )).all()
+    try:
+        # CPU-bound, and loads the index on first use if warming it at startup failed
+        found = await run_in_threadpool(check_interactions, [medication.name, *active])
+        response.interactions = [
+            DrugInteraction.model_validate(interaction)
+            for interaction in found
+            if medication.name in (interaction.medication_a, interaction.medication_b)
+        ]
+    except Exception as e:
+        # The medication is saved; a broken index must not fail the request
+        logger.error(f"Drug interaction check failed for profile {profile.id}: {e}")
+    return response
+
+
+@router.post("/import", response_model=MedicationImportResult)
+async def import_medication_records(
+    request: Request,
+    profile_id: str = Query(...),
+    current_user: AuthState = Depends(get_authenticated_user),
+    db: AsyncSession = Depends(get_db)
+) -> Dict[str, Any]:
+    """
+    Import medications in bulk
+
+    The body is NDJSON (``application/x-ndjson``, one object per line) or
+    CSV (``text/csv``, with a header row) of medication fields. Valid rows
+    are saved together; invalid rows are reported by row number.
+    """
+    import_format = detect_format(request.headers.get("content-type"))
+    profile = await get_user_profile(db, current_user.user_id, profile_id)
 
+    result = await import_medications(db, profile.id, request.stream(), import_format)
 
-@router.post("/")
-async def create_medication() -> Dict[str, Any]:
-    """Add a new medication"""
-    return {"message": "Create medication endpoint - TODO: Implement"}
+    if result["inserted"]:
+        await invalidate_dashboard(profile.id, "medications")
+    return result
 
 
 @router.get("/{medication_id}")
@@ -29,4 +143,4 @@ async def get_medication(medication_id: str) -> Dict[str, Any]:
 @router.put("/{medication_id}")
 async def update_medication(medication_id: str) -> Dict[str, Any]:
     """Update a medication"""
-    return {"message": f"Update medication {medication_id} endpoint - TODO: Implement"}
\ No newline at end of file
+    return {"message": f"Update medication {medication_id} endpoint - TODO: Implement"}
@@ -2,12 +2,35 @@
 Profile management API routes.
 """
 
+import uuid
 from fastapi import APIRouter
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 from typing import Dict, Any
 
+from app.core.exceptions import NotFoundError
+from app.models.profile import Profile
+
 router = APIRouter()
 
 
+async def get_user_profile(db: AsyncSession, user_id: uuid.UUID, profile_id: str) -> Profile:
+    """Get a profile owned by the user"""
+    try:
+        profile_uuid = uuid.UUID(str(profile_id))
+    except ValueError:
+        raise NotFoundError("Profile not found")
+
+    result = await db.execute(
+        select(Profile).where(Profile.id == profile_uuid, Profile.user_id == user_id)
+    )
+    profile = result.scalar_one_or_none()
+    if profile is None:
+        raise NotFoundError("Profile not found")
+
+    return profile
+
+
 @router.get("/")
 async def get_profiles() -> Dict[str, Any]:
     """Get all profiles for the current user"""
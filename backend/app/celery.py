@@ -3,6 +3,7 @@ Celery configuration for background tasks.
 """
 
 from celery import Celery
+from celery.schedules import crontab
 from app.core.config import settings
 
 # Create Celery instance
@@ -53,4 +54,8 @@ celery_app.conf.beat_schedule = {
         'task': 'app.tasks.ocr.process_pending_documents',
         'schedule': 60.0,  # Run every minute
     },
+    'analyze-profiles': {
+        'task': 'app.tasks.ai_processing.analyze_all_profiles',
+        'schedule': crontab(hour=3, minute=0),  # Nightly; unchanged profiles are skipped
+    },
 }
\ No newline at end of file
@@ -0,0 +1,22 @@
+"""
+Redis clients shared across the application.
+"""
+
+from functools import lru_cache
+
+import redis
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+
+
+@lru_cache()
+def get_redis() -> aioredis.Redis:
+    """Get the shared asyncio Redis client (API handlers)"""
+    return aioredis.Redis.from_url(settings.REDIS_URL)
+
+
+@lru_cache()
+def get_sync_redis() -> redis.Redis:
+    """Get the shared synchronous Redis client (Celery workers, threads)"""
+    return redis.Redis.from_url(settings.REDIS_URL)
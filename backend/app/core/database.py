@@ -1,26 +1,158 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+import asyncio
+import itertools
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlalchemy.sql import Select
+from sqlalchemy import create_engine, exc
 from app.core.config import settings
 
-# Create async engine
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    future=True,
-    pool_pre_ping=True,
-    pool_recycle=300,
-)
+logger = logging.getLogger(__name__)
+
+
+class PoolMetrics:
+    """Checkout counters of one connection pool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.waiting = 0
+        self.wait_seconds_total = 0.0
+        self.max_wait_seconds = 0.0
+
+    def checkout_started(self) -> None:
+        with self._lock:
+            self.waiting += 1
+
+    def checkout_finished(self, wait: float, timed_out: bool) -> None:
+        with self._lock:
+            self.waiting -= 1
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.wait_seconds_total += wait
+            self.max_wait_seconds = max(self.max_wait_seconds, wait)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "waiting": self.waiting,
+                "wait_seconds_total": self.wait_seconds_total,
+                "avg_wait_seconds": self.wait_seconds_total / self.checkouts if self.checkouts else 0.0,
+                "max_wait_seconds": self.max_wait_seconds,
+            }
+
+
+class _InstrumentedPool:
+    """Times every checkout, including the wait for a free connection"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        self.metrics.checkout_started()
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            self.metrics.checkout_finished(time.perf_counter() - started, timed_out)
+
 
-# Create async session factory
+class InstrumentedAsyncPool(_InstrumentedPool, AsyncAdaptedQueuePool):
+    pass
+
+
+class InstrumentedQueuePool(_InstrumentedPool, QueuePool):
+    pass
+
+
+def _pool_options() -> Dict[str, Any]:
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+
+
+def _create_async_engine(url: str) -> AsyncEngine:
+    return create_async_engine(
+        url,
+        echo=settings.DEBUG,
+        future=True,
+        poolclass=InstrumentedAsyncPool,
+        # Idle connections are validated by PoolHealthMonitor instead of on every checkout
+        pool_pre_ping=False,
+        **_pool_options(),
+    )
+
+
+# Create async engine (primary) and read replica engines
+engine = _create_async_engine(settings.DATABASE_URL)
+replica_engines = [_create_async_engine(url) for url in settings.DATABASE_REPLICA_URLS]
+_replica_cycle = itertools.cycle(replica_engines)
+
+
+class RoutingSession(Session):
+    """Sends plain reads to the session's replica, if it has one, and everything else to the primary"""
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        replica: Optional[AsyncEngine] = self.info.get("replica")
+        if (
+            replica is not None
+            and not self._flushing
+            and isinstance(clause, Select)
+            and clause._for_update_arg is None
+        ):
+            return replica.sync_engine
+        return super().get_bind(mapper, clause=clause, **kw)
+
+
+# Create async session factories
 AsyncSessionLocal = sessionmaker(
     engine, class_=AsyncSession, expire_on_commit=False
 )
 
+ReadSessionLocal = sessionmaker(
+    engine, class_=AsyncSession, sync_session_class=RoutingSession, expire_on_commit=False
+)
+
+# Create sync engine and session factory for Celery workers
+sync_engine = create_engine(
+    settings.DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://"),
+    future=True,
+    poolclass=InstrumentedQueuePool,
+    pool_pre_ping=True,
+    **_pool_options(),
+)
+
+SyncSessionLocal = sessionmaker(sync_engine, expire_on_commit=False)
+
 # Create base for models
 Base = declarative_base()
 
+
+def read_session() -> AsyncSession:
+    """Open a session whose reads go to the next replica (the primary without replicas)"""
+    replica = next(_replica_cycle) if replica_engines else None
+    return ReadSessionLocal(info={"replica": replica})
+
+
 # Dependency to get database session
 async def get_db() -> AsyncSession:
     async with AsyncSessionLocal() as session:
@@ -29,6 +161,133 @@ async def get_db() -> AsyncSession:
         finally:
             await session.close()
 
+
+# Dependency for read-only handlers, which may be served by a replica
+async def get_read_db() -> AsyncSession:
+    async with read_session() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+class PoolHealthMonitor:
+    """
+    Periodically validates an engine's idle pooled connections.
+
+    Each idle connection is checked out in turn, pinged and returned; a
+    connection that fails the ping is invalidated by SQLAlchemy's disconnect
+    handling and so evicted from the pool. Request checkouts therefore need
+    no pre-ping round trip.
+    """
+
+    def __init__(self, engine: AsyncEngine, interval: float):
+        self.engine = engine
+        self.interval = interval
+        self.healthy = True
+        self.last_check_at: Optional[float] = None
+        self.last_check_seconds = 0.0
+        self.last_error: Optional[str] = None
+        self.checked_total = 0
+        self.evicted_total = 0
+        self._task: Optional[asyncio.Task] = None
+
+    async def check(self) -> None:
+        """Ping every connection that is idle in the pool"""
+        started = time.perf_counter()
+        healthy, error = True, None
+
+        # The pool hands out idle connections first-in first-out, so
+        # successive checkouts visit each of them once
+        for _ in range(self.engine.pool.checkedin()):
+            try:
+                async with self.engine.connect() as conn:
+                    await conn.exec_driver_sql("SELECT 1")
+                self.checked_total += 1
+            except exc.DBAPIError as e:
+                if e.connection_invalidated:
+                    self.evicted_total += 1
+                    continue
+                healthy, error = False, str(e)
+                break
+            except Exception as e:
+                healthy, error = False, str(e)
+                break
+
+        self.healthy, self.last_error = healthy, error
+        self.last_check_at = time.time()
+        self.last_check_seconds = time.perf_counter() - started
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.check()
+            except Exception as e:
+                logger.warning(f"Connection pool health check failed: {e}")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "healthy": self.healthy,
+            "last_check_at": self.last_check_at,
+            "last_check_seconds": self.last_check_seconds,
+            "last_error": self.last_error,
+            "checked_total": self.checked_total,
+            "evicted_total": self.evicted_total,
+        }
+
+
+pool_monitors: Dict[str, PoolHealthMonitor] = {
+    name: PoolHealthMonitor(async_engine, settings.DB_HEALTH_CHECK_INTERVAL)
+    for name, async_engine in (
+        ("primary", engine),
+        *((f"replica_{index}", replica) for index, replica in enumerate(replica_engines)),
+    )
+}
+
+
+def _pool_status(pool) -> Dict[str, Any]:
+    status = {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+    }
+    metrics = getattr(pool, "metrics", None)
+    if metrics is not None:
+        status.update(metrics.snapshot())
+    return status
+
+
+def pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Connection pool status and checkout metrics of this process's engines"""
+    stats = {"primary": _pool_status(engine.pool)}
+    for index, replica in enumerate(replica_engines):
+        stats[f"replica_{index}"] = _pool_status(replica.pool)
+    return stats
+
+
+def pool_health() -> Dict[str, Dict[str, Any]]:
+    """Pool status together with the latest health check of each engine"""
+    stats = pool_stats()
+    for name, monitor in pool_monitors.items():
+        stats[name]["health"] = monitor.status()
+    return stats
+
+
 # Initialize database
 async def init_db():
     """Initialize database tables"""
@@ -36,10 +295,20 @@ async def init_db():
         # Import all models to ensure they're registered
         from app.models import user, profile, medical_visit, document, medication, lab_result
 
+        # Trigram indexes need pg_trgm
+        await conn.exec_driver_sql("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
         # Create all tables
         await conn.run_sync(Base.metadata.create_all)
 
+    for monitor in pool_monitors.values():
+        monitor.start()
+
 # Close database connection
 async def close_db():
     """Close database connection"""
-    await engine.dispose()
\ No newline at end of file
+    for monitor in pool_monitors.values():
+        await monitor.stop()
+    await engine.dispose()
+    for replica in replica_engines:
+        await replica.dispose()
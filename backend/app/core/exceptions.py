@@ -91,6 +91,18 @@ class StorageError(PHMException):
         )
 
 
+class FileTooLargeError(PHMException):
+    """Uploaded file exceeds the size limit"""
+
+    def __init__(self, message: str = "File too large", details: Optional[Dict[str, Any]] = None):
+        super().__init__(
+            message=message,
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            error_code="FILE_TOO_LARGE",
+            details=details
+        )
+
+
 class OCRError(PHMException):
     """OCR processing related errors"""
 
@@ -0,0 +1,183 @@
+"""
+Prometheus metrics.
+
+Request metrics are recorded by ``MetricsMiddleware``, a plain ASGI
+middleware timed with a monotonic clock. Requests are labelled by route
+template (``/api/v1/documents/{document_id}``) rather than raw path, so the
+number of series stays bounded. Runtime gauges (database pools, password
+hashing pool, Celery queue depths) are refreshed when ``/metrics`` is
+scraped. Monotonic totals kept by the pools (checkouts, timeouts, wait
+time, rejected hashes) are exposed as counters by ``RuntimeCounters``, so
+``rate()`` and ``increase()`` handle process restarts.
+"""
+
+import logging
+import time
+
+import redis
+from prometheus_client import REGISTRY, Gauge, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.cache import get_redis
+from app.core.database import pool_stats
+from app.services.password_hasher import password_hasher
+
+logger = logging.getLogger(__name__)
+
+CELERY_QUEUES = ("ocr", "reports", "notifications", "ai")
+# Kombu's Redis transport keeps non-default priorities in suffixed lists
+CELERY_PRIORITY_SUFFIXES = ("", "\x06\x163", "\x06\x166", "\x06\x169")
+
+# Label for requests that matched no route, e.g. 404s for arbitrary paths
+UNMATCHED_ROUTE = "<unmatched>"
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency until the response headers are sent",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being handled",
+    ["method"],
+)
+
+DB_POOL_CONNECTIONS = Gauge(
+    "db_pool_connections",
+    "Database pool connections by state",
+    ["pool", "state"],
+)
+DB_POOL_WAITING = Gauge(
+    "db_pool_waiting_checkouts",
+    "Checkouts waiting for a free database connection",
+    ["pool"],
+)
+
+PASSWORD_HASH_IN_FLIGHT = Gauge(
+    "password_hash_in_flight",
+    "Password hashes running or queued",
+)
+
+CELERY_QUEUE_LENGTH = Gauge(
+    "celery_queue_length",
+    "Messages waiting in a Celery queue",
+    ["queue"],
+)
+
+
+class RuntimeCounters:
+    """Collector reading the pools' monotonic totals at scrape time"""
+
+    @staticmethod
+    def _families():
+        return (
+            CounterMetricFamily(
+                "db_pool_checkouts",
+                "Database connection checkouts since the pool was created",
+                labels=["pool"],
+            ),
+            CounterMetricFamily(
+                "db_pool_checkout_timeouts",
+                "Checkouts that timed out waiting for a connection",
+                labels=["pool"],
+            ),
+            CounterMetricFamily(
+                "db_pool_checkout_wait_seconds",
+                "Total time spent waiting for database connections",
+                labels=["pool"],
+            ),
+            CounterMetricFamily(
+                "password_hash_rejected",
+                "Password hashes rejected because the queue was full",
+            ),
+        )
+
+    def describe(self):
+        return self._families()
+
+    def collect(self):
+        checkouts, timeouts, wait_seconds, rejected = self._families()
+        for name, stats in pool_stats().items():
+            checkouts.add_metric([name], stats["checkouts"])
+            timeouts.add_metric([name], stats["timeouts"])
+            wait_seconds.add_metric([name], stats["wait_seconds_total"])
+        rejected.add_metric([], password_hasher.stats()["rejected"])
+        return (checkouts, timeouts, wait_seconds, rejected)
+
+
+REGISTRY.register(RuntimeCounters())
+
+
+class MetricsMiddleware:
+    """Record request latency and in-flight requests, and set X-Process-Time"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("X-Process-Time", f"{time.perf_counter() - started:.6f}")
+            await send(message)
+
+        in_progress = REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_progress.dec()
+            # The router stores the matched route in the shared scope
+            route = scope.get("route")
+            REQUEST_DURATION.labels(
+                method,
+                getattr(route, "path", UNMATCHED_ROUTE),
+                str(status_code),
+            ).observe(time.perf_counter() - started)
+
+
+async def _update_celery_queue_lengths() -> None:
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        for queue in CELERY_QUEUES:
+            for suffix in CELERY_PRIORITY_SUFFIXES:
+                pipe.llen(f"{queue}{suffix}")
+        lengths = await pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Failed to read Celery queue lengths: {e}")
+        return
+
+    per_queue = len(CELERY_PRIORITY_SUFFIXES)
+    for index, queue in enumerate(CELERY_QUEUES):
+        CELERY_QUEUE_LENGTH.labels(queue).set(sum(lengths[index * per_queue:(index + 1) * per_queue]))
+
+
+def _update_pool_gauges() -> None:
+    for name, stats in pool_stats().items():
+        DB_POOL_CONNECTIONS.labels(name, "checked_out").set(stats["checked_out"])
+        DB_POOL_CONNECTIONS.labels(name, "idle").set(stats["checked_in"])
+        DB_POOL_CONNECTIONS.labels(name, "overflow").set(stats["overflow"])
+        DB_POOL_WAITING.labels(name).set(stats["waiting"])
+
+    PASSWORD_HASH_IN_FLIGHT.set(password_hasher.stats()["in_flight"])
+
+
+async def render_metrics() -> bytes:
+    """Refresh the runtime gauges and render all metrics"""
+    _update_pool_gauges()
+    await _update_celery_queue_lengths()
+    return generate_latest()
+
@@ -0,0 +1,49 @@
+"""
+Plain ASGI middleware.
+
+These wrap ``send`` directly instead of using ``BaseHTTPMiddleware``, so
+they add no extra task or body stream per request and leave streaming
+responses untouched.
+"""
+
+import uuid
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+REQUEST_ID_HEADER = b"x-request-id"
+MAX_REQUEST_ID_LENGTH = 128
+
+
+class RequestIDMiddleware:
+    """
+    Trace requests with an X-Request-ID.
+
+    An incoming X-Request-ID (e.g. from the load balancer) is kept, otherwise
+    a new one is generated. It is available as ``request.state.request_id``
+    and echoed on the response.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == REQUEST_ID_HEADER:
+                request_id = value.decode("latin-1")[:MAX_REQUEST_ID_LENGTH]
+                break
+        if not request_id:
+            request_id = uuid.uuid4().hex
+        scope.setdefault("state", {})["request_id"] = request_id
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("X-Request-ID", request_id)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
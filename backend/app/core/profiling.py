@@ -0,0 +1,179 @@
+"""
+Opt-in sampling profiler for individual requests.
+
+With ``PROFILING_ENABLED`` set, a request carrying a valid ``X-Profile``
+header is profiled: a background thread samples the event loop thread's
+stack every ``PROFILING_INTERVAL`` seconds while the request runs. The
+samples are stored in collapsed-stack format (``frame;frame;frame count``),
+which flamegraph.pl, speedscope and inferno read directly, under
+``PROFILING_OUTPUT_DIR/<route>/<profile id>.folded``. The profile id is
+returned in the ``X-Profile-Id`` response header.
+
+The header is ``<expires>.<signature>``, an HMAC of the expiry and the
+request path with ``SECRET_KEY``; create one with::
+
+    python -m app.core.profiling /api/v1/dashboard/timeline
+
+Only one request per process is profiled at a time. Samples show whatever
+the event loop is running, so other requests served concurrently appear in
+the profile too. When profiling is disabled the middleware is not
+installed at all.
+"""
+
+import hashlib
+import hmac
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Optional
+
+from fastapi.concurrency import run_in_threadpool
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-profile"
+UNMATCHED_ROUTE = "unmatched"
+
+
+def _signature(path: str, expires: int) -> str:
+    message = f"{expires}:{path}".encode()
+    return hmac.new(settings.SECRET_KEY.encode(), message, hashlib.sha256).hexdigest()
+
+
+def create_profile_token(path: str, ttl: int = 300) -> str:
+    """Create an X-Profile header value for ``path`` valid for ``ttl`` seconds"""
+    expires = int(time.time()) + ttl
+    return f"{expires}.{_signature(path, expires)}"
+
+
+def verify_profile_token(token: str, path: str) -> bool:
+    """Check an X-Profile header value against the request path"""
+    expires, _, signature = token.partition(".")
+    if not expires.isdigit() or int(expires) < time.time():
+        return False
+    return hmac.compare_digest(signature, _signature(path, int(expires)))
+
+
+class StackSampler:
+    """Samples one thread's Python stack from a background thread"""
+
+    def __init__(self, thread_id: int, interval: float, max_seconds: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    @staticmethod
+    def _fold(frame) -> str:
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+    def _run(self) -> None:
+        deadline = time.monotonic() + self.max_seconds
+        while not self._stop.wait(self.interval) and time.monotonic() < deadline:
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.samples[self._fold(frame)] += 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+def _route_key(route_path: str) -> str:
+    """Directory name for a route template"""
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", route_path).strip("_") or "root"
+
+
+def _write_profile(route_path: str, profile_id: str, folded: str) -> str:
+    directory = os.path.join(settings.PROFILING_OUTPUT_DIR, _route_key(route_path))
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{profile_id}.folded")
+    with open(path, "w") as f:
+        f.write(folded)
+    return path
+
+
+class ProfilingMiddleware:
+    """Profile requests that carry a valid X-Profile header"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._busy = threading.Lock()
+
+    def _requested(self, scope: Scope) -> Optional[str]:
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER:
+                return value.decode("latin-1")
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        token = self._requested(scope) if scope["type"] == "http" else None
+        if token is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not verify_profile_token(token, scope["path"]):
+            logger.warning(f"Rejected profiling request for {scope['path']}: invalid token")
+            await self.app(scope, receive, send)
+            return
+        if not self._busy.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("X-Profile-Id", profile_id)
+            await send(message)
+
+        sampler = StackSampler(
+            threading.get_ident(),
+            settings.PROFILING_INTERVAL,
+            settings.PROFILING_MAX_SECONDS,
+        )
+        try:
+            sampler.start()
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                sampler.stop()
+
+            # The response has been sent; failing to store the profile must not fail the request
+            route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            try:
+                path = await run_in_threadpool(_write_profile, route, profile_id, sampler.folded())
+            except OSError as e:
+                logger.warning(f"Failed to store profile {profile_id} of {route}: {e}")
+            else:
+                logger.info(f"Stored profile of {route} ({sum(sampler.samples.values())} samples) at {path}")
+        finally:
+            self._busy.release()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.exit("usage: python -m app.core.profiling <request path>")
+    print(f"X-Profile: {create_profile_token(sys.argv[1])}")
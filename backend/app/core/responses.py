@@ -0,0 +1,42 @@
+"""
+Fast JSON responses.
+
+``FastJSONResponse`` renders with orjson, which serialises UUID, datetime,
+date, dataclasses and NumPy arrays natively and much faster than the
+standard library encoder. Decimal is converted like FastAPI's own encoder
+does (int when integral, float otherwise).
+
+Handlers that build large dicts can return a ``FastJSONResponse`` directly
+to skip FastAPI's ``jsonable_encoder`` pass over the content.
+"""
+
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, Decimal):
+        return int(obj) if obj == obj.to_integral_value() else float(obj)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialise content to JSON bytes"""
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
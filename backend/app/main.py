@@ -1,17 +1,26 @@
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
+from prometheus_client import CONTENT_TYPE_LATEST
 from contextlib import asynccontextmanager
 import time
 import logging
 
 from app.core.config import settings
-from app.core.database import init_db, close_db
+from app.core.database import init_db, close_db, pool_health
 from app.api import auth, profiles, visits, documents, medications, dashboard
 from app.core.exceptions import PHMException
+from app.core.metrics import MetricsMiddleware, render_metrics
+from app.core.middleware import RequestIDMiddleware
+from app.core.profiling import ProfilingMiddleware
+from app.core.responses import FastJSONResponse
+from app.services.password_hasher import password_hasher
+from app.services.readiness import readiness_checker
+from app.services.interactions import get_interaction_index
 
 # Configure logging
 logging.basicConfig(
@@ -33,6 +42,11 @@ async def lifespan(app: FastAPI):
         logger.error(f"Failed to initialize database: {e}")
         raise
 
+    try:
+        get_interaction_index()
+    except Exception as e:
+        logger.error(f"Failed to load drug interaction index: {e}")
+
     yield
 
     # Shutdown
@@ -43,6 +57,8 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Error closing database: {e}")
 
+    password_hasher.shutdown()
+
 
 # Create FastAPI application
 app = FastAPI(
@@ -52,7 +68,8 @@ app = FastAPI(
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     docs_url=f"{settings.API_V1_STR}/docs",
     redoc_url=f"{settings.API_V1_STR}/redoc",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
 # Add CORS middleware
@@ -72,22 +89,18 @@ if settings.ENVIRONMENT == "production":
     )
 
 
-# Request timing middleware
-@app.middleware("http")
-async def add_process_time_header(request: Request, call_next):
-    """Add request processing time header"""
-    start_time = time.time()
-    response = await call_next(request)
-    process_time = time.time() - start_time
-    response.headers["X-Process-Time"] = str(process_time)
-    return response
+# Request tracing, then metrics and timing (outermost, so it times the whole stack)
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+app.add_middleware(RequestIDMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 
 # Exception handlers
 @app.exception_handler(PHMException)
 async def phm_exception_handler(request: Request, exc: PHMException):
     """Handle custom PHM exceptions"""
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=exc.status_code,
         content={
             "error": {
@@ -102,7 +115,7 @@ async def phm_exception_handler(request: Request, exc: PHMException):
 @app.exception_handler(StarletteHTTPException)
 async def http_exception_handler(request: Request, exc: StarletteHTTPException):
     """Handle HTTP exceptions"""
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=exc.status_code,
         content={
             "error": {
@@ -117,13 +130,14 @@ async def http_exception_handler(request: Request, exc: StarletteHTTPException):
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     """Handle validation exceptions"""
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
         content={
             "error": {
                 "code": "VALIDATION_ERROR",
                 "message": "Invalid request data",
-                "details": exc.errors()
+                # Error contexts may hold exception objects
+                "details": jsonable_encoder(exc.errors())
             }
         }
     )
@@ -132,8 +146,9 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
 @app.exception_handler(Exception)
 async def general_exception_handler(request: Request, exc: Exception):
     """Handle general exceptions"""
-    logger.error(f"Unhandled exception: {exc}", exc_info=True)
-    return JSONResponse(
+    request_id = getattr(request.state, "request_id", None)
+    logger.error(f"Unhandled exception (request {request_id}): {exc}", exc_info=True)
+    return FastJSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={
             "error": {
@@ -187,15 +202,34 @@ app.include_router(
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
+    pools = pool_health()
+    healthy = all(pool["health"]["healthy"] for pool in pools.values())
     return {
-        "status": "healthy",
+        "status": "healthy" if healthy else "degraded",
         "app_name": settings.APP_NAME,
         "version": settings.VERSION,
         "environment": settings.ENVIRONMENT,
-        "timestamp": time.time()
+        "timestamp": time.time(),
+        "database_pools": pools
     }
 
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness check endpoint (Postgres, Redis and MinIO)"""
+    result = await readiness_checker.check()
+    return FastJSONResponse(
+        status_code=status.HTTP_200_OK if result["ready"] else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"status": "ready" if result["ready"] else "not_ready", **result}
+    )
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics endpoint"""
+    return Response(content=await render_metrics(), media_type=CONTENT_TYPE_LATEST)
+
+
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -0,0 +1,25 @@
+"""
+SQLAlchemy models for the Personal Health Manager application.
+"""
+
+from .user import User
+from .profile import Profile
+from .medical_visit import MedicalVisit
+from .document import Document, DocumentBlob, DocumentChunk, DocumentChunkBucket, DocumentTerm
+from .medication import Medication
+from .lab_result import LabResult
+from .analysis import ProfileAnalysis
+
+__all__ = [
+    "User",
+    "Profile",
+    "MedicalVisit",
+    "Document",
+    "DocumentBlob",
+    "DocumentChunk",
+    "DocumentChunkBucket",
+    "DocumentTerm",
+    "Medication",
+    "LabResult",
+    "ProfileAnalysis",
+]
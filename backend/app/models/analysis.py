@@ -0,0 +1,30 @@
+"""
+Profile analysis model.
+
+Holds the latest AI analysis of a profile together with the fingerprint of
+the records it covered, so later runs only analyse what changed since.
+"""
+
+from sqlalchemy import Column, String, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+
+class ProfileAnalysis(Base):
+    __tablename__ = "profile_analyses"
+
+    profile_id = Column(
+        UUID(as_uuid=True), ForeignKey("profiles.id", ondelete="CASCADE"), primary_key=True
+    )
+
+    # Provider name and version; results of another provider are recomputed
+    provider = Column(String(100), nullable=False)
+    # Record count and latest change per section when the analysis ran
+    inputs = Column(JSONB, nullable=False)
+    # Hash of provider and inputs; an unchanged hash reuses ``result``
+    input_hash = Column(String(64), nullable=False)
+    result = Column(JSONB, nullable=False)
+
+    analyzed_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -0,0 +1,164 @@
+"""
+Document model for uploaded medical records.
+"""
+
+import uuid
+
+from sqlalchemy import (
+    Column, String, Integer, Text, DateTime, ForeignKey, Index, LargeBinary, UniqueConstraint, text
+)
+from sqlalchemy.dialects.postgresql import UUID, JSONB, TSVECTOR
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+
+class Document(Base):
+    __tablename__ = "documents"
+    __table_args__ = (
+        # Lets the OCR dispatcher claim the oldest pending rows cheaply
+        Index("ix_documents_pending", "created_at", postgresql_where=text("status = 'pending'")),
+        # Lets the dispatcher find claims whose lease ran out
+        Index(
+            "ix_documents_claimed",
+            "claimed_at",
+            postgresql_where=text("status IN ('queued', 'processing')"),
+        ),
+        Index("ix_documents_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    profile_id = Column(
+        UUID(as_uuid=True), ForeignKey("profiles.id", ondelete="CASCADE"), nullable=True, index=True
+    )
+
+    title = Column(String(255), nullable=False)
+    document_type = Column(String(50), nullable=False)
+    filename = Column(String(255), nullable=False)
+    file_size = Column(Integer, nullable=True)
+    document_date = Column(DateTime(timezone=True), nullable=True)
+    institution = Column(String(255), nullable=True)
+    notes = Column(Text, nullable=True)
+
+    # Object storage
+    file_path = Column(String(500), nullable=True)
+    mime_type = Column(String(100), nullable=True)
+    content_hash = Column(String(64), nullable=True, index=True)
+
+    # Processing: pending -> queued -> processing -> completed | failed
+    status = Column(String(20), nullable=False, default="pending")
+    # Start of the current queued/processing lease, renewed while OCR runs
+    claimed_at = Column(DateTime(timezone=True), nullable=True)
+    # Set by the worker running OCR; its writes only apply while it still matches
+    claim_token = Column(UUID(as_uuid=True), nullable=True)
+    ocr_text = Column(Text, nullable=True)
+    extraction_metadata = Column(JSONB, nullable=True)
+
+    # Weighted title + OCR text, refreshed by app.services.search.index_document
+    search_vector = Column(TSVECTOR, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+Index(
+    "ix_documents_profile_timeline",
+    Document.profile_id,
+    func.coalesce(Document.document_date, Document.created_at),
+    Document.id,
+)
+
+
+class DocumentBlob(Base):
+    """
+    Stored file content shared by every document with the same hash.
+
+    ``ref_count`` counts the documents pointing at ``object_name``; the
+    object is removed from storage when it drops to zero.
+    """
+    __tablename__ = "document_blobs"
+
+    content_hash = Column(String(64), primary_key=True)
+    object_name = Column(String(500), nullable=False)
+    file_size = Column(Integer, nullable=False)
+    mime_type = Column(String(100), nullable=True)
+    ref_count = Column(Integer, nullable=False, default=1)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+class DocumentTerm(Base):
+    """
+    Vocabulary of a user's documents.
+
+    Holds the lexemes of every indexed document so that misspelled search
+    words (drug and lab names in particular) can be matched to the nearest
+    known term by trigram similarity.
+    """
+    __tablename__ = "document_terms"
+    __table_args__ = (
+        Index(
+            "ix_document_terms_term_trgm",
+            "term",
+            postgresql_using="gin",
+            postgresql_ops={"term": "gin_trgm_ops"},
+        ),
+    )
+
+    user_id = Column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    term = Column(String(100), primary_key=True)
+
+
+class DocumentChunk(Base):
+    """
+    A chunk of a document's OCR text and its embedding.
+
+    ``embedding`` holds the L2-normalised float32 vector and ``space`` names
+    the model and index layout that produced it, so chunks embedded under
+    other settings are ignored until re-embedded.
+    """
+    __tablename__ = "document_chunks"
+    __table_args__ = (
+        UniqueConstraint("document_id", "chunk_index", name="uq_document_chunks_position"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    document_id = Column(
+        UUID(as_uuid=True), ForeignKey("documents.id", ondelete="CASCADE"), nullable=False
+    )
+    user_id = Column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    profile_id = Column(
+        UUID(as_uuid=True), ForeignKey("profiles.id", ondelete="CASCADE"), nullable=True
+    )
+
+    chunk_index = Column(Integer, nullable=False)
+    content = Column(Text, nullable=False)
+    embedding = Column(LargeBinary, nullable=False)
+    space = Column(String(100), nullable=False)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+class DocumentChunkBucket(Base):
+    """
+    Locality-sensitive hash buckets of a chunk, one per hash table.
+
+    The primary key makes looking up a user's buckets an index range scan;
+    rows go away with their chunk.
+    """
+    __tablename__ = "document_chunk_buckets"
+
+    user_id = Column(UUID(as_uuid=True), primary_key=True)
+    bucket = Column(Integer, primary_key=True)
+    chunk_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("document_chunks.id", ondelete="CASCADE"),
+        primary_key=True,
+        index=True,
+    )
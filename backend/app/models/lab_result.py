@@ -0,0 +1,37 @@
+"""
+Lab result model.
+"""
+
+import uuid
+
+from sqlalchemy import Column, String, Text, Float, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+
+class LabResult(Base):
+    __tablename__ = "lab_results"
+    __table_args__ = (
+        Index("ix_lab_results_profile_timeline", "profile_id", "result_date", "id"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    profile_id = Column(
+        UUID(as_uuid=True), ForeignKey("profiles.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    document_id = Column(
+        UUID(as_uuid=True), ForeignKey("documents.id", ondelete="SET NULL"), nullable=True
+    )
+
+    test_name = Column(String(255), nullable=False)
+    value = Column(Float, nullable=True)
+    value_text = Column(String(255), nullable=True)
+    unit = Column(String(50), nullable=True)
+    reference_low = Column(Float, nullable=True)
+    reference_high = Column(Float, nullable=True)
+    result_date = Column(DateTime(timezone=True), nullable=False)
+    notes = Column(Text, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
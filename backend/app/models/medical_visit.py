@@ -0,0 +1,38 @@
+"""
+Medical visit model.
+"""
+
+import uuid
+
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+
+class MedicalVisit(Base):
+    __tablename__ = "medical_visits"
+    __table_args__ = (
+        Index("ix_medical_visits_profile_timeline", "profile_id", "visit_date", "id"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    profile_id = Column(
+        UUID(as_uuid=True), ForeignKey("profiles.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+
+    visit_date = Column(DateTime(timezone=True), nullable=False)
+    visit_type = Column(String(50), nullable=True)
+    provider_name = Column(String(255), nullable=True)
+    specialty = Column(String(100), nullable=True)
+    facility = Column(String(255), nullable=True)
+    reason = Column(Text, nullable=True)
+    diagnosis = Column(Text, nullable=True)
+    notes = Column(Text, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), nullable=True)
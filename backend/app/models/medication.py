@@ -0,0 +1,49 @@
+"""
+Medication model.
+"""
+
+import uuid
+
+from sqlalchemy import Column, String, Text, Boolean, Date, DateTime, ForeignKey, Index, cast
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func, literal_column
+
+from app.core.database import Base
+
+
+class Medication(Base):
+    __tablename__ = "medications"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    profile_id = Column(
+        UUID(as_uuid=True), ForeignKey("profiles.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    visit_id = Column(
+        UUID(as_uuid=True), ForeignKey("medical_visits.id", ondelete="SET NULL"), nullable=True
+    )
+
+    name = Column(String(255), nullable=False)
+    dosage = Column(String(100), nullable=True)
+    frequency = Column(String(100), nullable=True)
+    route = Column(String(50), nullable=True)
+    prescribed_by = Column(String(255), nullable=True)
+    start_date = Column(Date, nullable=True)
+    end_date = Column(Date, nullable=True)
+    is_active = Column(Boolean, nullable=False, default=True)
+    notes = Column(Text, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), nullable=True)
+
+
+# Start dates are read as UTC midnight, which (unlike a cast to timestamptz)
+# does not depend on the session time zone and so can be indexed
+Index(
+    "ix_medications_profile_timeline",
+    Medication.profile_id,
+    func.coalesce(
+        func.timezone(literal_column("'UTC'"), cast(Medication.start_date, DateTime())),
+        Medication.created_at,
+    ),
+    Medication.id,
+)
@@ -0,0 +1,34 @@
+"""
+Health profile model.
+
+A user can manage several profiles (themselves, children, dependants);
+medical records belong to a profile.
+"""
+
+import uuid
+
+from sqlalchemy import Column, String, Boolean, Date, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+
+class Profile(Base):
+    __tablename__ = "profiles"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+
+    first_name = Column(String(100), nullable=False)
+    last_name = Column(String(100), nullable=True)
+    date_of_birth = Column(Date, nullable=True)
+    gender = Column(String(20), nullable=True)
+    blood_type = Column(String(5), nullable=True)
+    relationship = Column(String(50), nullable=True)
+    is_primary = Column(Boolean, nullable=False, default=False)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), nullable=True)
@@ -0,0 +1,34 @@
+"""
+User account model.
+"""
+
+import uuid
+
+from sqlalchemy import Column, String, Boolean, Integer, DateTime, Text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+
+class User(Base):
+    __tablename__ = "users"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    email = Column(String(255), unique=True, index=True, nullable=False)
+    password_hash = Column(String(255), nullable=False)
+    first_name = Column(String(100), nullable=True)
+    last_name = Column(String(100), nullable=True)
+
+    is_active = Column(Boolean, nullable=False, default=True)
+    is_verified = Column(Boolean, nullable=False, default=False)
+
+    # Bumped on logout, password change and deactivation to revoke issued tokens
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
+    refresh_token = Column(Text, nullable=True)
+    password_reset_token = Column(Text, nullable=True)
+    password_reset_expires = Column(DateTime(timezone=True), nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), nullable=True)
+    last_login = Column(DateTime(timezone=True), nullable=True)
@@ -2,6 +2,7 @@
 Pydantic schemas for API request/response validation.
 """
 
+from .base import ORMModel, dump_list_json
 from .auth import (
     UserCreate,
     UserResponse,
@@ -13,8 +14,14 @@ from .auth import (
     ResetPasswordRequest,
     ForgotPasswordRequest,
 )
+from .profile import ProfileResponse
+from .visit import VisitResponse
+from .medication import MedicationResponse
+from .document import DocumentResponse
 
 __all__ = [
+    "ORMModel",
+    "dump_list_json",
     "UserCreate",
     "UserResponse",
     "Token",
@@ -24,4 +31,8 @@ __all__ = [
     "ChangePasswordRequest",
     "ResetPasswordRequest",
     "ForgotPasswordRequest",
+    "ProfileResponse",
+    "VisitResponse",
+    "MedicationResponse",
+    "DocumentResponse",
 ]
\ No newline at end of file
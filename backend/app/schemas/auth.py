@@ -2,10 +2,13 @@
 Authentication schemas for request/response validation.
 """
 
+import uuid
 from typing import Optional
 from pydantic import BaseModel, EmailStr, Field, validator
 from datetime import datetime
 
+from app.schemas.base import ORMModel
+
 
 class UserBase(BaseModel):
     email: EmailStr
@@ -19,45 +22,12 @@ class UserCreate(UserBase):
     password: str = Field(..., min_length=8, max_length=128)
 
 
-class UserResponse(UserBase):
-    id: str
+class UserResponse(UserBase, ORMModel):
+    id: uuid.UUID
     created_at: datetime
     updated_at: Optional[datetime] = None
     last_login: Optional[datetime] = None
 
-    class Config:
-        from_attributes = False
-
-    @classmethod
-    def from_current_user(cls, user) -> "UserResponse":
-        """Create UserResponse from current user object"""
-        return cls(
-            id=str(user.id),
-            email=user.email,
-            first_name=user.first_name,
-            last_name=user.last_name,
-            is_active=user.is_active,
-            is_verified=user.is_verified,
-            created_at=user.created_at,
-            updated_at=user.updated_at,
-            last_login=user.last_login,
-        )
-
-    @classmethod
-    def from_orm(cls, user) -> "UserResponse":
-        """Create UserResponse from ORM model"""
-        return cls(
-            id=str(user.id),
-            email=user.email,
-            first_name=user.first_name,
-            last_name=user.last_name,
-            is_active=user.is_active,
-            is_verified=user.is_verified,
-            created_at=user.created_at,
-            updated_at=user.updated_at,
-            last_login=user.last_login,
-        )
-
 
 class Token(BaseModel):
     access_token: str
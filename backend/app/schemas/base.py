@@ -0,0 +1,29 @@
+"""
+Shared schema base and bulk serialisation helpers.
+"""
+
+from functools import lru_cache
+from typing import Any, Iterable, List, Type
+
+from pydantic import BaseModel, ConfigDict, TypeAdapter
+
+
+class ORMModel(BaseModel):
+    """Response model validated directly from ORM attributes"""
+    model_config = ConfigDict(from_attributes=True)
+
+
+@lru_cache(maxsize=None)
+def list_adapter(model: Type[ORMModel]) -> TypeAdapter:
+    """Cached adapter for a list of ``model``"""
+    return TypeAdapter(List[model])
+
+
+def dump_list_json(model: Type[ORMModel], rows: Iterable[Any]) -> bytes:
+    """
+    Validate ORM rows into ``model`` and serialise them to JSON.
+
+    Both steps run in pydantic-core, so no per-field Python copy is made.
+    """
+    adapter = list_adapter(model)
+    return adapter.dump_json(adapter.validate_python(list(rows), from_attributes=True))
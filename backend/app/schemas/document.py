@@ -0,0 +1,24 @@
+"""
+Document schemas.
+"""
+
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from app.schemas.base import ORMModel
+
+
+class DocumentResponse(ORMModel):
+    id: uuid.UUID
+    profile_id: Optional[uuid.UUID] = None
+    title: str
+    document_type: str
+    filename: str
+    file_size: Optional[int] = None
+    mime_type: Optional[str] = None
+    document_date: Optional[datetime] = None
+    institution: Optional[str] = None
+    notes: Optional[str] = None
+    status: str
+    created_at: datetime
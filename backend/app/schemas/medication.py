@@ -0,0 +1,74 @@
+"""
+Medication schemas.
+"""
+
+import uuid
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field, model_validator
+
+from app.schemas.base import ORMModel
+
+
+class MedicationBase(BaseModel):
+    name: str = Field(..., min_length=1, max_length=255)
+    dosage: Optional[str] = Field(None, max_length=100)
+    frequency: Optional[str] = Field(None, max_length=100)
+    route: Optional[str] = Field(None, max_length=50)
+    prescribed_by: Optional[str] = Field(None, max_length=255)
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    is_active: bool = True
+    notes: Optional[str] = None
+    visit_id: Optional[uuid.UUID] = None
+
+    @model_validator(mode="after")
+    def check_dates(self) -> "MedicationBase":
+        if self.start_date and self.end_date and self.end_date < self.start_date:
+            raise ValueError("end_date must not be before start_date")
+        return self
+
+
+class MedicationImportRow(MedicationBase):
+    """One record of a bulk import; the profile comes from the request"""
+
+
+class MedicationCreate(MedicationBase):
+    profile_id: uuid.UUID
+
+
+class MedicationResponse(MedicationBase, ORMModel):
+    id: uuid.UUID
+    profile_id: uuid.UUID
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+
+class DrugInteraction(ORMModel):
+    medication_a: str
+    medication_b: str
+    ingredient_a: str
+    ingredient_b: str
+    severity: str
+    description: str
+
+
+class MedicationCreateResponse(MedicationResponse):
+    """A new medication with its interactions with the profile's active ones"""
+    interactions: List[DrugInteraction] = []
+
+
+class MedicationImportError(BaseModel):
+    row: int
+    errors: List[Dict[str, Any]]
+
+
+class MedicationImportResult(BaseModel):
+    profile_id: uuid.UUID
+    received: int
+    inserted: int
+    failed: int
+    ids: List[uuid.UUID]
+    errors: List[MedicationImportError]
+    errors_truncated: bool = False
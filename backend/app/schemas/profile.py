@@ -0,0 +1,23 @@
+"""
+Profile schemas.
+"""
+
+import uuid
+from datetime import date, datetime
+from typing import Optional
+
+from app.schemas.base import ORMModel
+
+
+class ProfileResponse(ORMModel):
+    id: uuid.UUID
+    user_id: uuid.UUID
+    first_name: str
+    last_name: Optional[str] = None
+    date_of_birth: Optional[date] = None
+    gender: Optional[str] = None
+    blood_type: Optional[str] = None
+    relationship: Optional[str] = None
+    is_primary: bool = False
+    created_at: datetime
+    updated_at: Optional[datetime] = None
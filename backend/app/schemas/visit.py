@@ -0,0 +1,24 @@
+"""
+Medical visit schemas.
+"""
+
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from app.schemas.base import ORMModel
+
+
+class VisitResponse(ORMModel):
+    id: uuid.UUID
+    profile_id: uuid.UUID
+    visit_date: datetime
+    visit_type: Optional[str] = None
+    provider_name: Optional[str] = None
+    specialty: Optional[str] = None
+    facility: Optional[str] = None
+    reason: Optional[str] = None
+    diagnosis: Optional[str] = None
+    notes: Optional[str] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
@@ -0,0 +1,3 @@
+"""
+Application services shared by the API routes and background tasks.
+"""
@@ -0,0 +1,335 @@
+"""
+Incremental profile analysis.
+
+Each run starts by fingerprinting a batch of profiles with one grouped
+aggregate per section (record count and latest change). A profile whose
+fingerprint hashes to the stored ``input_hash`` keeps its memoized result
+without any records being read.
+
+Changed profiles load only the records created or updated since the stored
+watermark and hand them to the provider together with the previous result.
+When counts show that records were deleted, the profile's full history is
+analysed instead. Requests are sent to the provider in batches of up to
+``provider.max_batch_size`` profiles.
+"""
+
+import hashlib
+import json
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.analysis import ProfileAnalysis
+from app.models.lab_result import LabResult
+from app.models.medical_visit import MedicalVisit
+from app.models.medication import Medication
+
+SECTIONS = {
+    "visits": MedicalVisit,
+    "lab_results": LabResult,
+    "medications": Medication,
+}
+# Identity columns left out of the records handed to providers
+EXCLUDED_COLUMNS = {"user_id", "profile_id"}
+
+
+def _changed_at(model):
+    if hasattr(model, "updated_at"):
+        return func.coalesce(model.updated_at, model.created_at)
+    return model.created_at
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _record(row) -> Dict[str, Any]:
+    return {
+        column.name: _jsonable(getattr(row, column.name))
+        for column in row.__table__.columns
+        if column.name not in EXCLUDED_COLUMNS
+    }
+
+
+def _hash(value: Any) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True).encode()).hexdigest()
+
+
+@dataclass
+class AnalysisRequest:
+    profile_id: uuid.UUID
+    previous: Optional[Dict[str, Any]]  # Result to update, None for a full analysis
+    records: Dict[str, List[Dict[str, Any]]]  # Records created or changed, per section
+    counts: Dict[str, int]  # Total records per section
+
+
+class AnalysisProvider:
+    """Turns profile records into an analysis result"""
+    name: str = ""
+    version: int = 1
+    max_batch_size: int = 1  # Profiles per call
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}:{self.version}"
+
+    def analyze(self, requests: Sequence[AnalysisRequest]) -> List[Dict[str, Any]]:
+        """One result per request, in order"""
+        raise NotImplementedError
+
+
+class RuleBasedProvider(AnalysisProvider):
+    """
+    Local findings: out-of-range labs, diagnoses and active medications.
+
+    Findings are keyed by record, so a changed record replaces its own
+    finding and the previous result can be updated in place.
+    """
+    name = "rules"
+    version = 1
+    max_batch_size = 1000
+
+    def _finding(self, section: str, record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if section == "lab_results":
+            value, low, high = record["value"], record["reference_low"], record["reference_high"]
+            if value is None:
+                return None
+            if low is not None and value < low:
+                direction = "low"
+            elif high is not None and value > high:
+                direction = "high"
+            else:
+                return None
+            return {
+                "type": "abnormal_lab",
+                "test_name": record["test_name"],
+                "value": value,
+                "unit": record["unit"],
+                "direction": direction,
+                "date": record["result_date"],
+            }
+        if section == "visits" and record["diagnosis"]:
+            return {"type": "diagnosis", "diagnosis": record["diagnosis"], "date": record["visit_date"]}
+        if section == "medications" and record["is_active"]:
+            return {
+                "type": "active_medication",
+                "name": record["name"],
+                "dosage": record["dosage"],
+                "start_date": record["start_date"],
+            }
+        return None
+
+    def _analyze_one(self, request: AnalysisRequest) -> Dict[str, Any]:
+        findings = dict(request.previous["findings"]) if request.previous else {}
+        for section, records in request.records.items():
+            for record in records:
+                key = f"{section}:{record['id']}"
+                finding = self._finding(section, record)
+                if finding is None:
+                    findings.pop(key, None)
+                else:
+                    findings[key] = finding
+
+        by_type: Dict[str, int] = {}
+        for finding in findings.values():
+            by_type[finding["type"]] = by_type.get(finding["type"], 0) + 1
+        recent_diagnoses = sorted(
+            (f for f in findings.values() if f["type"] == "diagnosis"),
+            key=lambda f: f["date"],
+            reverse=True,
+        )[:5]
+
+        return {
+            "findings": findings,
+            "summary": {
+                "records": request.counts,
+                "findings": by_type,
+                "recent_diagnoses": recent_diagnoses,
+            },
+        }
+
+    def analyze(self, requests: Sequence[AnalysisRequest]) -> List[Dict[str, Any]]:
+        return [self._analyze_one(request) for request in requests]
+
+
+PROVIDERS: Dict[str, Callable[[], AnalysisProvider]] = {
+    RuleBasedProvider.name: RuleBasedProvider,
+}
+
+
+def get_analysis_provider() -> AnalysisProvider:
+    try:
+        return PROVIDERS[settings.ANALYSIS_PROVIDER]()
+    except KeyError:
+        raise ValueError(f"Unknown analysis provider: {settings.ANALYSIS_PROVIDER}")
+
+
+def _input_states(db: Session, profile_ids: Sequence[uuid.UUID]) -> Dict[uuid.UUID, Dict[str, Any]]:
+    """Record count and latest change per section for each profile"""
+    states = {
+        profile_id: {section: {"count": 0, "latest": None} for section in SECTIONS}
+        for profile_id in profile_ids
+    }
+    for section, model in SECTIONS.items():
+        rows = db.execute(
+            select(model.profile_id, func.count(), func.max(_changed_at(model)))
+            .where(model.profile_id.in_(profile_ids))
+            .group_by(model.profile_id)
+        ).all()
+        for profile_id, count, latest in rows:
+            states[profile_id][section] = {"count": count, "latest": _jsonable(latest)}
+    return states
+
+
+def _load_records(
+    db: Session,
+    since: Dict[uuid.UUID, Optional[Dict[str, Optional[str]]]]
+) -> Dict[uuid.UUID, Dict[str, List[Dict[str, Any]]]]:
+    """
+    Records per profile and section; all of them for profiles mapped to
+    None, otherwise those changed after the section's watermark
+    """
+    records: Dict[uuid.UUID, Dict[str, List[Dict[str, Any]]]] = {
+        profile_id: {section: [] for section in SECTIONS} for profile_id in since
+    }
+    for section, model in SECTIONS.items():
+        changed_at = _changed_at(model)
+        conditions = []
+        full = [profile_id for profile_id, watermarks in since.items() if watermarks is None]
+        if full:
+            conditions.append(model.profile_id.in_(full))
+        for profile_id, watermarks in since.items():
+            if watermarks is None:
+                continue
+            latest = watermarks.get(section)
+            if latest is None:
+                conditions.append(model.profile_id == profile_id)
+            else:
+                conditions.append(and_(
+                    model.profile_id == profile_id,
+                    changed_at > datetime.fromisoformat(latest),
+                ))
+        if not conditions:
+            continue
+
+        for row in db.scalars(select(model).where(or_(*conditions)).order_by(model.id)):
+            records[row.profile_id][section].append(_record(row))
+    return records
+
+
+def _is_consistent(
+    previous: Dict[str, Any],
+    state: Dict[str, Any],
+    records: Dict[str, List[Dict[str, Any]]]
+) -> bool:
+    """Whether the new records account for every count change (no deletions)"""
+    for section in SECTIONS:
+        before = previous.get(section, {"count": 0, "latest": None})
+        latest = datetime.fromisoformat(before["latest"]) if before["latest"] else None
+        created = sum(
+            1 for record in records[section]
+            if latest is None or datetime.fromisoformat(record["created_at"]) > latest
+        )
+        if state[section]["count"] != before["count"] + created:
+            return False
+    return True
+
+
+def analyze_profiles(db: Session, profile_ids: Sequence[uuid.UUID]) -> Dict[uuid.UUID, str]:
+    """
+    Bring the stored analyses of the given profiles up to date and commit
+
+    Returns ``cached``, ``updated`` (incremental) or ``analyzed`` (full)
+    for each profile.
+    """
+    provider = get_analysis_provider()
+    states = _input_states(db, profile_ids)
+    stored = {
+        analysis.profile_id: analysis
+        for analysis in db.scalars(
+            select(ProfileAnalysis).where(ProfileAnalysis.profile_id.in_(profile_ids))
+        )
+    }
+
+    outcomes: Dict[uuid.UUID, str] = {}
+    input_hashes: Dict[uuid.UUID, str] = {}
+    since: Dict[uuid.UUID, Optional[Dict[str, Optional[str]]]] = {}
+    for profile_id in profile_ids:
+        input_hash = _hash({"provider": provider.key, "inputs": states[profile_id]})
+        previous = stored.get(profile_id)
+        if previous is not None and previous.input_hash == input_hash:
+            outcomes[profile_id] = "cached"
+            continue
+        input_hashes[profile_id] = input_hash
+        if previous is None or previous.provider != provider.key:
+            since[profile_id] = None
+        else:
+            since[profile_id] = {
+                section: previous.inputs.get(section, {}).get("latest") for section in SECTIONS
+            }
+    if not since:
+        return outcomes
+
+    records = _load_records(db, since)
+
+    # Deleted records cannot be expressed as a delta
+    full = [
+        profile_id for profile_id, watermarks in since.items()
+        if watermarks is not None
+        and not _is_consistent(stored[profile_id].inputs, states[profile_id], records[profile_id])
+    ]
+    if full:
+        records.update(_load_records(db, {profile_id: None for profile_id in full}))
+        since.update({profile_id: None for profile_id in full})
+
+    requests = [
+        AnalysisRequest(
+            profile_id=profile_id,
+            previous=stored[profile_id].result if watermarks is not None else None,
+            records=records[profile_id],
+            counts={section: states[profile_id][section]["count"] for section in SECTIONS},
+        )
+        for profile_id, watermarks in since.items()
+    ]
+    results: List[Dict[str, Any]] = []
+    for start in range(0, len(requests), provider.max_batch_size):
+        results.extend(provider.analyze(requests[start:start + provider.max_batch_size]))
+
+    now = datetime.now(timezone.utc)
+    rows = [
+        {
+            "profile_id": request.profile_id,
+            "provider": provider.key,
+            "inputs": states[request.profile_id],
+            "input_hash": input_hashes[request.profile_id],
+            "result": result,
+            "analyzed_at": now,
+        }
+        for request, result in zip(requests, results)
+    ]
+    statement = insert(ProfileAnalysis).values(rows)
+    db.execute(statement.on_conflict_do_update(
+        index_elements=[ProfileAnalysis.profile_id],
+        set_={
+            "provider": statement.excluded.provider,
+            "inputs": statement.excluded.inputs,
+            "input_hash": statement.excluded.input_hash,
+            "result": statement.excluded.result,
+            "analyzed_at": statement.excluded.analyzed_at,
+        },
+    ))
+    db.commit()
+
+    for request in requests:
+        outcomes[request.profile_id] = "updated" if request.previous is not None else "analyzed"
+    return outcomes
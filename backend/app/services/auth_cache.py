@@ -0,0 +1,140 @@
+"""
+Cached user authentication state.
+
+Authenticating a request only needs to know whether the user is active and
+which token version is current, so that state is cached in two tiers: a
+bounded per-process LRU with a very short TTL in front of a shared Redis
+entry with a short TTL. Most requests therefore authenticate without a
+database query.
+
+Every change that must revoke access (logout, password change or reset,
+deactivation) bumps ``User.token_version`` and calls
+``invalidate_auth_state``, which drops the Redis entry and the local one.
+Other processes may serve their local copy for at most
+``AUTH_CACHE_LOCAL_TTL`` seconds afterwards, except to handlers that load
+the full user, which recheck it and drop a stale entry.
+"""
+
+import json
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import redis
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import get_redis
+from app.core.config import settings
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "auth:user:"
+
+
+@dataclass(frozen=True)
+class AuthState:
+    """What request authentication needs to know about a user"""
+    user_id: uuid.UUID
+    is_active: bool
+    token_version: int
+
+
+class LocalAuthCache:
+    """Bounded LRU of auth states with a per-entry TTL"""
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[uuid.UUID, Tuple[float, AuthState]]" = OrderedDict()
+
+    def get(self, user_id: uuid.UUID) -> Optional[AuthState]:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        expires_at, state = entry
+        if expires_at < time.monotonic():
+            del self._entries[user_id]
+            return None
+        self._entries.move_to_end(user_id)
+        return state
+
+    def set(self, state: AuthState) -> None:
+        self._entries[state.user_id] = (time.monotonic() + self.ttl, state)
+        self._entries.move_to_end(state.user_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def delete(self, user_id: uuid.UUID) -> None:
+        self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+local_cache = LocalAuthCache(settings.AUTH_CACHE_LOCAL_SIZE, settings.AUTH_CACHE_LOCAL_TTL)
+
+
+async def _load_from_redis(user_id: uuid.UUID) -> Optional[AuthState]:
+    try:
+        raw = await get_redis().get(f"{KEY_PREFIX}{user_id}")
+    except redis.RedisError as e:
+        logger.warning(f"Auth cache unavailable: {e}")
+        return None
+    if raw is None:
+        return None
+
+    data = json.loads(raw)
+    return AuthState(user_id=user_id, is_active=data["is_active"], token_version=data["token_version"])
+
+
+async def _store_in_redis(state: AuthState) -> None:
+    try:
+        await get_redis().set(
+            f"{KEY_PREFIX}{state.user_id}",
+            json.dumps({"is_active": state.is_active, "token_version": state.token_version}),
+            ex=settings.AUTH_CACHE_TTL,
+        )
+    except redis.RedisError as e:
+        logger.warning(f"Failed to cache auth state: {e}")
+
+
+async def get_auth_state(db: AsyncSession, user_id: uuid.UUID) -> Optional[AuthState]:
+    """Get a user's auth state from the cache tiers, falling back to the database"""
+    state = local_cache.get(user_id)
+    if state is not None:
+        return state
+
+    state = await _load_from_redis(user_id)
+    if state is None:
+        result = await db.execute(
+            select(User.is_active, User.token_version).where(User.id == user_id)
+        )
+        row = result.one_or_none()
+        if row is None:
+            return None
+        state = AuthState(user_id=user_id, is_active=row.is_active, token_version=row.token_version)
+        await _store_in_redis(state)
+
+    local_cache.set(state)
+    return state
+
+
+async def cache_auth_state(user: User) -> None:
+    """Prime the cache from a freshly loaded user (e.g. at login)"""
+    state = AuthState(user_id=user.id, is_active=user.is_active, token_version=user.token_version)
+    local_cache.set(state)
+    await _store_in_redis(state)
+
+
+async def invalidate_auth_state(user_id: uuid.UUID) -> None:
+    """Drop a user's cached auth state after it changed"""
+    local_cache.delete(user_id)
+    try:
+        await get_redis().delete(f"{KEY_PREFIX}{user_id}")
+    except redis.RedisError as e:
+        logger.warning(f"Failed to invalidate auth state for {user_id}: {e}")
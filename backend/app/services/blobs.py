@@ -0,0 +1,98 @@
+"""
+Content-addressed document storage.
+
+Every distinct file is stored once in the documents bucket and tracked in
+``document_blobs`` by its SHA-256. Documents with the same content share the
+stored object through a reference count, across users. A re-upload reuses
+the OCR results of an already processed copy instead of being processed
+again, but only a copy of the same user: otherwise how an upload is handled
+would reveal that someone else had uploaded the same file.
+"""
+
+import logging
+from typing import Optional
+
+from sqlalchemy import select, update, delete
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.document import Document, DocumentBlob
+from app.services.storage import remove_object
+from app.services.uploads import UploadResult
+
+logger = logging.getLogger(__name__)
+
+
+async def acquire_blob(db: AsyncSession, upload: UploadResult) -> str:
+    """
+    Register a reference to the uploaded content and return its object name.
+
+    If the content is already stored, the reference count is incremented and
+    the freshly uploaded object is discarded in favour of the existing one.
+    The upsert makes concurrent uploads of the same content safe. Commits
+    the session.
+    """
+    stmt = insert(DocumentBlob).values(
+        content_hash=upload.content_hash,
+        object_name=upload.object_name,
+        file_size=upload.size,
+        mime_type=upload.mime_type,
+        ref_count=1,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DocumentBlob.content_hash],
+        set_={"ref_count": DocumentBlob.ref_count + 1},
+    ).returning(DocumentBlob.object_name)
+
+    result = await db.execute(stmt)
+    object_name = result.scalar_one()
+    await db.commit()
+
+    if object_name != upload.object_name:
+        logger.info(f"Deduplicated upload {upload.content_hash} onto {object_name}")
+        await remove_object(upload.object_name)
+
+    return object_name
+
+
+async def release_blob(db: AsyncSession, content_hash: str) -> None:
+    """
+    Drop a reference to stored content, removing the object at zero.
+
+    Commits the session.
+    """
+    await db.execute(
+        update(DocumentBlob)
+        .where(DocumentBlob.content_hash == content_hash)
+        .values(ref_count=DocumentBlob.ref_count - 1)
+    )
+    # Only delete if no reference was acquired in the meantime
+    result = await db.execute(
+        delete(DocumentBlob)
+        .where(DocumentBlob.content_hash == content_hash, DocumentBlob.ref_count <= 0)
+        .returning(DocumentBlob.object_name)
+    )
+    object_name = result.scalar_one_or_none()
+    await db.commit()
+
+    if object_name is not None:
+        await remove_object(object_name)
+
+
+async def find_processed_duplicate(
+    db: AsyncSession,
+    user_id,
+    content_hash: str,
+    exclude_id=None
+) -> Optional[Document]:
+    """Find an already processed document of the user with the same content"""
+    query = select(Document).where(
+        Document.user_id == user_id,
+        Document.content_hash == content_hash,
+        Document.status == "completed",
+    )
+    if exclude_id is not None:
+        query = query.where(Document.id != exclude_id)
+
+    result = await db.execute(query.limit(1))
+    return result.scalar_one_or_none()
@@ -0,0 +1,332 @@
+"""
+Materialised per-profile dashboard summary.
+
+The summary is kept in a Redis hash per profile, split into independent
+sections (visits, medications, documents, lab results). Every section has
+a revision counter that writers bump with ``invalidate_dashboard`` after
+committing changes to the underlying records; a cached section remembers
+the revision it was computed from. Revisions live in their own hash
+without a TTL, so they never go back to zero while derived caches (such
+as the lab series) that were computed from them are still alive.
+
+Visits and lab results have no write path yet, so their sections only
+refresh by age until one is added.
+
+Reads are stale-while-revalidate: a section that is outdated, either by
+revision or by age, is still served immediately while only that section is
+recomputed in the background. Only missing sections are computed inline.
+Dashboard latency therefore does not grow with a profile's history.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set
+
+import redis
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import get_redis, get_sync_redis
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.document import Document
+from app.models.lab_result import LabResult
+from app.models.medical_visit import MedicalVisit
+from app.models.medication import Medication
+
+logger = logging.getLogger(__name__)
+
+SECTIONS = ("visits", "medications", "documents", "lab_results")
+
+# Bump when the shape of a section changes to start from an empty cache
+CACHE_VERSION = 2
+REFRESH_LOCK_SECONDS = 30
+RECENT_LIMIT = 5
+
+# Background refreshes, referenced so they are not garbage collected
+_refresh_tasks: Set[asyncio.Task] = set()
+
+
+def _cache_key(profile_id) -> str:
+    return f"dashboard:v{CACHE_VERSION}:{profile_id}"
+
+
+def _revisions_key(profile_id) -> str:
+    return f"revisions:{profile_id}"
+
+
+def _iso(value) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+async def _visits_section(db: AsyncSession, profile_id) -> Dict[str, Any]:
+    total, last_visit = (await db.execute(
+        select(func.count(MedicalVisit.id), func.max(MedicalVisit.visit_date))
+        .where(MedicalVisit.profile_id == profile_id)
+    )).one()
+    recent = (await db.execute(
+        select(MedicalVisit)
+        .where(MedicalVisit.profile_id == profile_id)
+        .order_by(MedicalVisit.visit_date.desc())
+        .limit(RECENT_LIMIT)
+    )).scalars().all()
+
+    return {
+        "total": total,
+        "last_visit_date": _iso(last_visit),
+        "recent": [
+            {
+                "id": str(visit.id),
+                "visit_date": _iso(visit.visit_date),
+                "visit_type": visit.visit_type,
+                "provider_name": visit.provider_name,
+                "reason": visit.reason,
+            }
+            for visit in recent
+        ],
+    }
+
+
+async def _medications_section(db: AsyncSession, profile_id) -> Dict[str, Any]:
+    total, active = (await db.execute(
+        select(
+            func.count(Medication.id),
+            func.count(case((Medication.is_active.is_(True), 1))),
+        ).where(Medication.profile_id == profile_id)
+    )).one()
+    active_medications = (await db.execute(
+        select(Medication)
+        .where(Medication.profile_id == profile_id, Medication.is_active.is_(True))
+        .order_by(Medication.name)
+    )).scalars().all()
+
+    return {
+        "total": total,
+        "active": active,
+        "active_list": [
+            {
+                "id": str(medication.id),
+                "name": medication.name,
+                "dosage": medication.dosage,
+                "frequency": medication.frequency,
+            }
+            for medication in active_medications
+        ],
+    }
+
+
+async def _documents_section(db: AsyncSession, profile_id) -> Dict[str, Any]:
+    by_status = dict((await db.execute(
+        select(Document.status, func.count(Document.id))
+        .where(Document.profile_id == profile_id)
+        .group_by(Document.status)
+    )).all())
+    recent = (await db.execute(
+        select(Document)
+        .where(Document.profile_id == profile_id)
+        .order_by(Document.created_at.desc())
+        .limit(RECENT_LIMIT)
+    )).scalars().all()
+
+    return {
+        "total": sum(by_status.values()),
+        "by_status": by_status,
+        "recent": [
+            {
+                "id": str(document.id),
+                "title": document.title,
+                "document_type": document.document_type,
+                "status": document.status,
+                "created_at": _iso(document.created_at),
+            }
+            for document in recent
+        ],
+    }
+
+
+async def _lab_results_section(db: AsyncSession, profile_id) -> Dict[str, Any]:
+    out_of_range = (LabResult.value < LabResult.reference_low) | (LabResult.value > LabResult.reference_high)
+    total, abnormal, last_result = (await db.execute(
+        select(
+            func.count(LabResult.id),
+            func.count(case((out_of_range, 1))),
+            func.max(LabResult.result_date),
+        ).where(LabResult.profile_id == profile_id)
+    )).one()
+    recent = (await db.execute(
+        select(LabResult)
+        .where(LabResult.profile_id == profile_id)
+        .order_by(LabResult.result_date.desc())
+        .limit(RECENT_LIMIT * 2)
+    )).scalars().all()
+
+    return {
+        "total": total,
+        "abnormal": abnormal,
+        "last_result_date": _iso(last_result),
+        "recent": [
+            {
+                "id": str(result.id),
+                "test_name": result.test_name,
+                "value": result.value,
+                "unit": result.unit,
+                "reference_low": result.reference_low,
+                "reference_high": result.reference_high,
+                "result_date": _iso(result.result_date),
+            }
+            for result in recent
+        ],
+    }
+
+
+SECTION_BUILDERS: Dict[str, Callable[[AsyncSession, Any], Awaitable[Dict[str, Any]]]] = {
+    "visits": _visits_section,
+    "medications": _medications_section,
+    "documents": _documents_section,
+    "lab_results": _lab_results_section,
+}
+
+
+async def refresh_sections(db: AsyncSession, profile_id, sections: Iterable[str]) -> Dict[str, Any]:
+    """Recompute sections from the database and store them in the cache"""
+    client = get_redis()
+    key = _cache_key(profile_id)
+    sections = list(sections)
+
+    # Read revisions first so a change made while computing leaves the section stale
+    try:
+        revisions = await client.hmget(_revisions_key(profile_id), sections)
+    except redis.RedisError as e:
+        logger.warning(f"Dashboard cache unavailable: {e}")
+        revisions = [None] * len(sections)
+
+    computed = {}
+    entries = {}
+    for section, revision in zip(sections, revisions):
+        data = await SECTION_BUILDERS[section](db, profile_id)
+        computed[section] = data
+        entries[section] = json.dumps({
+            "rev": int(revision or 0),
+            "computed_at": time.time(),
+            "data": data,
+        })
+
+    try:
+        pipe = client.pipeline()
+        pipe.hset(key, mapping=entries)
+        pipe.expire(key, settings.DASHBOARD_CACHE_TTL)
+        await pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Failed to store dashboard sections: {e}")
+
+    return computed
+
+
+async def _refresh_in_background(profile_id, sections: List[str]) -> None:
+    client = get_redis()
+    lock_key = f"{_cache_key(profile_id)}:refreshing"
+    try:
+        # One refresh per profile at a time across all API workers
+        if not await client.set(lock_key, 1, nx=True, ex=REFRESH_LOCK_SECONDS):
+            return
+        try:
+            async with AsyncSessionLocal() as db:
+                await refresh_sections(db, profile_id, sections)
+        finally:
+            await client.delete(lock_key)
+    except Exception as e:
+        logger.warning(f"Background dashboard refresh for {profile_id} failed: {e}")
+
+
+def _schedule_refresh(profile_id, sections: List[str]) -> None:
+    task = asyncio.create_task(_refresh_in_background(profile_id, sections))
+    _refresh_tasks.add(task)
+    task.add_done_callback(_refresh_tasks.discard)
+
+
+async def get_dashboard_summary(
+    db: AsyncSession,
+    profile_id,
+    sections: Iterable[str] = SECTIONS
+) -> Dict[str, Any]:
+    """
+    Get the dashboard summary for a profile.
+
+    Outdated sections are served from the cache and refreshed in the
+    background; missing sections are computed before returning.
+    """
+    sections = list(sections)
+    try:
+        pipe = get_redis().pipeline()
+        pipe.hgetall(_cache_key(profile_id))
+        pipe.hgetall(_revisions_key(profile_id))
+        cached, revisions = await pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Dashboard cache unavailable: {e}")
+        cached, revisions = {}, {}
+    cached = {k.decode(): v for k, v in cached.items()}
+    revisions = {k.decode(): int(v) for k, v in revisions.items()}
+
+    now = time.time()
+    summary: Dict[str, Any] = {}
+    missing, stale = [], []
+    for section in sections:
+        entry = cached.get(section)
+        if entry is None:
+            missing.append(section)
+            continue
+
+        entry = json.loads(entry)
+        summary[section] = entry["data"]
+        outdated = entry["rev"] < revisions.get(section, 0)
+        if outdated or now - entry["computed_at"] > settings.DASHBOARD_CACHE_MAX_AGE:
+            stale.append(section)
+
+    if missing:
+        summary.update(await refresh_sections(db, profile_id, missing))
+    if stale:
+        _schedule_refresh(profile_id, stale)
+
+    return {
+        "profile_id": str(profile_id),
+        "stale_sections": stale,
+        **summary,
+    }
+
+
+async def get_section_revision(profile_id, section: str) -> int:
+    """Current revision of a section (0 if never invalidated or Redis is down)"""
+    try:
+        revision = await get_redis().hget(_revisions_key(profile_id), section)
+    except redis.RedisError as e:
+        logger.warning(f"Dashboard cache unavailable: {e}")
+        return 0
+    return int(revision or 0)
+
+
+async def invalidate_dashboard(profile_id, *sections: str) -> None:
+    """Mark dashboard sections as outdated after their records changed"""
+    if profile_id is None:
+        return
+    try:
+        pipe = get_redis().pipeline()
+        for section in sections:
+            pipe.hincrby(_revisions_key(profile_id), section, 1)
+        await pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Failed to invalidate dashboard for {profile_id}: {e}")
+
+
+def invalidate_dashboard_sync(profile_id, *sections: str) -> None:
+    """Mark dashboard sections as outdated (Celery tasks)"""
+    if profile_id is None:
+        return
+    try:
+        pipe = get_sync_redis().pipeline()
+        for section in sections:
+            pipe.hincrby(_revisions_key(profile_id), section, 1)
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Failed to invalidate dashboard for {profile_id}: {e}")
@@ -0,0 +1,105 @@
+"""
+Text chunking and embedding models.
+
+Embedders turn a batch of texts into L2-normalised float32 vectors. They
+are registered by name in ``EMBEDDERS`` and selected with
+``settings.EMBEDDING_MODEL``; a local model can be plugged in with
+``register_embedder`` without touching the indexing code.
+
+``HashingEmbedder`` needs no model files: words are hashed into a fixed
+number of signed buckets. It is deterministic across processes, which makes
+it suitable for tests and development, but it only captures shared
+vocabulary, not meaning.
+"""
+
+import hashlib
+import math
+import re
+from functools import lru_cache
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from app.core.config import settings
+
+_TOKEN = re.compile(r"[^\W_]+")
+
+
+def chunk_text(text: str, size: int, overlap: int) -> List[str]:
+    """Split text into windows of about ``size`` characters that overlap"""
+    text = " ".join(text.split())
+    if not text:
+        return []
+
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(start + size, len(text))
+        # Break at a word boundary unless the word is longer than a window
+        if end < len(text):
+            boundary = text.rfind(" ", start + 1, end)
+            if boundary > start:
+                end = boundary
+        chunks.append(text[start:end].strip())
+        if end == len(text):
+            break
+        next_start = text.find(" ", max(end - overlap, start + 1), end)
+        start = next_start + 1 if next_start != -1 else end
+    return [chunk for chunk in chunks if chunk]
+
+
+class Embedder:
+    """Maps texts to L2-normalised vectors"""
+    name: str = ""
+    dimensions: int = 0
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Embed a batch of texts as a (len(texts), dimensions) float32 array"""
+        raise NotImplementedError
+
+
+class HashingEmbedder(Embedder):
+    """Signed feature hashing of words"""
+    name = "hashing"
+
+    def __init__(self, dimensions: int):
+        self.dimensions = dimensions
+
+    def _features(self, text: str) -> Dict[int, float]:
+        features: Dict[int, float] = {}
+        for token in _TOKEN.findall(text.lower()):
+            digest = int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), "little")
+            index = digest % self.dimensions
+            sign = 1.0 if digest >> 63 else -1.0
+            features[index] = features.get(index, 0.0) + sign
+        return features
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for index, count in self._features(text).items():
+                # Sublinear term frequency keeps repeated words from dominating
+                vectors[row, index] = math.copysign(1.0 + math.log(abs(count)), count) if count else 0.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms > 0, norms, 1.0)
+
+
+EMBEDDERS: Dict[str, Callable[[int], Embedder]] = {
+    HashingEmbedder.name: HashingEmbedder,
+}
+
+
+def register_embedder(name: str, factory: Callable[[int], Embedder]) -> None:
+    """Make an embedder selectable through ``settings.EMBEDDING_MODEL``"""
+    EMBEDDERS[name] = factory
+    get_embedder.cache_clear()
+
+
+@lru_cache(maxsize=None)
+def get_embedder() -> Embedder:
+    """The configured embedder, created once per process"""
+    try:
+        factory = EMBEDDERS[settings.EMBEDDING_MODEL]
+    except KeyError:
+        raise ValueError(f"Unknown embedding model: {settings.EMBEDDING_MODEL}")
+    return factory(settings.EMBEDDING_DIMENSIONS)
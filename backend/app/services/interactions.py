@@ -0,0 +1,236 @@
+"""
+Local drug-interaction engine.
+
+Interactions come from a CSV dataset (a small one is bundled in
+``app/data``) and are compiled into a flat binary index: a sorted array of
+64-bit keys, one per normalised ingredient pair, followed by severities and
+the pair and description text. The index file is memory-mapped, so every
+worker process on a host shares one copy through the page cache.
+
+Checking a medication list hashes each pair of ingredients across
+medications and finds them with one ``searchsorted`` over the keys; no
+network calls are made.
+
+Build an index from another dataset with::
+
+    python -m app.services.interactions build <dataset.csv> [<output.idx>]
+"""
+
+import csv
+import hashlib
+import logging
+import mmap
+import os
+import re
+import struct
+import sys
+import tempfile
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import combinations
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+BUNDLED_DATASET = DATA_DIR / "drug_interactions.csv"
+ALIASES = DATA_DIR / "drug_aliases.csv"
+
+SEVERITIES = ("minor", "moderate", "major", "contraindicated")
+MAGIC = b"PHMDDI01"
+# Magic, number of pairs, size of the text section
+HEADER = struct.Struct("<8sII")
+
+_COMBINATION = re.compile(r"\s*(?:/|\+|,|&|\band\b|\bwith\b)\s*")
+_WORD = re.compile(r"[a-z][a-z-]*")
+# Dosage forms and units, never part of an ingredient
+FORM_WORDS = {
+    "tablet", "tablets", "tab", "capsule", "capsules", "cap", "oral", "solution", "suspension",
+    "injection", "cream", "chewable", "extended", "delayed", "release", "er", "xr", "sr", "cr",
+    "xl", "la", "dr", "ds", "daily", "extra", "strength", "mg", "mcg", "g", "ml", "meq", "iu",
+    "units",
+}
+# Salt and ester parts, dropped when something else names the ingredient
+SALT_WORDS = {
+    "hydrochloride", "hcl", "hydrobromide", "sodium", "potassium", "calcium", "magnesium",
+    "sulfate", "sulphate", "succinate", "tartrate", "bitartrate", "maleate", "besylate",
+    "mesylate", "citrate", "phosphate", "acetate", "fumarate", "carbonate", "chloride",
+    "oxide", "hydroxide", "monohydrate", "dihydrate",
+}
+
+
+def _normalize(part: str) -> str:
+    tokens = [token for token in _WORD.findall(part.lower()) if token not in FORM_WORDS]
+    core = [token for token in tokens if token not in SALT_WORDS] or tokens
+    return " ".join(core)
+
+
+@lru_cache(maxsize=None)
+def _aliases() -> Dict[str, Tuple[str, ...]]:
+    with open(ALIASES, newline="", encoding="utf-8") as f:
+        return {
+            _normalize(row["alias"]): tuple(
+                _normalize(part) for part in row["ingredients"].split("+")
+            )
+            for row in csv.DictReader(f)
+        }
+
+
+def ingredients(name: str) -> List[str]:
+    """Normalised active ingredients of a medication name"""
+    aliases = _aliases()
+    found: List[str] = []
+    for part in _COMBINATION.split(name):
+        ingredient = _normalize(part)
+        if not ingredient:
+            continue
+        # Brand names are often followed by a strength or marketing words
+        resolved = aliases.get(ingredient) or aliases.get(ingredient.split()[0]) or (ingredient,)
+        found.extend(item for item in resolved if item not in found)
+    return found
+
+
+def pair_key(a: str, b: str) -> int:
+    """Order-independent 64-bit key of an ingredient pair"""
+    first, second = sorted((a, b))
+    digest = hashlib.blake2b(f"{first}\0{second}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def build_index(dataset: Path, output: Path) -> int:
+    """Compile a CSV dataset into an index file; returns the number of pairs"""
+    entries: Dict[int, Tuple[int, str, str, str]] = {}
+    with open(dataset, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            a, b = _normalize(row["ingredient_a"]), _normalize(row["ingredient_b"])
+            severity = SEVERITIES.index(row["severity"].strip().lower())
+            key = pair_key(a, b)
+            # Keep the most severe entry for a pair
+            if key not in entries or entries[key][0] < severity:
+                entries[key] = (severity, a, b, row["description"].strip())
+
+    keys = np.array(sorted(entries), dtype="<u8")
+    texts = [
+        "\t".join(entries[key][1:]).encode("utf-8") for key in keys.tolist()
+    ]
+    offsets = np.concatenate(([0], np.cumsum([len(text) for text in texts]))).astype("<u4")
+    severities = np.array([entries[key][0] for key in keys.tolist()], dtype="u1")
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    # Write next to the target and rename so readers never see a partial file
+    fd, tmp_path = tempfile.mkstemp(dir=output.parent, prefix=f".{output.name}.")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(HEADER.pack(MAGIC, len(keys), int(offsets[-1])))
+            f.write(keys.tobytes())
+            f.write(offsets.tobytes())
+            f.write(severities.tobytes())
+            f.write(b"".join(texts))
+        os.replace(tmp_path, output)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+    return len(keys)
+
+
+@dataclass
+class Interaction:
+    medication_a: str
+    medication_b: str
+    ingredient_a: str
+    ingredient_b: str
+    severity: str
+    description: str
+
+
+class InteractionIndex:
+    """Read-only view of a memory-mapped index file"""
+
+    def __init__(self, path: Path):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count, _ = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a drug interaction index")
+
+        offset = HEADER.size
+        self.keys = np.frombuffer(self._mmap, dtype="<u8", count=count, offset=offset)
+        offset += self.keys.nbytes
+        self._offsets = np.frombuffer(self._mmap, dtype="<u4", count=count + 1, offset=offset)
+        offset += self._offsets.nbytes
+        self._severities = np.frombuffer(self._mmap, dtype="u1", count=count, offset=offset)
+        self._text_start = offset + self._severities.nbytes
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _entry(self, position: int) -> Tuple[str, str, str]:
+        start = self._text_start + int(self._offsets[position])
+        end = self._text_start + int(self._offsets[position + 1])
+        a, b, description = self._mmap[start:end].decode("utf-8").split("\t")
+        return a, b, description
+
+    def check(self, medications: Sequence[str]) -> List[Interaction]:
+        """Interactions between any two of the named medications, most severe first"""
+        names = list(dict.fromkeys(medications))
+        components = [ingredients(name) for name in names]
+
+        candidates = []
+        for i, j in combinations(range(len(names)), 2):
+            for a in components[i]:
+                for b in components[j]:
+                    if a != b:
+                        candidates.append((pair_key(a, b), i, j, a, b))
+        if not candidates or not len(self.keys):
+            return []
+
+        wanted = np.array([candidate[0] for candidate in candidates], dtype=np.uint64)
+        positions = np.minimum(np.searchsorted(self.keys, wanted), len(self.keys) - 1)
+        hits = np.flatnonzero(self.keys[positions] == wanted)
+
+        interactions = []
+        for hit in hits.tolist():
+            _, i, j, a, b = candidates[hit]
+            position = int(positions[hit])
+            entry_a, entry_b, description = self._entry(position)
+            if {entry_a, entry_b} != {a, b}:
+                continue  # Hash collision
+            interactions.append(Interaction(
+                medication_a=names[i],
+                medication_b=names[j],
+                ingredient_a=a,
+                ingredient_b=b,
+                severity=SEVERITIES[self._severities[position]],
+                description=description,
+            ))
+
+        interactions.sort(key=lambda interaction: -SEVERITIES.index(interaction.severity))
+        return interactions
+
+
+@lru_cache(maxsize=None)
+def get_interaction_index() -> InteractionIndex:
+    """The process-wide index, compiled first if missing or older than its dataset"""
+    dataset = Path(settings.DRUG_INTERACTIONS_DATASET or BUNDLED_DATASET)
+    path = Path(settings.DRUG_INTERACTIONS_INDEX_PATH)
+    if not path.exists() or path.stat().st_mtime < dataset.stat().st_mtime:
+        count = build_index(dataset, path)
+        logger.info(f"Compiled {count} drug interactions from {dataset} into {path}")
+    return InteractionIndex(path)
+
+
+def check_interactions(medications: Sequence[str]) -> List[Interaction]:
+    """Interactions within a medication list"""
+    return get_interaction_index().check(medications)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[1] != "build":
+        sys.exit("usage: python -m app.services.interactions build <dataset.csv> [<output.idx>]")
+    target = Path(sys.argv[3] if len(sys.argv) > 3 else settings.DRUG_INTERACTIONS_INDEX_PATH)
+    print(f"{build_index(Path(sys.argv[2]), target)} pairs written to {target}")
@@ -0,0 +1,271 @@
+"""
+Columnar lab-result series.
+
+A profile's numeric lab results are loaded as one row per (analyte, unit)
+with the timestamps, values and reference ranges aggregated into arrays by
+Postgres, and kept as flat NumPy columns sorted by series then time. The
+packed columns are cached in Redis and tied to the dashboard's
+``lab_results`` revision, so any change to lab results reloads them once
+its writer calls ``invalidate_dashboard(profile_id, "lab_results")``.
+
+Trend statistics for every series (count, range, mean, slope, out-of-range
+count) are computed in a single vectorised pass with ``np.add.reduceat``
+over the series boundaries; no per-result Python objects are created.
+"""
+
+import io
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import redis
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import get_redis
+from app.core.config import settings
+from app.models.lab_result import LabResult
+from app.services.dashboard import get_section_revision
+
+logger = logging.getLogger(__name__)
+
+# Bump when the packed layout changes
+CACHE_VERSION = 2
+SECONDS_PER_YEAR = 365.25 * 24 * 3600
+
+
+def _cache_key(profile_id) -> str:
+    return f"labs:v{CACHE_VERSION}:{profile_id}"
+
+
+def _iso(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat()
+
+
+def _epoch(moment: Optional[datetime]) -> Optional[float]:
+    """Epoch seconds, reading naive datetimes as UTC like the stored results"""
+    if moment is None:
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+@dataclass
+class LabSeries:
+    """All numeric lab series of a profile as flat columns"""
+    analytes: np.ndarray  # Test name per series
+    units: np.ndarray  # Unit per series ("" when unknown)
+    offsets: np.ndarray  # Start of each series in the columns, plus the total length
+    timestamps: np.ndarray  # Epoch seconds, ascending within a series
+    values: np.ndarray
+    reference_low: np.ndarray  # NaN when unknown
+    reference_high: np.ndarray
+
+    @classmethod
+    def from_groups(cls, groups: Sequence[Sequence[Any]]) -> "LabSeries":
+        """Build from (test_name, unit, timestamps, values, lows, highs) rows"""
+        lengths = np.array([len(group[2]) for group in groups], dtype=np.int64)
+
+        def column(index: int) -> np.ndarray:
+            if not groups:
+                return np.empty(0, dtype=np.float64)
+            return np.concatenate([np.asarray(group[index], dtype=np.float64) for group in groups])
+
+        # Postgres already sorts each series by time; this keeps other callers correct
+        timestamps = column(2)
+        order = np.lexsort((timestamps, np.repeat(np.arange(len(groups)), lengths)))
+
+        return cls(
+            analytes=np.array([group[0] for group in groups], dtype=str),
+            units=np.array([group[1] or "" for group in groups], dtype=str),
+            offsets=np.concatenate(([0], np.cumsum(lengths))).astype(np.int64),
+            timestamps=timestamps[order],
+            values=column(3)[order],
+            reference_low=column(4)[order],
+            reference_high=column(5)[order],
+        )
+
+    def to_bytes(self) -> bytes:
+        buffer = io.BytesIO()
+        np.savez(buffer, **self.__dict__)
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "LabSeries":
+        with np.load(io.BytesIO(data), allow_pickle=False) as arrays:
+            return cls(**{name: arrays[name] for name in arrays.files})
+
+    def _select(self, start: Optional[float], end: Optional[float], series: np.ndarray) -> "LabSeries":
+        """Restrict to the given series and time range, keeping the layout"""
+        keep = np.zeros(len(self.values), dtype=bool)
+        lengths = np.zeros(len(series), dtype=np.int64)
+        for position, index in enumerate(series):
+            lo, hi = self.offsets[index], self.offsets[index + 1]
+            times = self.timestamps[lo:hi]
+            first = lo + (np.searchsorted(times, start, side="left") if start is not None else 0)
+            last = lo + (np.searchsorted(times, end, side="right") if end is not None else hi - lo)
+            keep[first:last] = True
+            lengths[position] = max(last - first, 0)
+
+        return LabSeries(
+            analytes=self.analytes[series],
+            units=self.units[series],
+            offsets=np.concatenate(([0], np.cumsum(lengths))).astype(np.int64),
+            timestamps=self.timestamps[keep],
+            values=self.values[keep],
+            reference_low=self.reference_low[keep],
+            reference_high=self.reference_high[keep],
+        )
+
+    def trends(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        analytes: Optional[List[str]] = None,
+        window: int = 5,
+        include_points: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Trend statistics per series within ``[start, end]``.
+
+        ``slope_per_year`` is the least-squares slope of value over time.
+        With ``include_points`` each series also carries its points with a
+        rolling mean over the previous ``window`` results.
+        """
+        series = np.arange(len(self.analytes))
+        if analytes:
+            series = series[np.isin(self.analytes, analytes)]
+        if start is None and end is None and not analytes:
+            selected = self
+        else:
+            selected = self._select(_epoch(start), _epoch(end), series)
+        return selected._statistics(window, include_points)
+
+    def _statistics(self, window: int, include_points: bool) -> List[Dict[str, Any]]:
+        lengths = np.diff(self.offsets)
+        non_empty = np.flatnonzero(lengths)
+        if not len(non_empty):
+            return []
+
+        starts = self.offsets[non_empty]
+        counts = lengths[non_empty]
+        t, v = self.timestamps, self.values
+
+        # Time relative to each series' first result keeps the sums well conditioned
+        t_rel = (t - np.repeat(t[starts], counts)) / SECONDS_PER_YEAR
+        sum_t = np.add.reduceat(t_rel, starts)
+        sum_v = np.add.reduceat(v, starts)
+        sum_tt = np.add.reduceat(t_rel * t_rel, starts)
+        sum_tv = np.add.reduceat(t_rel * v, starts)
+        denominator = counts * sum_tt - sum_t * sum_t
+        with np.errstate(divide="ignore", invalid="ignore"):
+            slopes = np.where(denominator > 0, (counts * sum_tv - sum_t * sum_v) / denominator, np.nan)
+
+        out_of_range = (v < self.reference_low) | (v > self.reference_high)
+        abnormal = np.add.reduceat(out_of_range.astype(np.int64), starts)
+        minimums = np.minimum.reduceat(v, starts)
+        maximums = np.maximum.reduceat(v, starts)
+        lasts = starts + counts - 1
+        lows, highs = self.reference_low[lasts], self.reference_high[lasts]
+
+        rolling = self._rolling_mean(window) if include_points else None
+
+        trends = []
+        for position, index in enumerate(non_empty):
+            last = lasts[position]
+            trend = {
+                "analyte": str(self.analytes[index]),
+                "unit": str(self.units[index]) or None,
+                "count": int(counts[position]),
+                "first_date": _iso(t[starts[position]]),
+                "last_date": _iso(t[last]),
+                "latest_value": float(v[last]),
+                "latest_out_of_range": bool(out_of_range[last]),
+                "min": float(minimums[position]),
+                "max": float(maximums[position]),
+                "mean": float(sum_v[position] / counts[position]),
+                "slope_per_year": None if np.isnan(slopes[position]) else float(slopes[position]),
+                "out_of_range_count": int(abnormal[position]),
+                "reference_low": None if np.isnan(lows[position]) else float(lows[position]),
+                "reference_high": None if np.isnan(highs[position]) else float(highs[position]),
+            }
+            if include_points:
+                segment = slice(starts[position], last + 1)
+                trend["points"] = [
+                    {"date": _iso(ts), "value": value, "rolling_mean": mean, "out_of_range": flag}
+                    for ts, value, mean, flag in zip(
+                        t[segment].tolist(),
+                        v[segment].tolist(),
+                        rolling[segment].tolist(),
+                        out_of_range[segment].tolist(),
+                    )
+                ]
+            trends.append(trend)
+
+        return trends
+
+    def _rolling_mean(self, window: int) -> np.ndarray:
+        """Mean of each result and up to ``window - 1`` previous ones in the same series"""
+        lengths = np.diff(self.offsets)
+        positions = np.arange(len(self.values))
+        series_starts = np.repeat(self.offsets[:-1], lengths)
+        window_starts = np.maximum(positions - window + 1, series_starts)
+
+        # Centring each series on its mean keeps the running sum near zero at
+        # every series boundary, so earlier series do not cost precision
+        series_index = np.repeat(np.arange(len(lengths)), lengths)
+        sums = np.bincount(series_index, weights=self.values, minlength=len(lengths))
+        means = sums / np.maximum(lengths, 1)
+        centred = self.values - means[series_index]
+        cumulative = np.concatenate(([0.0], np.cumsum(centred)))
+        window_sums = cumulative[positions + 1] - cumulative[window_starts]
+        return means[series_index] + window_sums / (positions + 1 - window_starts)
+
+
+async def _query_series(db: AsyncSession, profile_id) -> LabSeries:
+    epoch = func.extract("epoch", LabResult.result_date)
+    rows = (await db.execute(
+        select(
+            LabResult.test_name,
+            LabResult.unit,
+            func.array_agg(aggregate_order_by(epoch, LabResult.result_date)),
+            func.array_agg(aggregate_order_by(LabResult.value, LabResult.result_date)),
+            func.array_agg(aggregate_order_by(LabResult.reference_low, LabResult.result_date)),
+            func.array_agg(aggregate_order_by(LabResult.reference_high, LabResult.result_date)),
+        )
+        .where(LabResult.profile_id == profile_id, LabResult.value.isnot(None))
+        .group_by(LabResult.test_name, LabResult.unit)
+        .order_by(LabResult.test_name, LabResult.unit)
+    )).all()
+
+    # NULL reference bounds arrive as None and become NaN
+    return LabSeries.from_groups(rows)
+
+
+async def load_lab_series(db: AsyncSession, profile_id) -> LabSeries:
+    """Get a profile's lab series from the cache, loading them if outdated"""
+    client = get_redis()
+    key = _cache_key(profile_id)
+    revision = await get_section_revision(profile_id, "lab_results")
+
+    try:
+        cached_revision, data = await client.hmget(key, ["rev", "data"])
+        if data is not None and int(cached_revision) == revision:
+            return LabSeries.from_bytes(data)
+    except redis.RedisError as e:
+        logger.warning(f"Lab series cache unavailable: {e}")
+
+    series = await _query_series(db, profile_id)
+    try:
+        pipe = client.pipeline()
+        pipe.hset(key, mapping={"rev": revision, "data": series.to_bytes()})
+        pipe.expire(key, settings.DASHBOARD_CACHE_TTL)
+        await pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Failed to cache lab series for {profile_id}: {e}")
+
+    return series
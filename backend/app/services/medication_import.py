@@ -0,0 +1,247 @@
+"""
+Bulk medication import.
+
+The request body (NDJSON or CSV) is parsed as it streams in. Each record is
+validated on its own; valid ones are buffered and written with a multi-row
+``INSERT ... RETURNING`` every ``MEDICATION_IMPORT_CHUNK_SIZE`` rows, all in
+one transaction. Invalid records, including ones naming a visit outside
+the profile, are reported by row number and do not stop the import.
+"""
+
+import codecs
+import csv
+import json
+import logging
+import uuid
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple
+
+import pydantic
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.exceptions import ValidationError
+from app.models.medical_visit import MedicalVisit
+from app.models.medication import Medication
+from app.schemas.medication import MedicationImportRow
+
+logger = logging.getLogger(__name__)
+
+MAX_REPORTED_ERRORS = 1000
+
+# Media types accepted for each import format
+FORMATS = {
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "application/json-lines": "ndjson",
+    "text/csv": "csv",
+    "application/csv": "csv",
+}
+
+# (row number, record or None, errors)
+ParsedRow = Tuple[int, Optional[Dict[str, Any]], List[Dict[str, Any]]]
+
+
+def detect_format(content_type: Optional[str]) -> str:
+    """Map the request's Content-Type to an import format"""
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    try:
+        return FORMATS[media_type]
+    except KeyError:
+        raise ValidationError(
+            "Unsupported import format",
+            details={"content_type": media_type, "allowed_types": list(FORMATS)}
+        )
+
+
+async def _iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decode a UTF-8 byte stream into lines without their terminators"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    try:
+        async for chunk in chunks:
+            buffer += decoder.decode(chunk)
+            *lines, buffer = buffer.split("\n")
+            for line in lines:
+                yield line.rstrip("\r")
+        buffer += decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        raise ValidationError("Import body is not valid UTF-8")
+    if buffer:
+        yield buffer.rstrip("\r")
+
+
+def _error(message: str) -> List[Dict[str, Any]]:
+    return [{"type": "parse_error", "loc": [], "msg": message}]
+
+
+async def _parse_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[ParsedRow]:
+    row = 0
+    async for line in _iter_lines(chunks):
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield row, None, _error(f"Invalid JSON: {e}")
+            continue
+        if not isinstance(record, dict):
+            yield row, None, _error("Each line must be a JSON object")
+            continue
+        yield row, record, []
+
+
+async def _parse_csv(chunks: AsyncIterator[bytes]) -> AsyncIterator[ParsedRow]:
+    header: Optional[List[str]] = None
+    row = 0
+    pending = ""
+    async for line in _iter_lines(chunks):
+        # A quoted field may contain newlines: wait until the quotes balance
+        pending = f"{pending}\n{line}" if pending else line
+        if pending.count('"') % 2:
+            continue
+        text, pending = pending, ""
+        if not text.strip():
+            continue
+
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip().lower() for name in values]
+            continue
+
+        row += 1
+        if len(values) != len(header):
+            yield row, None, _error(f"Expected {len(header)} columns, got {len(values)}")
+            continue
+        # Empty cells mean "not given"
+        yield row, {k: v.strip() for k, v in zip(header, values) if v.strip()}, []
+
+    if pending:
+        yield row + 1, None, _error("Unterminated quoted field")
+
+
+def _validation_errors(error: pydantic.ValidationError) -> List[Dict[str, Any]]:
+    return error.errors(include_url=False, include_context=False, include_input=False)
+
+
+async def profile_visit_ids(
+    db: AsyncSession,
+    profile_id: uuid.UUID,
+    visit_ids: Iterable[uuid.UUID]
+) -> Set[uuid.UUID]:
+    """The given visit ids that belong to the profile"""
+    visit_ids = set(visit_ids)
+    if not visit_ids:
+        return set()
+    result = await db.scalars(
+        select(MedicalVisit.id).where(
+            MedicalVisit.id.in_(visit_ids),
+            MedicalVisit.profile_id == profile_id,
+        )
+    )
+    return set(result)
+
+
+def _visit_error(visit_id: uuid.UUID) -> List[Dict[str, Any]]:
+    return [{
+        "type": "visit_not_found",
+        "loc": ["visit_id"],
+        "msg": f"Visit {visit_id} not found in this profile",
+    }]
+
+
+async def _insert_chunk(
+    db: AsyncSession,
+    profile_id: uuid.UUID,
+    rows: List[Tuple[int, Dict[str, Any]]]
+) -> Tuple[List[uuid.UUID], List[Dict[str, Any]]]:
+    """Insert the rows whose visit belongs to the profile; returns ids and row errors"""
+    visits = await profile_visit_ids(
+        db, profile_id, (record["visit_id"] for _, record in rows if record["visit_id"])
+    )
+    records, errors = [], []
+    for row, record in rows:
+        if record["visit_id"] and record["visit_id"] not in visits:
+            errors.append({"row": row, "errors": _visit_error(record["visit_id"])})
+        else:
+            records.append(record)
+    if not records:
+        return [], errors
+
+    result = await db.execute(
+        insert(Medication).values(records).returning(Medication.id)
+    )
+    return list(result.scalars()), errors
+
+
+async def import_medications(
+    db: AsyncSession,
+    profile_id: uuid.UUID,
+    chunks: AsyncIterator[bytes],
+    import_format: str
+) -> Dict[str, Any]:
+    """Validate and insert streamed medication records for a profile"""
+    parse = _parse_ndjson if import_format == "ndjson" else _parse_csv
+    chunk_size = settings.MEDICATION_IMPORT_CHUNK_SIZE
+
+    received = failed = 0
+    ids: List[uuid.UUID] = []
+    errors: List[Dict[str, Any]] = []
+    buffer: List[Tuple[int, Dict[str, Any]]] = []
+
+    async def flush() -> None:
+        nonlocal failed
+        inserted, chunk_errors = await _insert_chunk(db, profile_id, buffer)
+        ids.extend(inserted)
+        failed += len(chunk_errors)
+        errors.extend(chunk_errors[:MAX_REPORTED_ERRORS - len(errors)])
+
+    try:
+        async for row, record, row_errors in parse(chunks):
+            received += 1
+            if received > settings.MEDICATION_IMPORT_MAX_ROWS:
+                raise ValidationError(
+                    f"Imports are limited to {settings.MEDICATION_IMPORT_MAX_ROWS} rows"
+                )
+
+            if record is not None:
+                try:
+                    medication = MedicationImportRow.model_validate(record)
+                except pydantic.ValidationError as e:
+                    row_errors = _validation_errors(e)
+
+            if row_errors:
+                failed += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append({"row": row, "errors": row_errors})
+                continue
+
+            buffer.append(
+                (row, {**medication.model_dump(), "id": uuid.uuid4(), "profile_id": profile_id})
+            )
+            if len(buffer) >= chunk_size:
+                await flush()
+                buffer = []
+
+        if buffer:
+            await flush()
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        logger.error(f"Medication import for profile {profile_id} failed: {e.orig}")
+        raise ValidationError("Import failed; no medications were saved")
+    except Exception:
+        await db.rollback()
+        raise
+
+    return {
+        "profile_id": profile_id,
+        "received": received,
+        "inserted": len(ids),
+        "failed": failed,
+        "ids": ids,
+        "errors": errors,
+        "errors_truncated": failed > len(errors),
+    }
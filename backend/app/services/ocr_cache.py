@@ -0,0 +1,132 @@
+"""
+Page-level OCR result cache.
+
+Recognised text is cached in Redis under an exact hash of the rasterised
+page pixels, so recurring pages (letterheads, insurance cards, cover
+sheets) skip Tesseract entirely. An exact hash is used rather than a
+perceptual one: pages that look alike but differ in a name or a value must
+not share text.
+
+Redis also serves as the Celery broker, so the cache cannot rely on a
+server-wide eviction policy. It keeps its own LRU order in a sorted set and
+evicts the least recently used pages once the stored text exceeds
+``max_bytes``. Hit, miss and eviction counters are kept in Redis so they
+cover every worker.
+"""
+
+import hashlib
+import logging
+import time
+from typing import Dict, Optional
+
+import redis
+from PIL import Image
+
+from app.core.cache import get_sync_redis
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "ocr:page:"
+LRU_KEY = "ocr:pages:lru"
+STATS_KEY = "ocr:pages:stats"
+
+# Bump to invalidate every cached page, e.g. after a Tesseract upgrade
+CACHE_VERSION = "1"
+
+# KEYS: entry, LRU set, stats. ARGV: now
+GET_SCRIPT = """
+local value = redis.call('GET', KEYS[1])
+if value then
+    redis.call('ZADD', KEYS[2], ARGV[1], KEYS[1])
+    redis.call('HINCRBY', KEYS[3], 'hits', 1)
+else
+    redis.call('HINCRBY', KEYS[3], 'misses', 1)
+end
+return value
+"""
+
+# KEYS: entry, LRU set, stats. ARGV: value, now, max bytes
+SET_SCRIPT = """
+local previous = redis.call('STRLEN', KEYS[1])
+redis.call('SET', KEYS[1], ARGV[1])
+redis.call('ZADD', KEYS[2], ARGV[2], KEYS[1])
+local total = redis.call('HINCRBY', KEYS[3], 'bytes', string.len(ARGV[1]) - previous)
+local evicted = 0
+while total > tonumber(ARGV[3]) do
+    local oldest = redis.call('ZPOPMIN', KEYS[2])
+    if #oldest == 0 then
+        break
+    end
+    local size = redis.call('STRLEN', oldest[1])
+    redis.call('DEL', oldest[1])
+    total = redis.call('HINCRBY', KEYS[3], 'bytes', -size)
+    evicted = evicted + 1
+end
+if evicted > 0 then
+    redis.call('HINCRBY', KEYS[3], 'evictions', evicted)
+end
+return evicted
+"""
+
+
+def page_hash(image: Image.Image, language: str) -> str:
+    """Exact hash of a rasterised page and the recognition language"""
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(f"{CACHE_VERSION}:{language}:{image.mode}:{image.width}x{image.height}:".encode())
+    digest.update(image.tobytes())
+    return digest.hexdigest()
+
+
+class OCRPageCache:
+    """LRU cache of recognised page text with a total size budget"""
+
+    def __init__(
+        self,
+        client: Optional[redis.Redis] = None,
+        max_bytes: int = settings.OCR_CACHE_MAX_BYTES
+    ):
+        self.client = client or get_sync_redis()
+        self.max_bytes = max_bytes
+        self._get = self.client.register_script(GET_SCRIPT)
+        self._set = self.client.register_script(SET_SCRIPT)
+
+    def get(self, key: str) -> Optional[str]:
+        """Get cached text for a page hash, counting the hit or miss"""
+        try:
+            value = self._get(keys=[KEY_PREFIX + key, LRU_KEY, STATS_KEY], args=[time.time()])
+        except redis.RedisError as e:
+            logger.warning(f"OCR cache lookup failed: {e}")
+            return None
+        return value.decode("utf-8") if value is not None else None
+
+    def set(self, key: str, text: str) -> None:
+        """Cache text for a page hash, evicting least recently used pages"""
+        try:
+            self._set(
+                keys=[KEY_PREFIX + key, LRU_KEY, STATS_KEY],
+                args=[text.encode("utf-8"), time.time(), self.max_bytes],
+            )
+        except redis.RedisError as e:
+            logger.warning(f"OCR cache store failed: {e}")
+
+    def stats(self) -> Dict[str, float]:
+        """Get hit/miss counters and the current cache size"""
+        pipe = self.client.pipeline()
+        pipe.hgetall(STATS_KEY)
+        pipe.zcard(LRU_KEY)
+        counters, entries = pipe.execute()
+        counters = {k.decode(): int(v) for k, v in counters.items()}
+
+        hits = counters.get("hits", 0)
+        misses = counters.get("misses", 0)
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "evictions": counters.get("evictions", 0),
+            "bytes": counters.get("bytes", 0),
+            "max_bytes": self.max_bytes,
+            "entries": entries,
+        }
@@ -0,0 +1,94 @@
+"""
+Async password hashing on a bounded worker pool.
+
+bcrypt is deliberately slow, and calling it inside an async handler blocks
+the event loop for every other request on the worker. Hashing and
+verification run on a dedicated thread pool instead (the bcrypt extension
+releases the GIL while hashing). Admission control caps the number of
+queued operations: once ``max_queue`` operations are waiting for a
+worker, new ones are rejected with ``RateLimitError`` instead of piling up
+behind a login burst.
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Tuple
+
+from app.core.config import settings
+from app.core.exceptions import RateLimitError
+from app.core.security import get_password_hash, verify_password
+
+
+class PasswordHashingService:
+    """Run password hashing and verification off the event loop"""
+
+    def __init__(
+        self,
+        workers: int = settings.PASSWORD_HASH_WORKERS,
+        max_queue: int = settings.PASSWORD_HASH_MAX_QUEUE
+    ):
+        self.workers = max(1, workers)
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+        self._total_wait_seconds = 0.0
+        self._max_wait_seconds = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        """Operations waiting for a free worker"""
+        return max(0, self._in_flight - self.workers)
+
+    async def _run(self, func: Callable[..., Any], *args) -> Any:
+        if self.queue_depth >= self.max_queue:
+            self._rejected += 1
+            raise RateLimitError("Too many authentication requests, please retry shortly")
+
+        submitted = time.perf_counter()
+
+        def timed() -> Tuple[float, Any]:
+            return time.perf_counter() - submitted, func(*args)
+
+        self._in_flight += 1
+        try:
+            wait, result = await asyncio.get_running_loop().run_in_executor(self._executor, timed)
+        finally:
+            self._in_flight -= 1
+
+        # Counters are only touched on the event loop thread
+        self._completed += 1
+        self._total_wait_seconds += wait
+        self._max_wait_seconds = max(self._max_wait_seconds, wait)
+        return result
+
+    async def hash(self, password: str) -> str:
+        """Hash a password"""
+        return await self._run(get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password against its hash"""
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool utilisation and queueing counters"""
+        return {
+            "workers": self.workers,
+            "in_flight": self._in_flight,
+            "queue_depth": self.queue_depth,
+            "max_queue": self.max_queue,
+            "completed": self._completed,
+            "rejected": self._rejected,
+            "avg_wait_seconds": self._total_wait_seconds / self._completed if self._completed else 0.0,
+            "max_wait_seconds": self._max_wait_seconds,
+        }
+
+    def shutdown(self) -> None:
+        """Stop the worker threads"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_hasher = PasswordHashingService()
@@ -0,0 +1,112 @@
+"""
+Readiness probes for the API's dependencies.
+
+Postgres, Redis and MinIO are probed concurrently, each with its own
+timeout, and the combined result is cached for a short interval. However
+often the load balancer polls ``/ready``, every process sends at most one
+round of probes per interval; concurrent polls while a round is running
+wait for it instead of starting another.
+"""
+
+import asyncio
+import time
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import urllib3
+from fastapi.concurrency import run_in_threadpool
+from minio import Minio
+
+from app.core.cache import get_redis
+from app.core.config import settings
+from app.core.database import engine
+
+
+@lru_cache()
+def _probe_minio_client() -> Minio:
+    """MinIO client that fails fast instead of retrying"""
+    timeout = settings.READINESS_PROBE_TIMEOUT
+    return Minio(
+        settings.MINIO_ENDPOINT,
+        access_key=settings.MINIO_ACCESS_KEY,
+        secret_key=settings.MINIO_SECRET_KEY,
+        secure=settings.MINIO_SECURE,
+        http_client=urllib3.PoolManager(
+            timeout=urllib3.Timeout(connect=timeout, read=timeout),
+            retries=False,
+        ),
+    )
+
+
+async def _probe_postgres() -> None:
+    async with engine.connect() as conn:
+        await conn.exec_driver_sql("SELECT 1")
+
+
+async def _probe_redis() -> None:
+    await get_redis().ping()
+
+
+async def _probe_minio() -> None:
+    exists = await run_in_threadpool(_probe_minio_client().bucket_exists, settings.MINIO_BUCKET_NAME)
+    if not exists:
+        raise RuntimeError(f"Bucket {settings.MINIO_BUCKET_NAME} does not exist")
+
+
+PROBES: Dict[str, Callable[[], Awaitable[None]]] = {
+    "postgres": _probe_postgres,
+    "redis": _probe_redis,
+    "minio": _probe_minio,
+}
+
+
+async def _run_probe(probe: Callable[[], Awaitable[None]]) -> Dict[str, Any]:
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(probe(), timeout=settings.READINESS_PROBE_TIMEOUT)
+        status, error = "ok", None
+    except asyncio.TimeoutError:
+        status, error = "timeout", f"No response within {settings.READINESS_PROBE_TIMEOUT}s"
+    except Exception as e:
+        status, error = "error", str(e)
+
+    return {
+        "status": status,
+        "latency_ms": round((time.perf_counter() - started) * 1000, 2),
+        "error": error,
+    }
+
+
+class ReadinessChecker:
+    """Runs the dependency probes and caches their combined result"""
+
+    def __init__(self, cache_seconds: float):
+        self.cache_seconds = cache_seconds
+        self._result: Optional[Dict[str, Any]] = None
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def _probe_all(self) -> Dict[str, Any]:
+        names = list(PROBES)
+        results = await asyncio.gather(*(_run_probe(PROBES[name]) for name in names))
+        checks = dict(zip(names, results))
+        return {
+            "ready": all(check["status"] == "ok" for check in checks.values()),
+            "checked_at": time.time(),
+            "checks": checks,
+        }
+
+    async def check(self) -> Dict[str, Any]:
+        """Get the latest readiness result, probing if the cached one expired"""
+        if self._result is not None and time.monotonic() < self._expires_at:
+            return self._result
+
+        async with self._lock:
+            # Another poll may have refreshed the result while this one waited
+            if self._result is None or time.monotonic() >= self._expires_at:
+                self._result = await self._probe_all()
+                self._expires_at = time.monotonic() + self.cache_seconds
+            return self._result
+
+
+readiness_checker = ReadinessChecker(settings.READINESS_CACHE_SECONDS)
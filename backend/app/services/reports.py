@@ -0,0 +1,446 @@
+"""
+Health report generation.
+
+Report rows are read with server-side cursors (``yield_per``), rendered as
+they arrive and written straight into a multipart upload, so memory stays
+bounded by the fetch size and the upload part size however many records a
+profile has.
+
+CSV reports are written in chunks through the standard ``csv`` module.
+PDF reports are written page by page by ``StreamingPDFWriter``, a small
+PDF writer that emits each page as soon as it is full; reportlab's canvas
+keeps the whole document in memory until it is saved, so it is only used
+here for font metrics.
+"""
+
+import csv
+import io
+import uuid
+import zlib
+from dataclasses import dataclass
+from functools import lru_cache
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.exceptions import NotFoundError, ValidationError
+from app.models.lab_result import LabResult
+from app.models.medical_visit import MedicalVisit
+from app.models.medication import Medication
+from app.models.profile import Profile
+from app.services.storage import SyncMultipartObjectWriter, presigned_download_url
+
+Sink = Callable[[bytes], None]
+
+
+def _text(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, float):
+        return f"{value:g}"
+    return " ".join(str(value).split())
+
+
+def _reference_range(low: Optional[float], high: Optional[float]) -> str:
+    if low is None and high is None:
+        return ""
+    return f"{_text(low)}-{_text(high)}"
+
+
+@dataclass
+class Section:
+    title: str
+    headers: List[str]
+    widths: List[float]  # Share of the page width per column (PDF)
+    query: Callable[[uuid.UUID], Any]
+    row: Callable[[Any], List[str]]
+
+
+SECTIONS: Dict[str, Section] = {
+    "visits": Section(
+        title="Medical visits",
+        headers=["Date", "Type", "Provider", "Facility", "Reason", "Diagnosis"],
+        widths=[0.11, 0.11, 0.17, 0.17, 0.22, 0.22],
+        query=lambda profile_id: (
+            select(
+                MedicalVisit.visit_date,
+                MedicalVisit.visit_type,
+                MedicalVisit.provider_name,
+                MedicalVisit.facility,
+                MedicalVisit.reason,
+                MedicalVisit.diagnosis,
+            )
+            .where(MedicalVisit.profile_id == profile_id)
+            .order_by(MedicalVisit.visit_date, MedicalVisit.id)
+        ),
+        row=lambda r: [_text(value) for value in r],
+    ),
+    "lab_results": Section(
+        title="Lab results",
+        headers=["Date", "Test", "Result", "Unit", "Reference range", "Notes"],
+        widths=[0.11, 0.25, 0.12, 0.1, 0.14, 0.28],
+        query=lambda profile_id: (
+            select(
+                LabResult.result_date,
+                LabResult.test_name,
+                LabResult.value,
+                LabResult.value_text,
+                LabResult.unit,
+                LabResult.reference_low,
+                LabResult.reference_high,
+                LabResult.notes,
+            )
+            .where(LabResult.profile_id == profile_id)
+            .order_by(LabResult.result_date, LabResult.id)
+        ),
+        row=lambda r: [
+            _text(r.result_date),
+            _text(r.test_name),
+            _text(r.value if r.value is not None else r.value_text),
+            _text(r.unit),
+            _reference_range(r.reference_low, r.reference_high),
+            _text(r.notes),
+        ],
+    ),
+    "medications": Section(
+        title="Medications",
+        headers=["Name", "Dosage", "Frequency", "Start", "End", "Active", "Prescribed by"],
+        widths=[0.22, 0.12, 0.14, 0.11, 0.11, 0.08, 0.22],
+        query=lambda profile_id: (
+            select(
+                Medication.name,
+                Medication.dosage,
+                Medication.frequency,
+                Medication.start_date,
+                Medication.end_date,
+                Medication.is_active,
+                Medication.prescribed_by,
+            )
+            .where(Medication.profile_id == profile_id)
+            .order_by(Medication.start_date.nulls_first(), Medication.name, Medication.id)
+        ),
+        row=lambda r: [
+            _text(r.name),
+            _text(r.dosage),
+            _text(r.frequency),
+            _text(r.start_date),
+            _text(r.end_date),
+            "yes" if r.is_active else "no",
+            _text(r.prescribed_by),
+        ],
+    ),
+}
+
+# Sections included in each report type
+REPORT_TYPES: Dict[str, List[str]] = {
+    "full": ["visits", "lab_results", "medications"],
+    "visits": ["visits"],
+    "lab_results": ["lab_results"],
+    "medications": ["medications"],
+}
+
+
+class CSVReportWriter:
+    """Sections as blocks of a title row, a header row and the data rows"""
+    content_type = "text/csv"
+    extension = "csv"
+    flush_bytes = 64 * 1024
+
+    def __init__(self, sink: Sink):
+        self._sink = sink
+        self._buffer = io.StringIO()
+        self._csv = csv.writer(self._buffer)
+
+    def begin(self, title: str, subtitle: str) -> None:
+        self._csv.writerow([title])
+        self._csv.writerow([subtitle])
+
+    def section(self, section: Section) -> None:
+        self._csv.writerow([])
+        self._csv.writerow([section.title])
+        self._csv.writerow(section.headers)
+
+    def row(self, values: Sequence[str]) -> None:
+        self._csv.writerow(values)
+        if self._buffer.tell() >= self.flush_bytes:
+            self._flush()
+
+    def finish(self) -> None:
+        self._flush()
+
+    def _flush(self) -> None:
+        self._sink(self._buffer.getvalue().encode("utf-8"))
+        self._buffer.seek(0)
+        self._buffer.truncate()
+
+
+@lru_cache(maxsize=4096)
+def _fit_text(text: str, width: float, font: str, size: float) -> str:
+    """Truncate text to a column width (cached: test names and units repeat)"""
+    text_width = stringWidth(text, font, size)
+    if text_width <= width:
+        return text
+    # Cut in proportion to the overflow, then trim the last few characters
+    text = text[:int(len(text) * width / text_width)]
+    while text and stringWidth(text + "...", font, size) > width:
+        text = text[:-1]
+    return text + "..."
+
+
+def _pdf_string(text: str) -> str:
+    encoded = text.encode("cp1252", errors="replace").decode("latin-1")
+    return "(" + encoded.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ")"
+
+
+class StreamingPDFWriter:
+    """
+    Tabular PDF written one page at a time.
+
+    Each page is compressed and handed to the sink as soon as it is full.
+    Only object offsets and page object numbers are kept until the page
+    tree and cross-reference table are written at the end.
+    """
+    content_type = "application/pdf"
+    extension = "pdf"
+
+    page_width, page_height = 595.0, 842.0  # A4
+    margin = 40.0
+    font_size = 7.5
+    line_height = 10.5
+    fonts = {"F1": "Helvetica", "F2": "Helvetica-Bold"}
+
+    # Fixed object numbers; pages are numbered after them
+    CATALOG, PAGES, FONT, BOLD_FONT = 1, 2, 3, 4
+
+    def __init__(self, sink: Sink):
+        self._sink = sink
+        self._position = 0
+        self._offsets: Dict[int, int] = {}
+        self._next_object = 5
+        self._page_objects: List[int] = []
+        self._ops: List[str] = []
+        self._y = 0.0
+        self._title = ""
+        self._section: Optional[Section] = None
+        self._columns: List[float] = []
+
+    def _write(self, data: bytes) -> None:
+        self._sink(data)
+        self._position += len(data)
+
+    def _write_object(self, number: int, body: bytes) -> None:
+        self._offsets[number] = self._position
+        self._write(f"{number} 0 obj\n".encode() + body + b"\nendobj\n")
+
+    def _allocate(self) -> int:
+        number = self._next_object
+        self._next_object += 1
+        return number
+
+    def _text(self, x: float, text: str, font: str = "F1", size: Optional[float] = None) -> None:
+        self._ops.append(
+            f"BT /{font} {size or self.font_size} Tf {x:.2f} {self._y:.2f} Td {_pdf_string(text)} Tj ET"
+        )
+
+    def _fit(self, text: str, width: float, font: str = "F1") -> str:
+        return _fit_text(text, width, self.fonts[font], self.font_size)
+
+    def begin(self, title: str, subtitle: str) -> None:
+        self._write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        for number, name in ((self.FONT, "Helvetica"), (self.BOLD_FONT, "Helvetica-Bold")):
+            self._write_object(
+                number,
+                (
+                    f"<< /Type /Font /Subtype /Type1 /BaseFont /{name} "
+                    f"/Encoding /WinAnsiEncoding >>"
+                ).encode(),
+            )
+        self._title = title
+        self._new_page()
+        self._text(self.margin, subtitle, size=9)
+        self._y -= self.line_height * 1.5
+
+    def _new_page(self) -> None:
+        if self._ops:
+            self._end_page()
+        self._y = self.page_height - self.margin
+        self._text(self.margin, self._title, font="F2", size=12)
+        self._y -= self.line_height * 2
+
+    def _end_page(self) -> None:
+        page_number = len(self._page_objects) + 1
+        saved_y, self._y = self._y, self.margin / 2
+        self._text(self.page_width - self.margin - 40, f"Page {page_number}")
+        self._y = saved_y
+
+        content = zlib.compress("\n".join(self._ops).encode("latin-1"))
+        self._ops = []
+        content_object, page_object = self._allocate(), self._allocate()
+        self._write_object(
+            content_object,
+            f"<< /Length {len(content)} /Filter /FlateDecode >>\nstream\n".encode()
+            + content + b"\nendstream",
+        )
+        self._write_object(
+            page_object,
+            (
+                f"<< /Type /Page /Parent {self.PAGES} 0 R "
+                f"/MediaBox [0 0 {self.page_width:g} {self.page_height:g}] "
+                f"/Resources << /Font << /F1 {self.FONT} 0 R /F2 {self.BOLD_FONT} 0 R >> >> "
+                f"/Contents {content_object} 0 R >>"
+            ).encode(),
+        )
+        self._page_objects.append(page_object)
+
+    def _ensure_space(self, lines: float) -> None:
+        if self._y - lines * self.line_height < self.margin:
+            self._new_page()
+            if self._section is not None:
+                self._table_header()
+
+    def _table_header(self) -> None:
+        for x, header, width in zip(self._columns, self._section.headers, self._section.widths):
+            self._text(x, self._fit(header, self._usable * width - 4, "F2"), font="F2")
+        self._y -= self.line_height
+
+    @property
+    def _usable(self) -> float:
+        return self.page_width - 2 * self.margin
+
+    def section(self, section: Section) -> None:
+        self._section = None
+        self._ensure_space(4)
+        self._y -= self.line_height * 0.5
+        self._text(self.margin, section.title, font="F2", size=10)
+        self._y -= self.line_height * 1.5
+
+        self._section = section
+        self._columns = []
+        x = self.margin
+        for width in section.widths:
+            self._columns.append(x)
+            x += self._usable * width
+        self._table_header()
+
+    def row(self, values: Sequence[str]) -> None:
+        self._ensure_space(1)
+        for x, value, width in zip(self._columns, values, self._section.widths):
+            if value:
+                self._text(x, self._fit(value, self._usable * width - 4))
+        self._y -= self.line_height
+
+    def finish(self) -> None:
+        self._end_page()
+        kids = " ".join(f"{number} 0 R" for number in self._page_objects)
+        self._write_object(
+            self.PAGES,
+            f"<< /Type /Pages /Kids [{kids}] /Count {len(self._page_objects)} >>".encode(),
+        )
+        self._write_object(self.CATALOG, f"<< /Type /Catalog /Pages {self.PAGES} 0 R >>".encode())
+
+        xref_offset = self._position
+        size = self._next_object
+        entries = [b"0000000000 65535 f \n"]
+        entries.extend(
+            f"{self._offsets[number]:010d} 00000 n \n".encode() for number in range(1, size)
+        )
+        self._write(f"xref\n0 {size}\n".encode() + b"".join(entries))
+        self._write(
+            f"trailer\n<< /Size {size} /Root {self.CATALOG} 0 R >>\n"
+            f"startxref\n{xref_offset}\n%%EOF\n".encode()
+        )
+
+
+FORMATS = {
+    "pdf": StreamingPDFWriter,
+    "csv": CSVReportWriter,
+}
+
+
+def render_report(
+    db: Session,
+    profile: Profile,
+    report_type: str,
+    writer: Any
+) -> int:
+    """Stream a profile's records into a report writer; returns the row count"""
+    name = " ".join(part for part in (profile.first_name, profile.last_name) if part)
+    generated = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
+    writer.begin(
+        f"Health report: {name}",
+        f"{report_type.replace('_', ' ').title()} report, generated {generated}",
+    )
+
+    rows = 0
+    for section_name in REPORT_TYPES[report_type]:
+        section = SECTIONS[section_name]
+        writer.section(section)
+        result = db.execute(
+            section.query(profile.id).execution_options(yield_per=settings.REPORT_FETCH_SIZE)
+        )
+        for row in result:
+            writer.row(section.row(row))
+            rows += 1
+    writer.finish()
+    return rows
+
+
+def generate_report(
+    db: Session,
+    profile_id: uuid.UUID,
+    report_type: str,
+    output_format: str = "pdf"
+) -> Dict[str, Any]:
+    """Render a report into object storage and sign a download URL for it"""
+    if report_type not in REPORT_TYPES:
+        raise ValidationError(
+            "Unknown report type",
+            details={"report_type": report_type, "allowed_types": list(REPORT_TYPES)}
+        )
+    if output_format not in FORMATS:
+        raise ValidationError(
+            "Unknown report format",
+            details={"format": output_format, "allowed_formats": list(FORMATS)}
+        )
+    profile = db.get(Profile, profile_id)
+    if profile is None:
+        raise NotFoundError("Profile not found")
+
+    writer_class = FORMATS[output_format]
+    object_name = f"reports/{profile.user_id}/{profile.id}/{uuid.uuid4()}.{writer_class.extension}"
+    upload = SyncMultipartObjectWriter(object_name, content_type=writer_class.content_type)
+    size = 0
+
+    def sink(data: bytes) -> None:
+        nonlocal size
+        size += len(data)
+        upload.write(data)
+
+    try:
+        # Keep the server-side cursors in one read-only transaction
+        rows = render_report(db, profile, report_type, writer_class(sink))
+        upload.complete()
+    except Exception:
+        upload.abort()
+        raise
+    finally:
+        db.rollback()
+
+    expires = timedelta(seconds=settings.REPORT_URL_EXPIRE_SECONDS)
+    filename = f"health-report-{report_type}-{date.today().isoformat()}.{writer_class.extension}"
+    return {
+        "object_name": object_name,
+        "format": output_format,
+        "rows": rows,
+        "size": size,
+        "url": presigned_download_url(object_name, expires, filename),
+        "expires_at": (datetime.now(timezone.utc) + expires).isoformat(),
+    }
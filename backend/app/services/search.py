@@ -0,0 +1,191 @@
+"""
+Full-text search over documents.
+
+Each document carries a ``search_vector`` (title weighted above OCR text)
+behind a GIN index. It is refreshed by ``index_document`` when a document
+is uploaded and when its OCR finishes, which also adds the document's
+lexemes to the user's ``document_terms`` vocabulary.
+
+Queries use ``websearch_to_tsquery`` syntax and are ranked with
+``ts_rank_cd``; snippets are highlighted with ``ts_headline`` for the
+returned page only. When a query matches nothing, each word is replaced by
+the most similar term of the user's vocabulary (trigram similarity, served
+by a GIN trigram index) and the corrected query is tried instead.
+"""
+
+import re
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import Text, and_, func, literal_column, select, type_coerce, update
+from sqlalchemy.dialects.postgresql import TSVECTOR, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.document import Document, DocumentTerm
+
+SEARCH_CONFIG = "english"
+HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=20, MinWords=8"
+# ts_rank_cd normalisation: rank / (rank + 1), so scores fall in [0, 1)
+RANK_NORMALIZATION = 32
+# Vocabulary terms: alphabetic lexemes of a useful length
+MIN_TERM_LENGTH = 4
+MAX_TERM_LENGTH = 100
+
+# Rendered inline so asyncpg need not infer the type of a bound parameter
+_CONFIG = literal_column(f"'{SEARCH_CONFIG}'::regconfig")
+_WORD = re.compile(r"[^\W\d_]{%d,}" % MIN_TERM_LENGTH)
+
+
+def _search_vector(title, ocr_text):
+    title_vector = func.setweight(func.to_tsvector(_CONFIG, func.coalesce(title, "")), "A")
+    text_vector = func.setweight(func.to_tsvector(_CONFIG, func.coalesce(ocr_text, "")), "B")
+    return type_coerce(title_vector.op("||")(text_vector), TSVECTOR)
+
+
+def _index_statements(document_id: uuid.UUID) -> Tuple[Any, Any]:
+    """Statements refreshing a document's vector and adding its terms"""
+    refresh = (
+        update(Document)
+        .where(Document.id == document_id)
+        .values(search_vector=_search_vector(Document.title, Document.ocr_text))
+    )
+
+    lexemes = (
+        select(
+            Document.user_id,
+            func.unnest(func.tsvector_to_array(Document.search_vector)).label("term"),
+        )
+        .where(Document.id == document_id)
+        .subquery()
+    )
+    add_terms = (
+        insert(DocumentTerm)
+        .from_select(
+            ["user_id", "term"],
+            select(lexemes.c.user_id, lexemes.c.term).where(
+                func.length(lexemes.c.term).between(MIN_TERM_LENGTH, MAX_TERM_LENGTH),
+                lexemes.c.term.op("~")("^[[:alpha:]]+$"),
+            ),
+        )
+        .on_conflict_do_nothing()
+    )
+    return refresh, add_terms
+
+
+async def index_document(db: AsyncSession, document_id: uuid.UUID) -> None:
+    """Refresh a document's search index entry and commit"""
+    for statement in _index_statements(document_id):
+        await db.execute(statement)
+    await db.commit()
+
+
+def index_document_sync(db: Session, document_id: uuid.UUID) -> None:
+    """Refresh a document's search index entry and commit (Celery tasks)"""
+    for statement in _index_statements(document_id):
+        db.execute(statement)
+    db.commit()
+
+
+async def _search_page(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    text: str,
+    profile_id: Optional[uuid.UUID],
+    limit: int,
+    offset: int
+) -> List[Any]:
+    query = func.websearch_to_tsquery(_CONFIG, text)
+    rank = func.ts_rank_cd(Document.search_vector, query, RANK_NORMALIZATION)
+
+    conditions = [Document.user_id == user_id, Document.search_vector.op("@@")(query)]
+    if profile_id is not None:
+        conditions.append(Document.profile_id == profile_id)
+
+    # Rank and paginate first so headlines are only built for the page
+    page = (
+        select(Document.id, rank.label("rank"), Document.created_at)
+        .where(and_(*conditions))
+        .order_by(rank.desc(), Document.created_at.desc(), Document.id)
+        .limit(limit + 1)
+        .offset(offset)
+        .subquery()
+    )
+    snippet = func.ts_headline(
+        _CONFIG,
+        func.coalesce(Document.ocr_text, type_coerce("", Text)),
+        query,
+        HEADLINE_OPTIONS,
+    )
+    result = await db.execute(
+        select(
+            Document.id,
+            Document.profile_id,
+            Document.title,
+            Document.document_type,
+            Document.document_date,
+            Document.created_at,
+            page.c.rank,
+            snippet.label("snippet"),
+        )
+        .join(page, page.c.id == Document.id)
+        .order_by(page.c.rank.desc(), page.c.created_at.desc(), page.c.id)
+    )
+    return result.all()
+
+
+async def _correct_query(db: AsyncSession, user_id: uuid.UUID, text: str) -> str:
+    """Replace each word with the most similar term of the user's vocabulary"""
+    corrected = text
+    for word in set(_WORD.findall(text)):
+        similarity = func.similarity(DocumentTerm.term, word.lower())
+        term = (await db.execute(
+            select(DocumentTerm.term)
+            .where(DocumentTerm.user_id == user_id, DocumentTerm.term.op("%")(word.lower()))
+            .order_by(similarity.desc())
+            .limit(1)
+        )).scalar_one_or_none()
+        if term is not None:
+            corrected = re.sub(rf"\b{re.escape(word)}\b", term, corrected)
+    return corrected
+
+
+async def search_documents(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    text: str,
+    profile_id: Optional[uuid.UUID] = None,
+    limit: int = 20,
+    offset: int = 0,
+    fuzzy: bool = True
+) -> Dict[str, Any]:
+    """Ranked, paginated full-text search over a user's documents"""
+    rows = await _search_page(db, user_id, text, profile_id, limit, offset)
+
+    corrected_query = None
+    if not rows and offset == 0 and fuzzy:
+        candidate = await _correct_query(db, user_id, text)
+        if candidate != text:
+            rows = await _search_page(db, user_id, candidate, profile_id, limit, offset)
+            corrected_query = candidate
+
+    return {
+        "query": text,
+        "corrected_query": corrected_query,
+        "limit": limit,
+        "offset": offset,
+        "has_more": len(rows) > limit,
+        "results": [
+            {
+                "id": str(row.id),
+                "profile_id": str(row.profile_id) if row.profile_id else None,
+                "title": row.title,
+                "document_type": row.document_type,
+                "document_date": row.document_date.isoformat() if row.document_date else None,
+                "created_at": row.created_at.isoformat(),
+                "rank": row.rank,
+                "snippet": row.snippet,
+            }
+            for row in rows[:limit]
+        ],
+    }
@@ -0,0 +1,195 @@
+"""
+Object storage (MinIO/S3) access.
+"""
+
+import io
+import logging
+from datetime import timedelta
+from functools import lru_cache
+from typing import List, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from minio import Minio
+from minio.datatypes import Part
+from minio.error import S3Error
+
+from app.core.config import settings
+from app.core.exceptions import StorageError
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache()
+def get_minio_client() -> Minio:
+    """Get the shared MinIO client"""
+    return Minio(
+        settings.MINIO_ENDPOINT,
+        access_key=settings.MINIO_ACCESS_KEY,
+        secret_key=settings.MINIO_SECRET_KEY,
+        secure=settings.MINIO_SECURE,
+    )
+
+
+async def remove_object(object_name: str, client: Optional[Minio] = None) -> None:
+    """Remove an object from the documents bucket"""
+    client = client or get_minio_client()
+    try:
+        await run_in_threadpool(client.remove_object, settings.MINIO_BUCKET_NAME, object_name)
+    except S3Error as e:
+        raise StorageError(f"Failed to remove object: {e}")
+
+
+class SyncMultipartObjectWriter:
+    """
+    Write an object to the documents bucket in fixed-size parts.
+
+    Data is buffered only until a full part is available, which is then
+    uploaded before more data is accepted, so memory use is bounded by
+    ``part_size`` regardless of the object size. Objects that fit in a
+    single part are sent with a plain PUT on ``complete``.
+    """
+
+    def __init__(
+        self,
+        object_name: str,
+        content_type: str = "application/octet-stream",
+        part_size: int = settings.UPLOAD_PART_SIZE,
+        client: Optional[Minio] = None
+    ):
+        self.object_name = object_name
+        self.content_type = content_type
+        self.part_size = part_size
+        self.client = client or get_minio_client()
+        self.bucket_name = settings.MINIO_BUCKET_NAME
+
+        self._buffer = bytearray()
+        self._upload_id: Optional[str] = None
+        self._parts: List[Part] = []
+
+    @property
+    def buffered(self) -> int:
+        """Bytes waiting for a part to fill up"""
+        return len(self._buffer)
+
+    def write(self, data: bytes) -> None:
+        """Buffer data and upload every full part"""
+        self._buffer.extend(data)
+        while len(self._buffer) >= self.part_size:
+            chunk = bytes(self._buffer[:self.part_size])
+            del self._buffer[:self.part_size]
+            self._upload_part(chunk)
+
+    def complete(self) -> None:
+        """Upload the remaining data and finalise the object"""
+        try:
+            if self._upload_id is None:
+                data = bytes(self._buffer)
+                self.client.put_object(
+                    self.bucket_name,
+                    self.object_name,
+                    io.BytesIO(data),
+                    len(data),
+                    content_type=self.content_type,
+                )
+            else:
+                if self._buffer:
+                    self._upload_part(bytes(self._buffer))
+                self.client._complete_multipart_upload(
+                    self.bucket_name,
+                    self.object_name,
+                    self._upload_id,
+                    self._parts,
+                )
+        except S3Error as e:
+            self.abort()
+            raise StorageError(f"Failed to store object: {e}")
+        finally:
+            self._buffer.clear()
+
+    def abort(self) -> None:
+        """Discard any parts uploaded so far"""
+        self._buffer.clear()
+        if self._upload_id is None:
+            return
+
+        upload_id, self._upload_id = self._upload_id, None
+        try:
+            self.client._abort_multipart_upload(self.bucket_name, self.object_name, upload_id)
+        except S3Error as e:
+            logger.warning(f"Failed to abort multipart upload {upload_id}: {e}")
+
+    def _upload_part(self, data: bytes) -> None:
+        try:
+            if self._upload_id is None:
+                self._upload_id = self.client._create_multipart_upload(
+                    self.bucket_name,
+                    self.object_name,
+                    {"Content-Type": self.content_type},
+                )
+
+            part_number = len(self._parts) + 1
+            etag = self.client._upload_part(
+                self.bucket_name,
+                self.object_name,
+                data,
+                None,
+                self._upload_id,
+                part_number,
+            )
+            self._parts.append(Part(part_number, etag))
+        except S3Error as e:
+            self.abort()
+            raise StorageError(f"Failed to upload part: {e}")
+
+
+class MultipartObjectWriter:
+    """
+    ``SyncMultipartObjectWriter`` for async code.
+
+    Writes that only add to the buffer stay on the event loop; anything
+    that talks to storage runs in the threadpool.
+    """
+
+    def __init__(
+        self,
+        object_name: str,
+        content_type: str = "application/octet-stream",
+        part_size: int = settings.UPLOAD_PART_SIZE,
+        client: Optional[Minio] = None
+    ):
+        self._writer = SyncMultipartObjectWriter(object_name, content_type, part_size, client)
+
+    @property
+    def object_name(self) -> str:
+        return self._writer.object_name
+
+    async def write(self, data: bytes) -> None:
+        """Buffer data and upload every full part"""
+        if self._writer.buffered + len(data) < self._writer.part_size:
+            self._writer.write(data)
+        else:
+            await run_in_threadpool(self._writer.write, data)
+
+    async def complete(self) -> None:
+        """Upload the remaining data and finalise the object"""
+        await run_in_threadpool(self._writer.complete)
+
+    async def abort(self) -> None:
+        """Discard any parts uploaded so far"""
+        await run_in_threadpool(self._writer.abort)
+
+
+def presigned_download_url(object_name: str, expires: timedelta, filename: Optional[str] = None) -> str:
+    """Time-limited GET URL for an object in the documents bucket"""
+    response_headers = None
+    if filename:
+        response_headers = {"response-content-disposition": f'attachment; filename="{filename}"'}
+    try:
+        return get_minio_client().presigned_get_object(
+            settings.MINIO_BUCKET_NAME,
+            object_name,
+            expires=expires,
+            response_headers=response_headers,
+        )
+    except S3Error as e:
+        raise StorageError(f"Failed to sign object URL: {e}")
@@ -0,0 +1,242 @@
+"""
+Medical timeline built as a k-way merge of per-table keyset cursors.
+
+Every record type (visits, documents, medications, lab results) is read
+newest first in small batches using keyset pagination on
+(timestamp, id), which the per-profile timeline indexes serve directly.
+The sources are merged lazily on (timestamp, source rank, id), so memory
+stays constant however long the history is and the first events can be
+sent before the rest have been read.
+
+Pages are continued with an opaque cursor naming the last event sent.
+"""
+
+import base64
+import heapq
+import json
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import DateTime, cast, func, literal_column, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.exceptions import ValidationError
+from app.models.document import Document
+from app.models.lab_result import LabResult
+from app.models.medical_visit import MedicalVisit
+from app.models.medication import Medication
+
+BATCH_SIZE = 200
+
+# (timestamp, source rank, id): total order of timeline events, newest first
+EventKey = Tuple[datetime, int, uuid.UUID]
+
+
+@dataclass(frozen=True)
+class TimelineSource:
+    """A table contributing events to the timeline"""
+    event_type: str
+    rank: int
+    model: Any
+    timestamp: Any
+    columns: Sequence[Any]
+    to_event: Callable[[Any], Dict[str, Any]]
+
+
+def _iso(value) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+SOURCES: Dict[str, TimelineSource] = {
+    source.event_type: source for source in (
+        TimelineSource(
+            event_type="visit",
+            rank=0,
+            model=MedicalVisit,
+            timestamp=MedicalVisit.visit_date,
+            columns=(
+                MedicalVisit.visit_type,
+                MedicalVisit.provider_name,
+                MedicalVisit.facility,
+                MedicalVisit.reason,
+                MedicalVisit.diagnosis,
+            ),
+            to_event=lambda row: {
+                "title": row.reason or row.visit_type or "Medical visit",
+                "visit_type": row.visit_type,
+                "provider_name": row.provider_name,
+                "facility": row.facility,
+                "diagnosis": row.diagnosis,
+            },
+        ),
+        TimelineSource(
+            event_type="document",
+            rank=1,
+            model=Document,
+            timestamp=func.coalesce(Document.document_date, Document.created_at),
+            columns=(
+                Document.title,
+                Document.document_type,
+                Document.institution,
+                Document.status,
+            ),
+            to_event=lambda row: {
+                "title": row.title,
+                "document_type": row.document_type,
+                "institution": row.institution,
+                "status": row.status,
+            },
+        ),
+        TimelineSource(
+            event_type="medication",
+            rank=2,
+            model=Medication,
+            timestamp=func.coalesce(
+                func.timezone(literal_column("'UTC'"), cast(Medication.start_date, DateTime())),
+                Medication.created_at,
+            ),
+            columns=(
+                Medication.name,
+                Medication.dosage,
+                Medication.frequency,
+                Medication.end_date,
+                Medication.is_active,
+            ),
+            to_event=lambda row: {
+                "title": row.name,
+                "dosage": row.dosage,
+                "frequency": row.frequency,
+                "end_date": _iso(row.end_date),
+                "is_active": row.is_active,
+            },
+        ),
+        TimelineSource(
+            event_type="lab_result",
+            rank=3,
+            model=LabResult,
+            timestamp=LabResult.result_date,
+            columns=(
+                LabResult.test_name,
+                LabResult.value,
+                LabResult.value_text,
+                LabResult.unit,
+                LabResult.reference_low,
+                LabResult.reference_high,
+            ),
+            to_event=lambda row: {
+                "title": row.test_name,
+                "value": row.value if row.value is not None else row.value_text,
+                "unit": row.unit,
+                "reference_low": row.reference_low,
+                "reference_high": row.reference_high,
+            },
+        ),
+    )
+}
+
+
+def encode_cursor(key: EventKey) -> str:
+    """Encode the key of the last event sent as an opaque cursor"""
+    timestamp, rank, event_id = key
+    raw = json.dumps([timestamp.isoformat(), rank, str(event_id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str) -> EventKey:
+    """Decode a cursor produced by ``encode_cursor``"""
+    try:
+        timestamp, rank, event_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(timestamp), int(rank), uuid.UUID(event_id)
+    except (ValueError, TypeError):
+        raise ValidationError("Invalid timeline cursor")
+
+
+def _after(source: TimelineSource, key: EventKey):
+    """Condition selecting the source's rows that sort after ``key`` (newest first)"""
+    timestamp, rank, event_id = key
+    if source.rank < rank:
+        return source.timestamp <= timestamp
+    if source.rank > rank:
+        return source.timestamp < timestamp
+    return tuple_(source.timestamp, source.model.id) < tuple_(timestamp, event_id)
+
+
+async def _iter_source(
+    db: AsyncSession,
+    source: TimelineSource,
+    profile_id,
+    cursor: Optional[EventKey]
+) -> AsyncIterator[Tuple[EventKey, Dict[str, Any]]]:
+    """Read one table newest first in keyset-paginated batches"""
+    timestamp = source.timestamp.label("timestamp")
+    condition = _after(source, cursor) if cursor else None
+
+    while True:
+        query = (
+            select(source.model.id, timestamp, *source.columns)
+            .where(source.model.profile_id == profile_id)
+            .order_by(source.timestamp.desc(), source.model.id.desc())
+            .limit(BATCH_SIZE)
+        )
+        if condition is not None:
+            query = query.where(condition)
+
+        rows = (await db.execute(query)).all()
+        for row in rows:
+            key = (row.timestamp, source.rank, row.id)
+            yield key, {
+                "type": source.event_type,
+                "id": str(row.id),
+                "timestamp": _iso(row.timestamp),
+                **source.to_event(row),
+            }
+
+        if len(rows) < BATCH_SIZE:
+            return
+        last = rows[-1]
+        condition = tuple_(source.timestamp, source.model.id) < tuple_(last.timestamp, last.id)
+
+
+class _Newest:
+    """Heap entry ordering events newest first"""
+    __slots__ = ("key",)
+
+    def __init__(self, key: EventKey):
+        self.key = key
+
+    def __lt__(self, other: "_Newest") -> bool:
+        return self.key > other.key
+
+
+async def iter_timeline(
+    db: AsyncSession,
+    profile_id,
+    cursor: Optional[EventKey] = None,
+    event_types: Optional[List[str]] = None
+) -> AsyncIterator[Tuple[EventKey, Dict[str, Any]]]:
+    """Merge all sources into a single newest-first stream of events"""
+    sources = [SOURCES[t] for t in (event_types or SOURCES)]
+    iterators = [_iter_source(db, source, profile_id, cursor) for source in sources]
+
+    try:
+        heap = []
+        for index, iterator in enumerate(iterators):
+            first = await anext(iterator, None)
+            if first is not None:
+                heap.append((_Newest(first[0]), index, first))
+        heapq.heapify(heap)
+
+        while heap:
+            _, index, (key, event) = heap[0]
+            yield key, event
+
+            following = await anext(iterators[index], None)
+            if following is None:
+                heapq.heappop(heap)
+            else:
+                heapq.heapreplace(heap, (_Newest(following[0]), index, following))
+    finally:
+        for iterator in iterators:
+            await iterator.aclose()
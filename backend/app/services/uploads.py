@@ -0,0 +1,277 @@
+"""
+Streaming multipart upload handling.
+
+The ``multipart/form-data`` body is parsed as it arrives and the file part
+is forwarded to object storage part by part. Size, SHA-256 and file type
+are worked out on the fly, so an upload is never held in memory as a whole
+and oversized or disallowed files are rejected as early as possible.
+"""
+
+import hashlib
+import os
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+import multipart
+from multipart.multipart import parse_options_header
+from starlette.requests import Request
+
+from app.core.config import settings
+from app.core.exceptions import FileTooLargeError, ValidationError
+from app.services.storage import MultipartObjectWriter
+
+# Leading bytes of each supported file type: (signature, file type, MIME type)
+FILE_SIGNATURES: Tuple[Tuple[bytes, str, str], ...] = (
+    (b"%PDF-", "pdf", "application/pdf"),
+    (b"\x89PNG\r\n\x1a\n", "png", "image/png"),
+    (b"\xff\xd8\xff", "jpg", "image/jpeg"),
+    (b"II*\x00", "tiff", "image/tiff"),
+    (b"MM\x00*", "tiff", "image/tiff"),
+)
+SNIFF_LENGTH = max(len(signature) for signature, _, _ in FILE_SIGNATURES)
+
+# Extensions that name the same file type
+FILE_TYPE_ALIASES = {"jpeg": "jpg", "tif": "tiff"}
+
+# Limits for the non-file form fields, which are buffered in memory
+MAX_FIELD_SIZE = 64 * 1024
+MAX_FORM_OVERHEAD = 1024 * 1024
+
+
+def normalize_file_type(file_type: str) -> str:
+    """Map a file extension onto its canonical file type"""
+    file_type = file_type.lower().lstrip(".")
+    return FILE_TYPE_ALIASES.get(file_type, file_type)
+
+
+def sniff_file_type(header: bytes) -> Optional[Tuple[str, str]]:
+    """Identify a file from its leading bytes, returning (file type, MIME type)"""
+    for signature, file_type, mime_type in FILE_SIGNATURES:
+        if header.startswith(signature):
+            return file_type, mime_type
+    return None
+
+
+@dataclass
+class UploadResult:
+    """Outcome of a streamed upload"""
+    object_name: str
+    filename: str
+    file_type: str
+    mime_type: str
+    size: int
+    content_hash: str
+    fields: Dict[str, str] = field(default_factory=dict)
+
+
+class StreamingUploadReceiver:
+    """
+    Receive a single-file multipart upload and stream it to object storage.
+
+    ``object_name_factory`` is called once the file type is known and
+    returns the object name to write to; it receives the sniffed file type.
+    """
+
+    def __init__(
+        self,
+        request: Request,
+        object_name_factory: Callable[[str], str],
+        max_file_size: int = settings.MAX_FILE_SIZE,
+        allowed_file_types: Optional[List[str]] = None
+    ):
+        self.request = request
+        self.object_name_factory = object_name_factory
+        self.max_file_size = max_file_size
+        self.allowed_file_types = {
+            normalize_file_type(t) for t in (allowed_file_types or settings.ALLOWED_FILE_TYPES)
+        }
+
+        self.fields: Dict[str, str] = {}
+        self.filename: Optional[str] = None
+        self.file_type: Optional[str] = None
+        self.mime_type: Optional[str] = None
+        self.size = 0
+        self.writer: Optional[MultipartObjectWriter] = None
+
+        self._hasher = hashlib.sha256()
+        self._header = bytearray()
+        self._pending = bytearray()
+        self._events: List[Tuple[str, bytes]] = []
+
+        # State of the part currently being parsed
+        self._header_field = b""
+        self._header_value = b""
+        self._part_headers: Dict[bytes, bytes] = {}
+        self._part_name: Optional[str] = None
+        self._part_is_file = False
+        self._field_value = bytearray()
+
+    async def receive(self) -> UploadResult:
+        """Consume the request body and return the stored upload"""
+        content_type, params = parse_options_header(self.request.headers.get("content-type", ""))
+        boundary = params.get(b"boundary")
+        if content_type != b"multipart/form-data" or not boundary:
+            raise ValidationError("Expected a multipart/form-data upload")
+
+        content_length = self.request.headers.get("content-length")
+        if content_length and content_length.isdigit():
+            if int(content_length) > self.max_file_size + MAX_FORM_OVERHEAD:
+                raise FileTooLargeError(details={"max_file_size": self.max_file_size})
+
+        parser = multipart.MultipartParser(boundary, self._callbacks())
+        try:
+            async for chunk in self.request.stream():
+                parser.write(chunk)
+                await self._process_events()
+            parser.finalize()
+            await self._process_events()
+
+            if self.filename is None:
+                raise ValidationError("No file was uploaded")
+            if self.size == 0:
+                raise ValidationError("Uploaded file is empty")
+            if self.file_type is None:
+                # File shorter than the sniff window
+                self._check_file_type()
+                await self._forward(b"")
+            await self.writer.complete()
+        except BaseException:
+            if self.writer is not None:
+                await self.writer.abort()
+            raise
+
+        return UploadResult(
+            object_name=self.writer.object_name,
+            filename=self.filename,
+            file_type=self.file_type,
+            mime_type=self.mime_type,
+            size=self.size,
+            content_hash=self._hasher.hexdigest(),
+            fields=self.fields,
+        )
+
+    def _callbacks(self) -> Dict[str, Callable]:
+        def on_data(event: str) -> Callable:
+            def callback(data: bytes, start: int, end: int) -> None:
+                self._events.append((event, data[start:end]))
+            return callback
+
+        def on_event(event: str) -> Callable:
+            def callback() -> None:
+                self._events.append((event, b""))
+            return callback
+
+        return {
+            "on_part_begin": on_event("part_begin"),
+            "on_part_data": on_data("part_data"),
+            "on_part_end": on_event("part_end"),
+            "on_header_field": on_data("header_field"),
+            "on_header_value": on_data("header_value"),
+            "on_header_end": on_event("header_end"),
+            "on_headers_finished": on_event("headers_finished"),
+        }
+
+    async def _process_events(self) -> None:
+        events, self._events = self._events, []
+        for event, data in events:
+            if event == "part_begin":
+                self._part_headers = {}
+                self._part_name = None
+                self._part_is_file = False
+                self._field_value = bytearray()
+            elif event == "header_field":
+                self._header_field += data
+            elif event == "header_value":
+                self._header_value += data
+            elif event == "header_end":
+                self._part_headers[self._header_field.lower()] = self._header_value
+                self._header_field = b""
+                self._header_value = b""
+            elif event == "headers_finished":
+                self._start_part()
+            elif event == "part_data":
+                if self._part_is_file:
+                    await self._receive_file_data(data)
+                else:
+                    self._field_value.extend(data)
+                    if len(self._field_value) > MAX_FIELD_SIZE:
+                        raise ValidationError(f"Form field '{self._part_name}' is too large")
+            elif event == "part_end":
+                if not self._part_is_file and self._part_name:
+                    self.fields[self._part_name] = self._field_value.decode("utf-8", errors="replace")
+
+    def _start_part(self) -> None:
+        disposition, options = parse_options_header(
+            self._part_headers.get(b"content-disposition", b"")
+        )
+        if disposition != b"form-data" or b"name" not in options:
+            raise ValidationError("Malformed multipart part")
+
+        self._part_name = options[b"name"].decode("utf-8", errors="replace")
+        if b"filename" not in options:
+            return
+
+        if self.filename is not None:
+            raise ValidationError("Only one file can be uploaded per request")
+
+        filename = os.path.basename(options[b"filename"].decode("utf-8", errors="replace"))
+        if not filename:
+            raise ValidationError("Uploaded file has no filename")
+
+        self.filename = filename
+        self._part_is_file = True
+
+    async def _receive_file_data(self, data: bytes) -> None:
+        self.size += len(data)
+        if self.size > self.max_file_size:
+            raise FileTooLargeError(details={"max_file_size": self.max_file_size})
+        self._hasher.update(data)
+
+        if self.file_type is None:
+            self._header.extend(data[:SNIFF_LENGTH - len(self._header)])
+            self._pending.extend(data)
+            if len(self._header) < SNIFF_LENGTH:
+                return
+            self._check_file_type()
+            data = bytes(self._pending)
+            self._pending.clear()
+
+        await self._forward(data)
+
+    def _check_file_type(self) -> None:
+        sniffed = sniff_file_type(bytes(self._header))
+        if sniffed is None:
+            raise ValidationError("Unrecognised file type")
+
+        file_type, mime_type = sniffed
+        extension = normalize_file_type(os.path.splitext(self.filename)[1])
+        if file_type not in self.allowed_file_types:
+            raise ValidationError(
+                f"File type '{file_type}' is not allowed",
+                details={"allowed_file_types": sorted(self.allowed_file_types)}
+            )
+        if extension and extension != file_type:
+            raise ValidationError(
+                f"File extension '.{extension}' does not match its content ({file_type})"
+            )
+
+        self.file_type = file_type
+        self.mime_type = mime_type
+        self.writer = MultipartObjectWriter(
+            self.object_name_factory(file_type), content_type=mime_type
+        )
+
+    async def _forward(self, data: bytes) -> None:
+        if self._pending:
+            data = bytes(self._pending) + data
+            self._pending.clear()
+        if data:
+            await self.writer.write(data)
+
+
+async def receive_upload(
+    request: Request,
+    object_name_factory: Callable[[str], str]
+) -> UploadResult:
+    """Stream a single-file multipart upload to object storage"""
+    return await StreamingUploadReceiver(request, object_name_factory).receive()
@@ -0,0 +1,195 @@
+"""
+Per-user approximate nearest-neighbour index over document chunks.
+
+Chunks are hashed with random-hyperplane LSH: each of
+``VECTOR_INDEX_TABLES`` tables maps a vector to one of ``2^VECTOR_INDEX_BITS``
+buckets by the signs of its projections. Buckets are stored as
+``(user_id, bucket, chunk_id)`` rows, so adding or removing a document only
+touches its own rows; deleting a document cascades to its chunks and their
+buckets.
+
+A query probes its bucket and every bucket one bit away in each table and
+reads the matching chunks of that user only (an index range scan). Chunks
+of the current embedding space (and profile, when given) are ranked by how
+many probed buckets they fall in, an exact bucket counting double, and at
+most ``VECTOR_SEARCH_CANDIDATES`` of the best are re-ranked by exact cosine
+similarity.
+"""
+
+import uuid
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import case, delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.document import Document, DocumentChunk, DocumentChunkBucket
+from app.services.embeddings import chunk_text, get_embedder
+
+# Hyperplanes are derived from this seed, so every process hashes alike
+LSH_SEED = 20240601
+INSERT_BATCH_SIZE = 500
+
+
+class LSHIndex:
+    """Random-hyperplane hashing into ``tables`` tables of ``2^bits`` buckets"""
+
+    def __init__(self, dimensions: int, tables: int, bits: int):
+        self.tables = tables
+        self.bits = bits
+        rng = np.random.default_rng(LSH_SEED)
+        self.planes = rng.standard_normal((tables * bits, dimensions)).astype(np.float32)
+        self._weights = (1 << np.arange(bits)).astype(np.int64)
+        self._table_offsets = np.arange(tables, dtype=np.int64) << bits
+
+    def buckets(self, vectors: np.ndarray) -> np.ndarray:
+        """(n, tables) bucket numbers, unique across tables"""
+        signs = (vectors @ self.planes.T > 0).reshape(len(vectors), self.tables, self.bits)
+        return signs @ self._weights + self._table_offsets
+
+    def probes(self, vector: np.ndarray) -> List[int]:
+        """
+        The vector's buckets, one per table, followed by their neighbours at
+        Hamming distance one
+        """
+        buckets = self.buckets(vector[None, :])[0]
+        flipped = buckets[:, None] ^ self._weights[None, :]
+        return np.concatenate([buckets, flipped.ravel()]).tolist()
+
+
+@lru_cache(maxsize=None)
+def get_index() -> LSHIndex:
+    embedder = get_embedder()
+    return LSHIndex(embedder.dimensions, settings.VECTOR_INDEX_TABLES, settings.VECTOR_INDEX_BITS)
+
+
+def embedding_space() -> str:
+    """Identifies the model and layout that chunk vectors and buckets come from"""
+    embedder = get_embedder()
+    return (
+        f"{embedder.name}:{embedder.dimensions}:"
+        f"{settings.VECTOR_INDEX_TABLES}x{settings.VECTOR_INDEX_BITS}"
+    )
+
+
+def index_document_chunks(db: Session, document: Document) -> int:
+    """Replace a document's chunks and buckets; returns the chunk count"""
+    db.execute(delete(DocumentChunk).where(DocumentChunk.document_id == document.id))
+
+    chunks = chunk_text(
+        document.ocr_text or "",
+        settings.EMBEDDING_CHUNK_CHARS,
+        settings.EMBEDDING_CHUNK_OVERLAP,
+    )
+    if chunks:
+        vectors = get_embedder().embed(chunks)
+        buckets = get_index().buckets(vectors)
+        space = embedding_space()
+
+        for start in range(0, len(chunks), INSERT_BATCH_SIZE):
+            end = start + INSERT_BATCH_SIZE
+            ids = [uuid.uuid4() for _ in chunks[start:end]]
+            db.execute(insert(DocumentChunk).values([
+                {
+                    "id": chunk_id,
+                    "document_id": document.id,
+                    "user_id": document.user_id,
+                    "profile_id": document.profile_id,
+                    "chunk_index": start + offset,
+                    "content": content,
+                    "embedding": vector.tobytes(),
+                    "space": space,
+                }
+                for offset, (chunk_id, content, vector) in enumerate(
+                    zip(ids, chunks[start:end], vectors[start:end])
+                )
+            ]))
+            db.execute(insert(DocumentChunkBucket).values([
+                {"user_id": document.user_id, "bucket": bucket, "chunk_id": chunk_id}
+                for chunk_id, row in zip(ids, buckets[start:end].tolist())
+                for bucket in row
+            ]))
+
+    db.commit()
+    return len(chunks)
+
+
+async def semantic_search(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    text: str,
+    profile_id: Optional[uuid.UUID] = None,
+    limit: int = 10
+) -> Dict[str, Any]:
+    """Documents whose chunks are most similar to the query, best first"""
+    embedder = get_embedder()
+    query_vector = (await run_in_threadpool(embedder.embed, [text]))[0]
+
+    index = get_index()
+    probes = index.probes(query_vector)
+
+    conditions = [
+        DocumentChunkBucket.user_id == user_id,
+        DocumentChunkBucket.bucket.in_(probes),
+        DocumentChunk.space == embedding_space(),
+    ]
+    if profile_id is not None:
+        conditions.append(DocumentChunk.profile_id == profile_id)
+    # Chunks sharing more buckets with the query are likelier to be close
+    hits = func.sum(case((DocumentChunkBucket.bucket.in_(probes[:index.tables]), 2), else_=1))
+    candidates = (
+        select(DocumentChunkBucket.chunk_id)
+        .join(DocumentChunk, DocumentChunk.id == DocumentChunkBucket.chunk_id)
+        .where(*conditions)
+        .group_by(DocumentChunkBucket.chunk_id)
+        .order_by(hits.desc(), DocumentChunkBucket.chunk_id)
+        .limit(settings.VECTOR_SEARCH_CANDIDATES)
+    )
+
+    rows = (await db.execute(
+        select(
+            DocumentChunk.document_id,
+            DocumentChunk.chunk_index,
+            DocumentChunk.content,
+            DocumentChunk.embedding,
+        ).where(DocumentChunk.id.in_(candidates))
+    )).all()
+
+    results: List[Dict[str, Any]] = []
+    if rows:
+        vectors = np.frombuffer(b"".join(row.embedding for row in rows), dtype=np.float32)
+        scores = vectors.reshape(len(rows), -1) @ query_vector
+
+        # Best chunk per document, documents ordered by that chunk's score
+        seen = set()
+        for position in np.argsort(-scores, kind="stable"):
+            row = rows[position]
+            if row.document_id in seen or scores[position] <= 0:
+                continue
+            seen.add(row.document_id)
+            results.append({
+                "document_id": str(row.document_id),
+                "chunk_index": row.chunk_index,
+                "score": float(scores[position]),
+                "snippet": row.content,
+            })
+            if len(results) == limit:
+                break
+
+    if results:
+        titles = dict((await db.execute(
+            select(Document.id, Document.title)
+            .where(Document.id.in_([uuid.UUID(result["document_id"]) for result in results]))
+        )).all())
+        for result in results:
+            result["title"] = titles.get(uuid.UUID(result["document_id"]))
+
+    return {
+        "query": text,
+        "candidates": len(rows),
+        "results": results,
+    }
@@ -2,23 +2,40 @@
 AI processing tasks for medical insights and analysis.
 """
 
+import logging
+import uuid
+from dataclasses import asdict
+from sqlalchemy import select
 from app.celery import celery_app
+from app.core.config import settings
+from app.core.database import SyncSessionLocal
+from app.models.document import Document
+from app.models.medication import Medication
+from app.models.profile import Profile
+from app.services.analysis import analyze_profiles
+from app.services.interactions import check_interactions
+from app.services.vector_index import index_document_chunks
 from typing import Dict, Any
 
+logger = logging.getLogger(__name__)
+
 
 @celery_app.task
 def analyze_medical_data(profile_id: str) -> Dict[str, Any]:
-    """Analyze medical data and generate insights."""
+    """
+    Analyze medical data and generate insights.
+
+    Only records changed since the profile's last analysis are processed;
+    an unchanged profile returns its stored result straight away.
+    """
     try:
-        # TODO: Implement AI analysis
-        # 1. Gather medical history
-        # 2. Process with AI models
-        # 3. Generate insights
-        # 4. Store results
+        with SyncSessionLocal() as db:
+            outcome = analyze_profiles(db, [uuid.UUID(profile_id)])[uuid.UUID(profile_id)]
 
         return {
             "status": "completed",
             "profile_id": profile_id,
+            "analysis": outcome,
             "message": "Medical data analysis completed"
         }
     except Exception as e:
@@ -29,19 +46,48 @@ def analyze_medical_data(profile_id: str) -> Dict[str, Any]:
         }
 
 
+@celery_app.task
+def analyze_all_profiles(batch_size: int = settings.ANALYSIS_BATCH_SIZE) -> Dict[str, Any]:
+    """Bring every profile's analysis up to date, one batch of profiles at a time"""
+    outcomes: Dict[str, int] = {}
+    last_id = None
+    with SyncSessionLocal() as db:
+        while True:
+            query = select(Profile.id).order_by(Profile.id).limit(batch_size)
+            if last_id is not None:
+                query = query.where(Profile.id > last_id)
+            profile_ids = list(db.scalars(query))
+            if not profile_ids:
+                break
+            for outcome in analyze_profiles(db, profile_ids).values():
+                outcomes[outcome] = outcomes.get(outcome, 0) + 1
+            last_id = profile_ids[-1]
+
+    logger.info(f"Profile analysis finished: {outcomes}")
+    return {
+        "status": "completed",
+        "profiles": outcomes,
+    }
+
+
 @celery_app.task
 def process_drug_interactions(profile_id: str) -> Dict[str, Any]:
-    """Check for drug interactions."""
+    """Check a profile's active medications against the local interaction index."""
     try:
-        # TODO: Implement drug interaction checking
-        # 1. Get current medications
-        # 2. Check interactions using APIs
-        # 3. Generate warnings
-        # 4. Store results
+        with SyncSessionLocal() as db:
+            names = db.scalars(
+                select(Medication.name).where(
+                    Medication.profile_id == uuid.UUID(profile_id),
+                    Medication.is_active.is_(True),
+                )
+            ).all()
+        interactions = check_interactions(names)
 
         return {
             "status": "completed",
             "profile_id": profile_id,
+            "medications": len(names),
+            "interactions": [asdict(interaction) for interaction in interactions],
             "message": "Drug interaction analysis completed"
         }
     except Exception as e:
@@ -49,4 +95,28 @@ def process_drug_interactions(profile_id: str) -> Dict[str, Any]:
             "status": "failed",
             "profile_id": profile_id,
             "error": str(e)
-        }
\ No newline at end of file
+        }
+
+@celery_app.task
+def embed_document(document_id: str) -> Dict[str, Any]:
+    """
+    Chunk and embed a document's OCR text into the user's vector index.
+
+    Runs after OCR completes; re-running replaces the document's chunks.
+    """
+    with SyncSessionLocal() as db:
+        document = db.get(Document, uuid.UUID(document_id))
+        if document is None or document.status != "completed":
+            return {
+                "status": "skipped",
+                "document_id": document_id,
+                "message": "Document not found or not processed"
+            }
+        chunks = index_document_chunks(db, document)
+
+    logger.info(f"Embedded document {document_id}: {chunks} chunks")
+    return {
+        "status": "completed",
+        "document_id": document_id,
+        "chunks": chunks,
+    }
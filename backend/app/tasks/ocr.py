@@ -2,9 +2,128 @@
 OCR processing tasks.
 """
 
+import logging
+import os
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
 from celery import Task
+from sqlalchemy import func, select, update
 from app.celery import celery_app
-from typing import Dict, Any
+from app.core.config import settings
+from app.core.database import SyncSessionLocal
+from app.core.exceptions import OCRError
+from app.models.document import Document
+from app.services.dashboard import invalidate_dashboard_sync
+from app.services.ocr import OCREngine
+from app.services.ocr_cache import OCRPageCache
+from app.services.search import index_document_sync
+from app.services.storage import get_minio_client
+from app.tasks.ai_processing import embed_document
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _held(document_id: uuid.UUID, claim_token: uuid.UUID) -> tuple:
+    """Conditions matching the document only while the worker's claim is current"""
+    return (
+        Document.id == document_id,
+        Document.status == "processing",
+        Document.claim_token == claim_token,
+    )
+
+
+def _append_ocr_text(db, document_id: uuid.UUID, claim_token: uuid.UUID, pages: List[str]) -> bool:
+    """
+    Append recognised page text to the document, renew its claim and commit
+
+    Returns False without writing when the claim was lost, i.e. the lease
+    expired and the document was reclaimed for another run.
+    """
+    if not pages:
+        return True
+    appended = db.execute(
+        update(Document)
+        .where(*_held(document_id, claim_token))
+        .values(
+            ocr_text=func.coalesce(Document.ocr_text, "") + "".join(pages),
+            claimed_at=func.now(),
+        )
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    return appended > 0
+
+
+def _finish_processing(db, document_id: uuid.UUID, claim_token: uuid.UUID, **values) -> bool:
+    """Mark the document completed with ``values`` and commit; False if the claim was lost"""
+    finished = db.execute(
+        update(Document)
+        .where(*_held(document_id, claim_token))
+        .values(status="completed", claim_token=None, **values)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    return finished > 0
+
+
+def _start_processing(db, document_id: uuid.UUID) -> Optional[uuid.UUID]:
+    """
+    Move a pending or queued document to processing and commit
+
+    Returns the claim token that fences this run's writes, or None when
+    another worker already started it or it is done, so a redelivered or
+    duplicate message does not OCR the document again.
+    """
+    claim_token = uuid.uuid4()
+    started = db.execute(
+        update(Document)
+        .where(Document.id == document_id, Document.status.in_(("pending", "queued")))
+        .values(status="processing", claimed_at=func.now(), claim_token=claim_token, ocr_text="")
+        .returning(Document.id)
+        .execution_options(synchronize_session=False)
+    ).scalar_one_or_none()
+    db.commit()
+    return claim_token if started is not None else None
+
+
+def _enqueue_embedding(document_id: str) -> None:
+    try:
+        embed_document.delay(document_id)
+    except Exception as e:
+        logger.warning(f"Failed to enqueue embedding for document {document_id}: {e}")
+
+
+def _mark_document_failed(document_id: str, error: str, claim_token: Optional[uuid.UUID] = None) -> None:
+    """Record an OCR failure on the document, unless a newer run holds it"""
+    with SyncSessionLocal() as db:
+        query = select(Document)
+        if claim_token is None:
+            query = query.where(Document.id == uuid.UUID(document_id))
+        else:
+            query = query.where(*_held(uuid.UUID(document_id), claim_token))
+        document = db.execute(query.with_for_update()).scalar_one_or_none()
+        if document is None:
+            return
+        document.status = "failed"
+        document.claim_token = None
+        document.extraction_metadata = {
+            **(document.extraction_metadata or {}),
+            "ocr_error": error,
+        }
+        db.commit()
+        invalidate_dashboard_sync(document.profile_id, "documents")
+
+
+def _claim_lost(document_id: str) -> Dict[str, Any]:
+    logger.warning(f"Claim on document {document_id} was lost, abandoning this OCR run")
+    return {
+        "status": "skipped",
+        "document_id": document_id,
+        "message": "Claim on the document was lost to another run"
+    }
 
 
 class OCRProcessingTask(Task):
@@ -12,35 +131,205 @@ class OCRProcessingTask(Task):
 
     def on_failure(self, exc, task_id, args, kwargs, einfo):
         """Handle task failure."""
-        print(f"OCR task {task_id} failed: {exc}")
-        # TODO: Log to database and update document status
+        logger.error(f"OCR task {task_id} failed: {exc}")
+
+        document_id = args[0] if args else kwargs.get("document_id")
+        if document_id is None:
+            return
+        try:
+            _mark_document_failed(document_id, str(exc), getattr(self.request, "claim_token", None))
+        except Exception as e:
+            logger.error(f"Failed to mark document {document_id} as failed: {e}")
 
 
 @celery_app.task(bind=True, base=OCRProcessingTask)
 def process_document_ocr(self, document_id: str) -> Dict[str, Any]:
-    """Process OCR for a document."""
-    try:
-        # TODO: Implement OCR processing
-        # 1. Download document from MinIO
-        # 2. Process with Tesseract
-        # 3. Extract structured data
-        # 4. Update database with results
-
-        return {
-            "status": "completed",
-            "document_id": document_id,
-            "message": "OCR processing completed successfully"
-        }
-    except Exception as e:
-        return {
-            "status": "failed",
-            "document_id": document_id,
-            "error": str(e)
+    """
+    Process OCR for a document.
+
+    Pages are recognised in parallel by the OCR engine and their text is
+    appended to ``Document.ocr_text`` every ``OCR_FLUSH_PAGES`` pages, so
+    partial results are visible while a long document is still running.
+    Failures propagate to ``OCRProcessingTask.on_failure``.
+
+    Every write is fenced by the run's claim token: once the lease has
+    expired and the document was reclaimed, this run stops writing.
+    """
+    with SyncSessionLocal() as db:
+        claim_token = _start_processing(db, uuid.UUID(document_id))
+        self.request.claim_token = claim_token
+        if claim_token is None:
+            if db.get(Document, uuid.UUID(document_id)) is None:
+                raise OCRError(f"Document {document_id} not found")
+            return {
+                "status": "skipped",
+                "document_id": document_id,
+                "message": "Document already processing or processed"
+            }
+        document = db.get(Document, uuid.UUID(document_id))
+        if not document.file_path:
+            raise OCRError(f"Document {document_id} has no stored file")
+
+        # Reuse the results of an identical upload the user already had processed
+        if document.content_hash:
+            duplicate = db.execute(
+                select(Document).where(
+                    Document.user_id == document.user_id,
+                    Document.content_hash == document.content_hash,
+                    Document.status == "completed",
+                    Document.id != document.id,
+                ).limit(1)
+            ).scalar_one_or_none()
+            if duplicate is not None:
+                if not _finish_processing(
+                    db,
+                    document.id,
+                    claim_token,
+                    ocr_text=duplicate.ocr_text,
+                    extraction_metadata=duplicate.extraction_metadata,
+                ):
+                    return _claim_lost(document_id)
+                index_document_sync(db, document.id)
+                invalidate_dashboard_sync(document.profile_id, "documents")
+                _enqueue_embedding(document_id)
+                return {
+                    "status": "completed",
+                    "document_id": document_id,
+                    "message": "Reused OCR results of an identical document"
+                }
+
+        ocr_engine = OCREngine(cache=OCRPageCache() if settings.OCR_CACHE_ENABLED else None)
+        is_pdf = document.mime_type == "application/pdf" or document.file_path.endswith(".pdf")
+        page_timings = []
+        pending_pages = []
+        started = time.perf_counter()
+
+        with tempfile.TemporaryDirectory(prefix="ocr-") as tmp_dir:
+            path = os.path.join(tmp_dir, os.path.basename(document.file_path))
+            get_minio_client().fget_object(settings.MINIO_BUCKET_NAME, document.file_path, path)
+
+            for page in ocr_engine.iter_pages(path, is_pdf):
+                pending_pages.append(page.text)
+                page_timings.append(page.timing())
+                if len(pending_pages) >= settings.OCR_FLUSH_PAGES:
+                    if not _append_ocr_text(db, document.id, claim_token, pending_pages):
+                        return _claim_lost(document_id)
+                    pending_pages = []
+
+        if not _append_ocr_text(db, document.id, claim_token, pending_pages):
+            return _claim_lost(document_id)
+
+        total_seconds = time.perf_counter() - started
+        extraction_metadata = {
+            **(document.extraction_metadata or {}),
+            "ocr": {
+                "pages": len(page_timings),
+                "cached_pages": sum(1 for timing in page_timings if timing["cached"]),
+                "workers": ocr_engine.workers,
+                "total_seconds": round(total_seconds, 4),
+                "page_timings": page_timings,
+            },
         }
+        if not _finish_processing(db, document.id, claim_token, extraction_metadata=extraction_metadata):
+            return _claim_lost(document_id)
+        index_document_sync(db, document.id)
+        invalidate_dashboard_sync(document.profile_id, "documents")
+    _enqueue_embedding(document_id)
+
+    logger.info(
+        f"OCR for document {document_id} finished: "
+        f"{len(page_timings)} pages in {total_seconds:.2f}s"
+    )
+
+    return {
+        "status": "completed",
+        "document_id": document_id,
+        "pages": len(page_timings),
+        "total_seconds": round(total_seconds, 4),
+        "message": "OCR processing completed successfully"
+    }
 
 
 @celery_app.task
-def process_pending_documents() -> Dict[str, Any]:
-    """Process all pending documents in the OCR queue."""
-    # TODO: Implement batch processing of pending documents
-    return {"message": "Pending documents processing task - TODO: Implement"}
\ No newline at end of file
+def process_pending_documents(batch_size: int = settings.OCR_DISPATCH_BATCH_SIZE) -> Dict[str, Any]:
+    """
+    Process all pending documents in the OCR queue.
+
+    Claims up to ``batch_size`` of the oldest pending documents with
+    ``FOR UPDATE SKIP LOCKED`` and marks them queued in the same statement,
+    so concurrent dispatchers never claim the same row. The claimed
+    documents are then published over a single broker connection.
+
+    Claims are leases: queued or processing documents whose ``claimed_at``
+    is older than ``OCR_CLAIM_TIMEOUT_SECONDS`` (a lost message or a dead
+    worker) are returned to pending first, and documents that could not be
+    published are returned to pending straight away.
+    """
+    started = time.perf_counter()
+    with SyncSessionLocal() as db:
+        expired = datetime.now(timezone.utc) - timedelta(seconds=settings.OCR_CLAIM_TIMEOUT_SECONDS)
+        stale = (
+            select(Document.id)
+            .where(Document.status.in_(("queued", "processing")), Document.claimed_at < expired)
+            .with_for_update(skip_locked=True)
+        )
+        reclaimed = db.execute(
+            update(Document)
+            .where(Document.id.in_(stale.scalar_subquery()))
+            .values(status="pending", claimed_at=None, claim_token=None)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+
+        claimable = (
+            select(Document.id)
+            .where(Document.status == "pending")
+            .order_by(Document.created_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        document_ids = db.execute(
+            update(Document)
+            .where(Document.id.in_(claimable.scalar_subquery()))
+            .values(status="queued", claimed_at=func.now())
+            .returning(Document.id)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+        db.commit()
+        claim_seconds = time.perf_counter() - started
+
+        backlog = db.execute(
+            select(func.count()).select_from(Document).where(Document.status == "pending")
+        ).scalar_one()
+
+    published = 0
+    if document_ids:
+        try:
+            with celery_app.producer_or_acquire() as producer:
+                for document_id in document_ids:
+                    process_document_ocr.apply_async((str(document_id),), producer=producer)
+                    published += 1
+        except Exception as e:
+            unpublished = document_ids[published:]
+            logger.error(f"Failed to publish {len(unpublished)} OCR tasks, returning them to pending: {e}")
+            with SyncSessionLocal() as db:
+                db.execute(
+                    update(Document)
+                    .where(Document.id.in_(unpublished), Document.status == "queued")
+                    .values(status="pending", claimed_at=None)
+                    .execution_options(synchronize_session=False)
+                )
+                db.commit()
+
+    logger.info(
+        f"Dispatched {published} documents for OCR "
+        f"(claim {claim_seconds * 1000:.1f}ms, reclaimed {reclaimed}, backlog {backlog})"
+    )
+
+    return {
+        "status": "completed",
+        "dispatched": published,
+        "failed": len(document_ids) - published,
+        "reclaimed": reclaimed,
+        "backlog": backlog,
+        "claim_seconds": round(claim_seconds, 4),
+    }
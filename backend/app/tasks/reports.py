@@ -2,24 +2,34 @@
 Report generation tasks.
 """
 
+import uuid
 from app.celery import celery_app
+from app.core.database import SyncSessionLocal
+from app.services.reports import generate_report
 from typing import Dict, Any
 
 
 @celery_app.task
-def generate_health_report(profile_id: str, report_type: str) -> Dict[str, Any]:
-    """Generate a health report."""
+def generate_health_report(
+    profile_id: str,
+    report_type: str,
+    output_format: str = "pdf"
+) -> Dict[str, Any]:
+    """
+    Generate a health report.
+
+    Records are streamed from the database into a PDF or CSV that is
+    uploaded to MinIO in parts; the result carries a presigned download URL.
+    """
     try:
-        # TODO: Implement report generation
-        # 1. Gather data from database
-        # 2. Generate PDF/CSV report
-        # 3. Store in MinIO
-        # 4. Return download link
+        with SyncSessionLocal() as db:
+            report = generate_report(db, uuid.UUID(profile_id), report_type, output_format)
 
         return {
             "status": "completed",
             "profile_id": profile_id,
             "report_type": report_type,
+            **report,
             "message": "Report generated successfully"
         }
     except Exception as e:
@@ -27,4 +37,4 @@ def generate_health_report(profile_id: str, report_type: str) -> Dict[str, Any]:
             "status": "failed",
             "profile_id": profile_id,
             "error": str(e)
-        }
\ No newline at end of file
+        }
@@ -0,0 +1,3 @@
+"""
+Latency and throughput benchmarks for the backend API.
+"""
@@ -0,0 +1,176 @@
+"""
+Latency benchmark for the authentication endpoints.
+
+Runs the FastAPI app in-process and drives concurrent clients through
+register, login, refresh and me. Point ``--database-url`` at a local
+Postgres to measure the production path; the default SQLite file is a
+stand-in that needs no services. Redis (``REDIS_URL``) is optional: the
+auth cache degrades to the database when it is unreachable.
+
+Usage (from ``backend/``):
+
+    python -m benchmarks.auth_benchmark --requests 500 --concurrency 20 --output auth.json
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import uuid
+from typing import Any, Dict, List
+
+import httpx
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.cache import get_redis
+from app.core.config import settings
+from app.core.database import Base, get_db
+from app.main import app
+from app.models.user import User
+from app.services.auth_cache import local_cache
+from app.services.password_hasher import password_hasher
+from benchmarks.harness import ScenarioResult, print_results, run_scenario, write_results
+
+AUTH_PREFIX = f"{settings.API_V1_STR}/auth"
+PASSWORD = "benchmark-password-1"
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the auth endpoints")
+    parser.add_argument(
+        "--database-url",
+        default=None,
+        help="Async SQLAlchemy URL (default: temporary SQLite file)"
+    )
+    parser.add_argument("--users", type=int, default=50, help="Users created for login/refresh/me")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=20, help="Concurrent clients")
+    parser.add_argument("--output", default="auth_benchmark.json", help="JSON results file")
+    return parser.parse_args()
+
+
+async def _redis_available() -> bool:
+    try:
+        await get_redis().ping()
+        return True
+    except Exception:
+        return False
+
+
+async def _setup_users(client: httpx.AsyncClient, count: int, run_id: str) -> List[Dict[str, Any]]:
+    """Register and log in the users shared by the read scenarios"""
+    users = []
+    for index in range(count):
+        email = f"seed-{run_id}-{index}@example.com"
+        response = await client.post(f"{AUTH_PREFIX}/register", json={"email": email, "password": PASSWORD})
+        response.raise_for_status()
+        response = await client.post(f"{AUTH_PREFIX}/login", data={"username": email, "password": PASSWORD})
+        response.raise_for_status()
+        users.append({"email": email, **response.json()})
+    return users
+
+
+async def run(args: argparse.Namespace) -> List[ScenarioResult]:
+    database_url = args.database_url
+    if database_url is None:
+        path = os.path.join(tempfile.mkdtemp(prefix="phm-bench-"), "auth.db")
+        database_url = f"sqlite+aiosqlite:///{path}"
+
+    engine = create_async_engine(database_url)
+    async with engine.begin() as conn:
+        # Only the users table: the other tables use Postgres-only column types
+        await conn.run_sync(Base.metadata.create_all, tables=[User.__table__])
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def override_get_db():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    local_cache.clear()
+
+    if not await _redis_available():
+        print(f"Redis at {settings.REDIS_URL} is unreachable; auth state will come from the database")
+
+    run_id = uuid.uuid4().hex[:8]
+    transport = httpx.ASGITransport(app=app)
+    results = []
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            users = await _setup_users(client, args.users, run_id)
+
+            def user(index: int) -> Dict[str, Any]:
+                return users[index % len(users)]
+
+            scenarios = [
+                (
+                    "register",
+                    lambda c, i: c.post(
+                        f"{AUTH_PREFIX}/register",
+                        json={"email": f"user-{run_id}-{i}@example.com", "password": PASSWORD},
+                    ),
+                    201,
+                ),
+                (
+                    "login",
+                    lambda c, i: c.post(
+                        f"{AUTH_PREFIX}/login",
+                        data={"username": user(i)["email"], "password": PASSWORD},
+                    ),
+                    200,
+                ),
+                (
+                    "refresh",
+                    lambda c, i: c.post(
+                        f"{AUTH_PREFIX}/refresh",
+                        json={"refresh_token": user(i)["refresh_token"]},
+                    ),
+                    200,
+                ),
+                (
+                    "me",
+                    lambda c, i: c.get(
+                        f"{AUTH_PREFIX}/me",
+                        headers={"Authorization": f"Bearer {user(i)['access_token']}"},
+                    ),
+                    200,
+                ),
+            ]
+
+            for name, factory, expected_status in scenarios:
+                results.append(await run_scenario(
+                    client, name, factory, args.requests, args.concurrency, expected_status
+                ))
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+        await engine.dispose()
+
+    write_results(
+        args.output,
+        "auth",
+        {
+            "database": engine.url.get_backend_name(),
+            "redis": settings.REDIS_URL,
+            "users": args.users,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+        },
+        results,
+        extra={"password_hasher": password_hasher.stats()},
+    )
+    return results
+
+
+def main() -> None:
+    args = _parse_args()
+    # Per-request access logs would dominate the run
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    results = asyncio.run(run(args))
+    print_results(results)
+    print(f"Results written to {args.output}")
+    password_hasher.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Shared benchmark harness.
+
+Drives an ASGI app in-process with concurrent ``httpx`` clients, records
+per-request latency and samples event-loop lag while the load runs.
+"""
+
+import asyncio
+import json
+import platform
+import statistics
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+# A request factory issues one request and returns the response
+RequestFactory = Callable[[httpx.AsyncClient, int], Awaitable[httpx.Response]]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of ``values`` (0 for an empty list)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    """Latency summary in milliseconds"""
+    return {
+        "mean_ms": round(statistics.fmean(values) * 1000, 3) if values else 0.0,
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p95_ms": round(percentile(values, 95) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3),
+        "max_ms": round(max(values) * 1000, 3) if values else 0.0,
+    }
+
+
+class LoopLagMonitor:
+    """Measure how late the event loop wakes a periodic sleeper"""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - started - self.interval))
+
+    def start(self) -> None:
+        self.samples = []
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+
+@dataclass
+class ScenarioResult:
+    """Outcome of one benchmark scenario"""
+    name: str
+    requests: int
+    concurrency: int
+    duration_seconds: float
+    latencies: List[float] = field(default_factory=list)
+    status_codes: Dict[int, int] = field(default_factory=dict)
+    loop_lag: List[float] = field(default_factory=list)
+    expected_status: int = 200
+
+    @property
+    def errors(self) -> int:
+        return sum(count for code, count in self.status_codes.items() if code != self.expected_status)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "requests": self.requests,
+            "concurrency": self.concurrency,
+            "errors": self.errors,
+            "status_codes": {str(code): count for code, count in sorted(self.status_codes.items())},
+            "duration_seconds": round(self.duration_seconds, 4),
+            "throughput_rps": round(self.requests / self.duration_seconds, 2) if self.duration_seconds else 0.0,
+            "latency": summarize(self.latencies),
+            "loop_lag": summarize(self.loop_lag),
+        }
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    name: str,
+    factory: RequestFactory,
+    requests: int,
+    concurrency: int,
+    expected_status: int = 200
+) -> ScenarioResult:
+    """Issue ``requests`` requests from ``concurrency`` concurrent clients"""
+    result = ScenarioResult(
+        name=name,
+        requests=requests,
+        concurrency=concurrency,
+        duration_seconds=0.0,
+        expected_status=expected_status,
+    )
+    counter = iter(range(requests))
+    monitor = LoopLagMonitor()
+
+    async def worker() -> None:
+        for index in counter:
+            started = time.perf_counter()
+            response = await factory(client, index)
+            result.latencies.append(time.perf_counter() - started)
+            result.status_codes[response.status_code] = result.status_codes.get(response.status_code, 0) + 1
+
+    monitor.start()
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result.duration_seconds = time.perf_counter() - started
+    await monitor.stop()
+    result.loop_lag = monitor.samples
+
+    return result
+
+
+def print_results(results: List[ScenarioResult]) -> None:
+    """Print a human-readable results table"""
+    header = f"{'scenario':<16}{'reqs':>7}{'err':>6}{'rps':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'lag p99':>10}"
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        data = result.to_dict()
+        latency, lag = data["latency"], data["loop_lag"]
+        print(
+            f"{result.name:<16}{result.requests:>7}{result.errors:>6}{data['throughput_rps']:>10.1f}"
+            f"{latency['p50_ms']:>10.2f}{latency['p95_ms']:>10.2f}{latency['p99_ms']:>10.2f}{lag['p99_ms']:>10.2f}"
+        )
+    print("(latencies in ms)")
+
+
+def write_results(path: str, benchmark: str, config: Dict[str, Any], results: List[ScenarioResult], extra=None) -> None:
+    """Write machine-readable results as JSON"""
+    document = {
+        "benchmark": benchmark,
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": config,
+        "scenarios": [result.to_dict() for result in results],
+        **(extra or {}),
+    }
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2)
@@ -0,0 +1,121 @@
+"""
+Middleware overhead benchmark.
+
+Compares the app's plain ASGI middleware stack with the previous
+``@app.middleware("http")`` (BaseHTTPMiddleware) timing middleware, and
+with no custom middleware at all, on the trivial ``/`` endpoint and on a
+streaming endpoint. Needs no services.
+
+Usage (from ``backend/``):
+
+    python -m benchmarks.middleware_benchmark --requests 2000 --concurrency 50 --output middleware.json
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+from typing import List
+
+import httpx
+from fastapi.responses import StreamingResponse
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.core.metrics import MetricsMiddleware
+from app.core.middleware import RequestIDMiddleware
+from app.main import app
+from benchmarks.harness import ScenarioResult, print_results, run_scenario, write_results
+
+STREAM_PATH = "/__benchmark/stream"
+ASGI_MIDDLEWARE = (MetricsMiddleware, RequestIDMiddleware)
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark middleware overhead")
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=50, help="Concurrent clients")
+    parser.add_argument("--chunks", type=int, default=64, help="Chunks per streamed response")
+    parser.add_argument("--chunk-size", type=int, default=1024, help="Bytes per streamed chunk")
+    parser.add_argument("--output", default="middleware_benchmark.json", help="JSON results file")
+    return parser.parse_args()
+
+
+async def _legacy_process_time(request, call_next):
+    """The timing middleware as it was before the plain ASGI rewrite"""
+    start_time = time.time()
+    response = await call_next(request)
+    process_time = time.time() - start_time
+    response.headers["X-Process-Time"] = str(process_time)
+    return response
+
+
+def _use_middleware(variant: str) -> None:
+    """Swap the app's custom middleware for the given variant"""
+    base = [m for m in app.user_middleware if m.cls not in ASGI_MIDDLEWARE and m.cls is not BaseHTTPMiddleware]
+    if variant == "asgi":
+        custom = [Middleware(cls) for cls in ASGI_MIDDLEWARE]
+    elif variant == "base_http":
+        custom = [Middleware(BaseHTTPMiddleware, dispatch=_legacy_process_time)]
+    else:
+        custom = []
+    app.user_middleware = custom + base
+    # Starlette builds the stack lazily on the next request
+    app.middleware_stack = None
+
+
+async def run(args: argparse.Namespace) -> List[ScenarioResult]:
+    chunk = b"x" * args.chunk_size
+
+    async def stream():
+        async def body():
+            for _ in range(args.chunks):
+                yield chunk
+                await asyncio.sleep(0)
+        return StreamingResponse(body(), media_type="application/octet-stream")
+
+    app.add_api_route(STREAM_PATH, stream, include_in_schema=False)
+    original_middleware = list(app.user_middleware)
+
+    results = []
+    try:
+        for variant in ("none", "base_http", "asgi"):
+            _use_middleware(variant)
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark") as client:
+                for endpoint, path in (("root", "/"), ("stream", STREAM_PATH)):
+                    # Warm up so the middleware stack is built before timing
+                    await client.get(path)
+                    results.append(await run_scenario(
+                        client,
+                        f"{endpoint}/{variant}",
+                        lambda c, i, path=path: c.get(path),
+                        args.requests,
+                        args.concurrency,
+                    ))
+    finally:
+        app.user_middleware = original_middleware
+        app.middleware_stack = None
+
+    write_results(
+        args.output,
+        "middleware",
+        {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "stream_bytes": args.chunks * args.chunk_size,
+        },
+        results,
+    )
+    return results
+
+
+def main() -> None:
+    args = _parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    results = asyncio.run(run(args))
+    print_results(results)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
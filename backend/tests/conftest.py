@@ -0,0 +1,162 @@
+"""
+Shared test fixtures.
+
+Tests run against a throwaway SQLite database, shared by an aiosqlite engine
+(API handlers) and a sync engine (Celery tasks), and an in-memory Redis, so
+no services are needed. Postgres-only column types are mapped to SQLite
+equivalents. Tests marked ``postgres`` need a real database in
+``TEST_DATABASE_URL`` (a sync ``postgresql://`` URL) and are skipped
+without one.
+"""
+
+import os
+import uuid
+from datetime import datetime, timezone
+
+import fakeredis
+import fakeredis.aioredis
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401 (registers every table)
+from app.api.auth import get_authenticated_user
+from app.core.database import Base, get_db, get_read_db
+from app.main import app
+from app.models.profile import Profile
+from app.models.user import User
+from app.services import auth_cache, dashboard, lab_series
+from app.services.auth_cache import AuthState
+
+
+@compiles(JSONB, "sqlite")
+def _compile_jsonb(type_, compiler, **kw):
+    return "JSON"
+
+
+@compiles(TSVECTOR, "sqlite")
+def _compile_tsvector(type_, compiler, **kw):
+    return "TEXT"
+
+
+def _register_functions(dbapi_connection, connection_record):
+    # SQLite stores naive UTC timestamps, so timezone('UTC', ts) is the identity
+    dbapi_connection.create_function("timezone", 2, lambda zone, value: value, deterministic=True)
+
+
+def utc(*args) -> datetime:
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def sync_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'phm.db'}")
+    event.listen(engine, "connect", _register_functions)
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def sync_session_factory(sync_engine):
+    return sessionmaker(sync_engine, expire_on_commit=False)
+
+
+@pytest.fixture
+def sync_db(sync_session_factory):
+    with sync_session_factory() as session:
+        yield session
+
+
+@pytest.fixture
+async def session_factory(sync_engine, tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'phm.db'}")
+    event.listen(engine.sync_engine, "connect", _register_functions)
+    yield sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest.fixture
+async def db(session_factory):
+    async with session_factory() as session:
+        yield session
+
+
+@pytest.fixture(autouse=True)
+def fake_redis(monkeypatch):
+    """In-memory Redis behind the auth, dashboard and lab series caches"""
+    server = fakeredis.FakeServer()
+    client = fakeredis.aioredis.FakeRedis(server=server)
+    auth_cache.local_cache.clear()
+    monkeypatch.setattr(auth_cache, "get_redis", lambda: client)
+    monkeypatch.setattr(dashboard, "get_redis", lambda: client)
+    monkeypatch.setattr(dashboard, "get_sync_redis", lambda: fakeredis.FakeRedis(server=server))
+    monkeypatch.setattr(lab_series, "get_redis", lambda: client)
+    return client
+
+
+def add_user(db) -> User:
+    user = User(email=f"{uuid.uuid4().hex}@example.com", password_hash="x", token_version=0)
+    db.add(user)
+    db.commit()
+    return user
+
+
+def add_profile(db, user: User, first_name: str = "Alex") -> Profile:
+    profile = Profile(user_id=user.id, first_name=first_name, last_name="Doe", is_primary=True)
+    db.add(profile)
+    db.commit()
+    return profile
+
+
+@pytest.fixture
+def user(sync_db) -> User:
+    return add_user(sync_db)
+
+
+@pytest.fixture
+def profile(sync_db, user) -> Profile:
+    return add_profile(sync_db, user)
+
+
+@pytest.fixture
+def other_profile(sync_db) -> Profile:
+    """A profile of another user"""
+    return add_profile(sync_db, add_user(sync_db), first_name="Sam")
+
+
+@pytest.fixture
+async def client(session_factory, user):
+    """API client authenticated as ``user``"""
+    async def override_db():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_db
+    app.dependency_overrides[get_read_db] = override_db
+    app.dependency_overrides[get_authenticated_user] = lambda: AuthState(
+        user_id=user.id, is_active=True, token_version=0
+    )
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def postgres_engine():
+    """Engine on TEST_DATABASE_URL with a fresh schema"""
+    url = os.environ.get("TEST_DATABASE_URL")
+    if not url:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    engine = create_engine(url)
+    with engine.begin() as connection:
+        connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    yield engine
+    Base.metadata.drop_all(engine)
+    engine.dispose()
@@ -0,0 +1,140 @@
+"""
+Incremental, memoized profile analysis.
+"""
+
+import pytest
+from sqlalchemy import delete, update
+
+from app.models.analysis import ProfileAnalysis
+from app.models.lab_result import LabResult
+from app.models.medical_visit import MedicalVisit
+from app.models.medication import Medication
+from app.services import analysis
+from app.tasks import ai_processing
+from tests.conftest import utc
+
+
+@pytest.fixture
+def provider_calls(monkeypatch):
+    """Requests handed to the analysis provider, one list per call"""
+    calls = []
+    analyze = analysis.RuleBasedProvider.analyze
+
+    def record(self, requests):
+        calls.append(list(requests))
+        return analyze(self, requests)
+    monkeypatch.setattr(analysis.RuleBasedProvider, "analyze", record)
+    return calls
+
+
+@pytest.fixture(autouse=True)
+def task_sessions(monkeypatch, sync_session_factory):
+    monkeypatch.setattr(ai_processing, "SyncSessionLocal", sync_session_factory)
+
+
+def _lab(profile, value, day, **kwargs) -> LabResult:
+    return LabResult(
+        profile_id=profile.id, test_name="LDL", value=value, unit="mg/dL", reference_high=130.0,
+        result_date=utc(2024, 1, day), created_at=utc(2024, 1, day, 12), **kwargs
+    )
+
+
+@pytest.fixture
+def records(sync_db, profile):
+    items = {
+        "high_ldl": _lab(profile, 190.0, 1),
+        "normal_ldl": _lab(profile, 100.0, 2),
+        "visit": MedicalVisit(
+            user_id=profile.user_id, profile_id=profile.id, visit_date=utc(2024, 1, 3),
+            diagnosis="Hyperlipidaemia", created_at=utc(2024, 1, 3, 12),
+        ),
+        "statin": Medication(
+            profile_id=profile.id, name="Atorvastatin", dosage="40 mg", is_active=True,
+            created_at=utc(2024, 1, 3, 12),
+        ),
+    }
+    sync_db.add_all(items.values())
+    sync_db.commit()
+    return items
+
+
+def _analyze(profile) -> str:
+    result = ai_processing.analyze_medical_data.run(str(profile.id))
+    assert result["status"] == "completed", result
+    return result["analysis"]
+
+
+def _findings(sync_db, profile):
+    sync_db.expire_all()
+    return sync_db.get(ProfileAnalysis, profile.id).result["findings"]
+
+
+def test_unchanged_profile_reuses_the_stored_result(sync_db, profile, records, provider_calls):
+    assert _analyze(profile) == "analyzed"
+    assert _analyze(profile) == "cached"
+
+    assert len(provider_calls) == 1
+    assert sorted(_findings(sync_db, profile)) == sorted([
+        f"lab_results:{records['high_ldl'].id}",
+        f"visits:{records['visit'].id}",
+        f"medications:{records['statin'].id}",
+    ])
+
+
+def test_changes_are_analysed_incrementally(sync_db, profile, records, provider_calls):
+    _analyze(profile)
+
+    new_lab = _lab(profile, 210.0, 10)
+    sync_db.add(new_lab)
+    sync_db.execute(
+        update(Medication)
+        .where(Medication.id == records["statin"].id)
+        .values(is_active=False, updated_at=utc(2024, 1, 11))
+    )
+    sync_db.commit()
+
+    assert _analyze(profile) == "updated"
+
+    # Only the new lab and the changed medication were read and sent
+    request = provider_calls[-1][0]
+    assert request.previous is not None
+    sent = {section: [record["id"] for record in items] for section, items in request.records.items()}
+    assert sent == {
+        "visits": [],
+        "lab_results": [str(new_lab.id)],
+        "medications": [str(records["statin"].id)],
+    }
+    findings = _findings(sync_db, profile)
+    assert f"lab_results:{new_lab.id}" in findings
+    assert f"medications:{records['statin'].id}" not in findings
+
+
+def test_deletions_trigger_a_full_analysis(sync_db, profile, records, provider_calls):
+    _analyze(profile)
+
+    sync_db.execute(delete(LabResult).where(LabResult.id == records["high_ldl"].id))
+    sync_db.commit()
+
+    assert _analyze(profile) == "analyzed"
+    request = provider_calls[-1][0]
+    assert request.previous is None
+    assert len(request.records["lab_results"]) == 1
+    assert f"lab_results:{records['high_ldl'].id}" not in _findings(sync_db, profile)
+
+
+def test_all_profiles_are_analysed_in_batches(sync_db, profile, other_profile, records, provider_calls):
+    result = ai_processing.analyze_all_profiles.run(batch_size=1)
+    assert result["profiles"] == {"analyzed": 2}
+    assert len(provider_calls) == 2
+
+    result = ai_processing.analyze_all_profiles.run(batch_size=1)
+    assert result["profiles"] == {"cached": 2}
+
+
+def test_analysis_failures_are_reported(profile, monkeypatch):
+    monkeypatch.setattr(analysis.settings, "ANALYSIS_PROVIDER", "missing")
+
+    result = ai_processing.analyze_medical_data.run(str(profile.id))
+
+    assert result["status"] == "failed"
+    assert "Unknown analysis provider" in result["error"]
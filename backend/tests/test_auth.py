@@ -0,0 +1,180 @@
+"""
+Token revocation and the two-tier auth state cache.
+"""
+
+import json
+import uuid
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.core.database import get_db, get_read_db
+from app.core.security import create_password_reset_token, get_password_hash
+from app.main import app
+from app.models.user import User
+from app.services import auth_cache
+from app.services.auth_cache import AuthState, LocalAuthCache, get_auth_state
+
+PASSWORD = "correct horse battery"
+NEW_PASSWORD = "staple horse battery"
+
+
+@pytest.fixture
+async def client(session_factory):
+    """API client that authenticates with real tokens"""
+    async def override_db():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_db
+    app.dependency_overrides[get_read_db] = override_db
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def account(sync_db) -> User:
+    user = User(
+        email=f"{uuid.uuid4().hex}@example.com", password_hash=get_password_hash(PASSWORD),
+        is_active=True, token_version=0,
+    )
+    sync_db.add(user)
+    sync_db.commit()
+    return user
+
+
+async def login(client, user, password=PASSWORD):
+    response = await client.post(
+        "/api/v1/auth/login", data={"username": user.email, "password": password}
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+def bearer(tokens):
+    return {"Authorization": f"Bearer {tokens['access_token']}"}
+
+
+async def cached_in_redis(fake_redis, user):
+    raw = await fake_redis.get(f"{auth_cache.KEY_PREFIX}{user.id}")
+    return None if raw is None else json.loads(raw)
+
+
+async def test_login_primes_both_cache_tiers(client, account, fake_redis):
+    tokens = await login(client, account)
+
+    assert auth_cache.local_cache.get(account.id) == AuthState(account.id, True, 0)
+    assert await cached_in_redis(fake_redis, account) == {"is_active": True, "token_version": 0}
+    response = await client.get("/api/v1/auth/me", headers=bearer(tokens))
+    assert response.status_code == 200
+    assert response.json()["email"] == account.email
+
+
+async def revoke_by_logout(client, account, tokens):
+    return await client.post("/api/v1/auth/logout", headers=bearer(tokens))
+
+
+async def revoke_by_change_password(client, account, tokens):
+    return await client.post(
+        "/api/v1/auth/change-password", headers=bearer(tokens),
+        json={"current_password": PASSWORD, "new_password": NEW_PASSWORD},
+    )
+
+
+async def revoke_by_reset_password(client, account, tokens):
+    return await client.post(
+        "/api/v1/auth/reset-password",
+        json={"token": create_password_reset_token(account.email), "new_password": NEW_PASSWORD},
+    )
+
+
+@pytest.mark.parametrize("revoke", [
+    revoke_by_logout, revoke_by_change_password, revoke_by_reset_password,
+])
+async def test_revocation_rejects_issued_tokens(client, account, fake_redis, revoke):
+    tokens = await login(client, account)
+    assert (await client.get("/api/v1/auth/me", headers=bearer(tokens))).status_code == 200
+
+    assert (await revoke(client, account, tokens)).status_code == 200
+
+    # Both cache tiers were dropped, not left to expire
+    assert auth_cache.local_cache.get(account.id) is None
+    assert await cached_in_redis(fake_redis, account) is None
+
+    assert (await client.get("/api/v1/auth/me", headers=bearer(tokens))).status_code == 401
+    refreshed = await client.post(
+        "/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]}
+    )
+    assert refreshed.status_code == 401
+    # The reloaded state carries the new version
+    assert await cached_in_redis(fake_redis, account) == {"is_active": True, "token_version": 1}
+
+
+async def test_tokens_issued_after_revocation_work(client, account):
+    tokens = await login(client, account)
+    await revoke_by_change_password(client, account, tokens)
+
+    fresh = await login(client, account, NEW_PASSWORD)
+
+    assert (await client.get("/api/v1/auth/me", headers=bearer(fresh))).status_code == 200
+    refreshed = await client.post("/api/v1/auth/refresh", json={"refresh_token": fresh["refresh_token"]})
+    assert refreshed.status_code == 200
+
+
+async def test_deactivated_user_rejected_while_cache_is_live(client, account, sync_db, fake_redis):
+    tokens = await login(client, account)
+    # Deactivated elsewhere without touching this process's cache
+    account.is_active = False
+    sync_db.commit()
+    assert auth_cache.local_cache.get(account.id).is_active
+
+    response = await client.get("/api/v1/auth/me", headers=bearer(tokens))
+
+    assert response.status_code == 403
+    assert auth_cache.local_cache.get(account.id) is None
+    assert await cached_in_redis(fake_redis, account) is None
+    # Handlers that only use the cached state now see the change too
+    medications = await client.get(
+        "/api/v1/medications/", params={"profile_id": str(uuid.uuid4())}, headers=bearer(tokens)
+    )
+    assert medications.status_code == 403
+
+
+async def test_cached_inactive_state_is_rejected(client, account):
+    tokens = await login(client, account)
+    auth_cache.local_cache.set(AuthState(account.id, False, 0))
+
+    response = await client.get(
+        "/api/v1/medications/", params={"profile_id": str(uuid.uuid4())}, headers=bearer(tokens)
+    )
+
+    assert response.status_code == 403
+
+
+async def test_redis_tier_serves_without_database(account, fake_redis):
+    await auth_cache.cache_auth_state(account)
+    auth_cache.local_cache.clear()
+
+    # No session: the state must come from Redis
+    state = await get_auth_state(None, account.id)
+
+    assert state == AuthState(account.id, True, 0)
+    assert auth_cache.local_cache.get(account.id) == state
+
+
+def test_local_cache_expires_and_evicts_least_recent(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(auth_cache.time, "monotonic", lambda: now[0])
+    cache = LocalAuthCache(max_size=2, ttl=5)
+    a, b, c = (AuthState(uuid.uuid4(), True, 0) for _ in range(3))
+
+    cache.set(a)
+    cache.set(b)
+    assert cache.get(a.user_id) == a  # a is now the most recent
+    cache.set(c)
+    assert cache.get(b.user_id) is None
+    assert cache.get(a.user_id) == a and cache.get(c.user_id) == c
+
+    now[0] += 6
+    assert cache.get(a.user_id) is None
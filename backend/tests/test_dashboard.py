@@ -0,0 +1,105 @@
+"""
+Stale-while-revalidate dashboard summary.
+"""
+
+import asyncio
+from datetime import date
+
+import pytest
+
+from app.core.config import settings
+from app.models.medication import Medication
+from app.services import dashboard
+from app.services.dashboard import (
+    get_dashboard_summary,
+    get_section_revision,
+    invalidate_dashboard,
+    invalidate_dashboard_sync,
+)
+
+
+@pytest.fixture
+def background(monkeypatch, session_factory):
+    """Run background refreshes on the test database and wait for them"""
+    monkeypatch.setattr(dashboard, "AsyncSessionLocal", session_factory)
+
+    async def finished():
+        await asyncio.gather(*dashboard._refresh_tasks)
+    return finished
+
+
+def add_medication(sync_db, profile, name):
+    sync_db.add(Medication(
+        profile_id=profile.id, name=name, dosage="10 mg", start_date=date(2024, 1, 5), is_active=True,
+    ))
+    sync_db.commit()
+
+
+async def test_missing_sections_are_computed_and_cached(db, profile, sync_db, fake_redis):
+    add_medication(sync_db, profile, "Lisinopril")
+
+    summary = await get_dashboard_summary(db, profile.id)
+
+    assert summary["stale_sections"] == []
+    assert summary["medications"]["active"] == 1
+    assert summary["visits"]["total"] == 0
+    cached = await fake_redis.hkeys(dashboard._cache_key(profile.id))
+    assert sorted(key.decode() for key in cached) == sorted(dashboard.SECTIONS)
+
+
+async def test_revision_bump_serves_stale_section_then_refreshes(db, profile, sync_db, background):
+    add_medication(sync_db, profile, "Lisinopril")
+    await get_dashboard_summary(db, profile.id)
+    add_medication(sync_db, profile, "Metformin")
+
+    await invalidate_dashboard(profile.id, "medications")
+    stale = await get_dashboard_summary(db, profile.id)
+
+    # Served immediately from the cache, only the invalidated section is refreshed
+    assert stale["stale_sections"] == ["medications"]
+    assert stale["medications"]["active"] == 1
+    await background()
+
+    fresh = await get_dashboard_summary(db, profile.id)
+    assert fresh["stale_sections"] == []
+    assert [item["name"] for item in fresh["medications"]["active_list"]] == ["Lisinopril", "Metformin"]
+
+
+async def test_sections_past_their_max_age_are_revalidated(db, profile, monkeypatch, background):
+    await get_dashboard_summary(db, profile.id, ["documents"])
+    monkeypatch.setattr(settings, "DASHBOARD_CACHE_MAX_AGE", -1)
+
+    summary = await get_dashboard_summary(db, profile.id, ["documents"])
+
+    assert summary["stale_sections"] == ["documents"]
+    await background()
+
+
+async def test_concurrent_refreshes_are_single_flight(db, profile, fake_redis, background):
+    await get_dashboard_summary(db, profile.id, ["documents"])
+    await invalidate_dashboard(profile.id, "documents")
+    # Another worker is already refreshing this profile
+    await fake_redis.set(f"{dashboard._cache_key(profile.id)}:refreshing", 1)
+
+    await get_dashboard_summary(db, profile.id, ["documents"])
+    await background()
+
+    assert (await get_dashboard_summary(db, profile.id, ["documents"]))["stale_sections"] == ["documents"]
+
+
+async def test_sync_and_async_invalidation_share_revisions(profile, fake_redis):
+    await invalidate_dashboard(profile.id, "documents")
+    invalidate_dashboard_sync(profile.id, "documents", "lab_results")
+
+    assert await get_section_revision(profile.id, "documents") == 2
+    assert await get_section_revision(profile.id, "lab_results") == 1
+    assert await get_section_revision(profile.id, "visits") == 0
+    # Revisions must outlive every cache derived from them
+    assert await fake_redis.ttl(dashboard._revisions_key(profile.id)) == -1
+
+
+async def test_invalidating_without_a_profile_is_a_no_op(fake_redis):
+    await invalidate_dashboard(None, "documents")
+    invalidate_dashboard_sync(None, "documents")
+
+    assert await fake_redis.keys() == []
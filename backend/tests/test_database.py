@@ -0,0 +1,159 @@
+"""
+Read replica routing, pool checkout metrics and idle connection health checks.
+"""
+
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy import create_engine, event, exc, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import (
+    Base,
+    InstrumentedAsyncPool,
+    InstrumentedQueuePool,
+    PoolHealthMonitor,
+    RoutingSession,
+)
+from app.models.user import User
+from tests.conftest import _register_functions
+
+
+def _user(email: str) -> User:
+    return User(id=uuid.uuid4(), email=email, password_hash="x", token_version=0)
+
+
+@pytest.fixture
+async def routed(tmp_path):
+    """A primary and a replica database holding different users"""
+    engines = {}
+    for name in ("primary", "replica"):
+        path = tmp_path / f"{name}.db"
+        sync = create_engine(f"sqlite:///{path}")
+        event.listen(sync, "connect", _register_functions)
+        Base.metadata.create_all(sync)
+        with sessionmaker(sync)() as db:
+            db.add(_user(f"{name}@example.com"))
+            db.commit()
+        sync.dispose()
+        engines[name] = create_async_engine(f"sqlite+aiosqlite:///{path}")
+
+    factory = sessionmaker(
+        engines["primary"], class_=AsyncSession, sync_session_class=RoutingSession,
+        expire_on_commit=False,
+    )
+    yield lambda replica=engines["replica"]: factory(info={"replica": replica})
+    for async_engine in engines.values():
+        await async_engine.dispose()
+
+
+async def emails(db, query=None):
+    return (await db.execute(query if query is not None else select(User.email))).scalars().all()
+
+
+async def test_plain_selects_go_to_the_replica(routed):
+    async with routed() as db:
+        assert await emails(db) == ["replica@example.com"]
+        assert (await db.execute(select(User))).scalars().one().email == "replica@example.com"
+
+
+async def test_locking_reads_and_writes_go_to_the_primary(routed):
+    async with routed() as db:
+        assert await emails(db, select(User.email).with_for_update()) == ["primary@example.com"]
+
+        db.add(_user("new@example.com"))
+        await db.flush()
+        # Statements other than SELECT (the flush above, raw SQL) use the primary
+        count = (await db.execute(text("SELECT count(*) FROM users"))).scalar_one()
+        assert count == 2
+        await db.commit()
+
+    async with routed(replica=None) as db:
+        assert sorted(await emails(db)) == ["new@example.com", "primary@example.com"]
+
+
+def test_pool_metrics_count_checkouts_and_timeouts(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.05,
+    )
+    try:
+        with engine.connect():
+            with pytest.raises(exc.TimeoutError):
+                engine.connect()
+        with engine.connect():
+            pass
+
+        stats = engine.pool.metrics.snapshot()
+        assert (stats["checkouts"], stats["timeouts"], stats["waiting"]) == (2, 1, 0)
+        assert stats["max_wait_seconds"] >= stats["avg_wait_seconds"] >= 0
+    finally:
+        engine.dispose()
+
+
+@pytest.fixture
+async def pooled(tmp_path):
+    """Async engine with two idle pooled connections"""
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedAsyncPool, pool_size=2, max_overflow=0,
+    )
+    async with engine.connect(), engine.connect():
+        pass
+    assert engine.pool.checkedin() == 2
+    yield engine
+    await engine.dispose()
+
+
+def fail_pings(engine, disconnect: bool):
+    """Make the next ping fail, as a lost connection or as another error"""
+    failing = [True]
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute", retval=True)
+    def break_statement(conn, cursor, statement, parameters, context, executemany):
+        if failing[0]:
+            failing[0] = False
+            return "SELECT * FROM missing_table", parameters
+        return statement, parameters
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def mark_disconnect(context):
+        context.is_disconnect = disconnect
+
+
+async def test_failed_ping_evicts_the_connection(pooled):
+    fail_pings(pooled, disconnect=True)
+    monitor = PoolHealthMonitor(pooled, interval=60)
+
+    await monitor.check()
+
+    status = monitor.status()
+    assert status["healthy"] is True
+    assert (status["checked_total"], status["evicted_total"]) == (1, 1)
+
+
+async def test_other_errors_mark_the_pool_unhealthy(pooled):
+    fail_pings(pooled, disconnect=False)
+    monitor = PoolHealthMonitor(pooled, interval=60)
+
+    await monitor.check()
+
+    status = monitor.status()
+    assert status["healthy"] is False
+    assert "missing_table" in status["last_error"]
+    assert status["evicted_total"] == 0
+
+
+async def test_monitor_runs_periodically_until_stopped(pooled):
+    monitor = PoolHealthMonitor(pooled, interval=0.01)
+    monitor.start()
+    for _ in range(500):
+        if monitor.status()["checked_total"] >= 2:
+            break
+        await asyncio.sleep(0.01)
+    await monitor.stop()
+
+    assert monitor.status()["checked_total"] >= 2
+    assert monitor.status()["last_check_at"] is not None
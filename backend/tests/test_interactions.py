@@ -0,0 +1,121 @@
+"""
+Local drug-interaction index and the checks on medication create.
+"""
+
+import uuid
+
+import pytest
+
+from app.core.config import settings
+from app.models.medication import Medication
+from app.services import interactions
+from app.services.interactions import InteractionIndex, build_index, ingredients
+from app.tasks import ai_processing
+
+MEDICATIONS = f"{settings.API_V1_STR}/medications"
+
+
+@pytest.fixture(scope="module")
+def index(tmp_path_factory) -> InteractionIndex:
+    path = tmp_path_factory.mktemp("interactions") / "interactions.idx"
+    assert build_index(interactions.BUNDLED_DATASET, path) > 0
+    return InteractionIndex(path)
+
+
+@pytest.fixture
+def process_index(monkeypatch, tmp_path):
+    """The process-wide index, compiled into a temporary file"""
+    monkeypatch.setattr(settings, "DRUG_INTERACTIONS_INDEX_PATH", str(tmp_path / "interactions.idx"))
+    interactions.get_interaction_index.cache_clear()
+    yield
+    interactions.get_interaction_index.cache_clear()
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("Metformin 500 mg tablet", ["metformin"]),
+    ("Lisinopril/Hydrochlorothiazide", ["lisinopril", "hydrochlorothiazide"]),
+    ("Metoprolol succinate ER", ["metoprolol"]),
+    ("Potassium chloride 20 mEq", ["potassium chloride"]),
+    ("Coumadin 5 mg", ["warfarin"]),
+    ("Bactrim DS", ["sulfamethoxazole", "trimethoprim"]),
+])
+def test_medication_names_are_normalised_to_ingredients(name, expected):
+    assert ingredients(name) == expected
+
+
+def test_known_pairs_are_found_in_either_order(index):
+    for names in (["Warfarin", "Aspirin 81 mg"], ["Aspirin 81 mg", "Warfarin"]):
+        [interaction] = index.check(names)
+        assert {interaction.ingredient_a, interaction.ingredient_b} == {"warfarin", "aspirin"}
+        assert interaction.severity == "major"
+        assert interaction.description
+
+
+def test_brands_and_combinations_are_checked_by_ingredient(index):
+    found = index.check(["Zocor 20 mg", "Clarithromycin 500 mg", "K-Dur 20 mEq", "Lisinopril 10 mg"])
+
+    pairs = [({i.ingredient_a, i.ingredient_b}, i.severity) for i in found]
+    assert pairs == [
+        ({"simvastatin", "clarithromycin"}, "contraindicated"),
+        ({"potassium chloride", "lisinopril"}, "major"),
+    ]
+    assert found[0].medication_a == "Zocor 20 mg"
+
+
+def test_unrelated_medications_have_no_interactions(index):
+    assert index.check(["Metformin", "Vitamin D3", "Metformin"]) == []
+    assert index.check(["Warfarin"]) == []
+
+
+async def test_create_lists_interactions_with_active_medications(client, sync_db, profile, process_index):
+    sync_db.add_all([
+        Medication(profile_id=profile.id, name="Coumadin 5 mg", is_active=True),
+        Medication(profile_id=profile.id, name="Ibuprofen 400 mg", is_active=False),
+        Medication(profile_id=profile.id, name="Fluconazole", is_active=True),
+    ])
+    sync_db.commit()
+
+    response = await client.post(MEDICATIONS + "/", json={
+        "profile_id": str(profile.id),
+        "name": "Aspirin 81 mg",
+    })
+
+    assert response.status_code == 201
+    found = response.json()["interactions"]
+    assert [(i["medication_a"], i["medication_b"], i["severity"]) for i in found] == [
+        ("Aspirin 81 mg", "Coumadin 5 mg", "major")
+    ]
+
+
+
+async def test_inactive_medications_are_not_checked(client, sync_db, profile, monkeypatch):
+    sync_db.add(Medication(profile_id=profile.id, name="Coumadin 5 mg", is_active=True))
+    sync_db.commit()
+    monkeypatch.setattr(
+        "app.api.medications.check_interactions", lambda names: pytest.fail("Index was queried"),
+    )
+
+    response = await client.post(MEDICATIONS + "/", json={
+        "profile_id": str(profile.id),
+        "name": "Aspirin 81 mg",
+        "is_active": False,
+    })
+
+    assert response.status_code == 201
+    assert response.json()["interactions"] == []
+
+def test_interaction_task_checks_active_medications(
+    sync_db, sync_session_factory, profile, process_index, monkeypatch
+):
+    monkeypatch.setattr(ai_processing, "SyncSessionLocal", sync_session_factory)
+    sync_db.add_all([
+        Medication(profile_id=profile.id, name="Simvastatin", is_active=True),
+        Medication(profile_id=profile.id, name="Itraconazole", is_active=True),
+    ])
+    sync_db.commit()
+
+    result = ai_processing.process_drug_interactions.run(str(profile.id))
+
+    assert result["status"] == "completed"
+    assert [i["severity"] for i in result["interactions"]] == ["contraindicated"]
+    assert ai_processing.process_drug_interactions.run(str(uuid.uuid4()))["interactions"] == []
@@ -0,0 +1,109 @@
+"""
+Vectorised lab-result trend statistics.
+"""
+
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from app.services.lab_series import SECONDS_PER_YEAR, LabSeries
+
+BASE = datetime(2020, 1, 1, tzinfo=timezone.utc)
+
+
+def at(years: float) -> float:
+    return BASE.timestamp() + years * SECONDS_PER_YEAR
+
+
+def moment(years: float) -> datetime:
+    return BASE + timedelta(seconds=years * SECONDS_PER_YEAR)
+
+
+# Glucose is given out of order; HbA1c has a single result and no range
+GROUPS = [
+    ("Glucose", "mg/dL", [at(2), at(0), at(1)], [120.0, 90.0, 100.0], [70.0] * 3, [99.0] * 3),
+    ("HbA1c", None, [at(1)], [5.4], [None], [None]),
+]
+
+
+@pytest.fixture
+def series():
+    return LabSeries.from_groups(GROUPS)
+
+
+def by_analyte(trends):
+    return {trend["analyte"]: trend for trend in trends}
+
+
+def test_statistics_match_hand_computed_values(series):
+    trends = by_analyte(series.trends(window=2, include_points=True))
+
+    glucose = trends["Glucose"]
+    assert glucose["count"] == 3
+    assert (glucose["min"], glucose["max"], glucose["latest_value"]) == (90.0, 120.0, 120.0)
+    assert glucose["mean"] == pytest.approx(310 / 3)
+    # Values 90, 100, 120 one year apart: (3 * 340 - 3 * 310) / (3 * 5 - 3 ** 2)
+    assert glucose["slope_per_year"] == pytest.approx(15.0)
+    assert glucose["out_of_range_count"] == 2
+    assert glucose["latest_out_of_range"] is True
+    assert glucose["first_date"] == BASE.isoformat()
+    assert [point["value"] for point in glucose["points"]] == [90.0, 100.0, 120.0]
+    assert [point["rolling_mean"] for point in glucose["points"]] == [90.0, 95.0, 110.0]
+    assert [point["out_of_range"] for point in glucose["points"]] == [False, True, True]
+
+
+def test_single_point_has_no_slope(series):
+    hba1c = by_analyte(series.trends(include_points=True))["HbA1c"]
+
+    assert hba1c["count"] == 1
+    assert hba1c["unit"] is None
+    assert hba1c["slope_per_year"] is None
+    assert hba1c["mean"] == hba1c["latest_value"] == 5.4
+    assert (hba1c["reference_low"], hba1c["reference_high"]) == (None, None)
+    assert hba1c["out_of_range_count"] == 0
+    assert hba1c["points"][0]["rolling_mean"] == 5.4
+
+
+def test_unsorted_input_is_ordered_by_time(series):
+    assert np.all(np.diff(series.timestamps[:3]) > 0)
+    assert series.values.tolist() == [90.0, 100.0, 120.0, 5.4]
+
+
+def test_window_restricts_each_series(series):
+    trends = by_analyte(series.trends(start=moment(1), window=5, include_points=True))
+
+    glucose = trends["Glucose"]
+    assert glucose["count"] == 2
+    assert glucose["slope_per_year"] == pytest.approx(20.0)
+    # The rolling mean only sees results inside the window
+    assert [point["rolling_mean"] for point in glucose["points"]] == [100.0, 110.0]
+    assert trends["HbA1c"]["count"] == 1
+
+
+def test_empty_windows_are_dropped(series):
+    assert series.trends(start=moment(3)) == []
+    assert series.trends(end=moment(-1)) == []
+    assert [trend["analyte"] for trend in series.trends(end=moment(0.5))] == ["Glucose"]
+    assert series.trends(analytes=["Cholesterol"]) == []
+    assert LabSeries.from_groups([]).trends() == []
+
+
+def test_naive_bounds_are_read_as_utc(series, monkeypatch):
+    monkeypatch.setenv("TZ", "America/New_York")
+    time.tzset()
+    try:
+        naive = moment(1).replace(tzinfo=None)
+        trends = series.trends(start=naive, analytes=["Glucose"])
+    finally:
+        monkeypatch.undo()
+        time.tzset()
+
+    assert trends[0]["count"] == 2
+
+
+def test_packed_columns_round_trip(series):
+    restored = LabSeries.from_bytes(series.to_bytes())
+
+    assert restored.trends(include_points=True) == series.trends(include_points=True)
@@ -0,0 +1,109 @@
+"""
+Medication create and bulk import endpoints.
+"""
+
+import json
+import uuid
+
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.models.medical_visit import MedicalVisit
+from app.models.medication import Medication
+from tests.conftest import utc
+
+MEDICATIONS = f"{settings.API_V1_STR}/medications"
+
+
+def _visit(sync_db, profile) -> MedicalVisit:
+    visit = MedicalVisit(
+        user_id=profile.user_id, profile_id=profile.id, visit_date=utc(2024, 3, 1), reason="Checkup"
+    )
+    sync_db.add(visit)
+    sync_db.commit()
+    return visit
+
+
+def _ndjson(*records) -> bytes:
+    return "\n".join(
+        record if isinstance(record, str) else json.dumps(record) for record in records
+    ).encode()
+
+
+async def _import(client, profile, body: bytes, content_type="application/x-ndjson"):
+    return await client.post(
+        f"{MEDICATIONS}/import",
+        params={"profile_id": str(profile.id)},
+        content=body,
+        headers={"Content-Type": content_type},
+    )
+
+
+async def _count(db, profile) -> int:
+    return await db.scalar(
+        select(func.count()).select_from(Medication).where(Medication.profile_id == profile.id)
+    )
+
+
+async def test_import_reports_invalid_rows_and_saves_the_rest(client, db, sync_db, profile, other_profile):
+    own_visit = _visit(sync_db, profile)
+    foreign_visit = _visit(sync_db, other_profile)
+
+    response = await _import(client, profile, _ndjson(
+        {"name": "Metformin", "dosage": "500 mg"},
+        "{not json",
+        {"dosage": "10 mg"},
+        {"name": "Lisinopril", "visit_id": str(own_visit.id)},
+        {"name": "Atorvastatin", "visit_id": str(foreign_visit.id)},
+        {"name": "Aspirin", "visit_id": str(uuid.uuid4())},
+        {"name": "Ibuprofen", "start_date": "2024-05-01", "end_date": "2024-04-01"},
+    ))
+
+    assert response.status_code == 200
+    result = response.json()
+    assert (result["received"], result["inserted"], result["failed"]) == (7, 2, 5)
+    assert sorted(error["row"] for error in result["errors"]) == [2, 3, 5, 6, 7]
+    visit_errors = [error for error in result["errors"] if error["row"] in (5, 6)]
+    assert all(error["errors"][0]["type"] == "visit_not_found" for error in visit_errors)
+
+    names = (await db.scalars(
+        select(Medication.name).where(Medication.profile_id == profile.id).order_by(Medication.name)
+    )).all()
+    assert names == ["Lisinopril", "Metformin"]
+
+
+async def test_import_accepts_csv(client, db, profile):
+    body = b'name,dosage,notes\nMetformin,500 mg,"with food,\ntwice daily"\n,10 mg,\n'
+
+    response = await _import(client, profile, body, content_type="text/csv")
+
+    result = response.json()
+    assert (result["inserted"], result["failed"]) == (1, 1)
+    notes = await db.scalar(select(Medication.notes).where(Medication.profile_id == profile.id))
+    assert notes == "with food,\ntwice daily"
+
+
+async def test_import_saves_nothing_when_it_fails_midway(client, db, profile, monkeypatch):
+    monkeypatch.setattr(settings, "MEDICATION_IMPORT_CHUNK_SIZE", 2)
+    monkeypatch.setattr(settings, "MEDICATION_IMPORT_MAX_ROWS", 3)
+
+    # The first chunk is inserted before the row limit is hit
+    response = await _import(client, profile, _ndjson(*({"name": f"Drug {i}"} for i in range(4))))
+
+    assert response.status_code == 422
+    assert await _count(db, profile) == 0
+
+
+async def test_create_rejects_a_visit_of_another_profile(client, db, sync_db, profile, other_profile):
+    foreign_visit = _visit(sync_db, other_profile)
+
+    for visit_id in (foreign_visit.id, uuid.uuid4()):
+        response = await client.post(MEDICATIONS + "/", json={
+            "profile_id": str(profile.id),
+            "name": "Metformin",
+            "visit_id": str(visit_id),
+        })
+        assert response.status_code == 422
+
+    assert await _count(db, profile) == 0
+
@@ -0,0 +1,56 @@
+"""
+Prometheus metrics exposition.
+"""
+
+import pytest
+from prometheus_client.parser import text_string_to_metric_families
+
+from app.core import metrics
+from app.services.password_hasher import password_hasher
+
+
+@pytest.fixture
+async def scrape(client, fake_redis, monkeypatch):
+    monkeypatch.setattr(metrics, "get_redis", lambda: fake_redis)
+
+    async def scrape():
+        response = await client.get("/metrics")
+        assert response.status_code == 200
+        return {family.name: family for family in text_string_to_metric_families(response.text)}
+    return scrape
+
+
+def samples(family):
+    return {(sample.name, tuple(sorted(sample.labels.items()))): sample.value for sample in family.samples}
+
+
+@pytest.mark.parametrize("name", [
+    "db_pool_checkouts", "db_pool_checkout_timeouts", "db_pool_checkout_wait_seconds",
+    "password_hash_rejected",
+])
+async def test_totals_are_exposed_as_counters(scrape, name):
+    family = (await scrape())[name]
+
+    assert family.type == "counter"
+    assert all(sample.name == f"{name}_total" for sample in family.samples)
+
+
+async def test_counters_follow_the_pool_totals(scrape, monkeypatch):
+    monkeypatch.setattr(password_hasher, "_rejected", 3)
+    monkeypatch.setattr(metrics, "pool_stats", lambda: {"primary": {
+        "checked_out": 2, "checked_in": 3, "overflow": 0, "waiting": 1,
+        "checkouts": 40, "timeouts": 2, "wait_seconds_total": 1.5,
+    }})
+
+    families = await scrape()
+
+    assert samples(families["db_pool_checkouts"]) == {("db_pool_checkouts_total", (("pool", "primary"),)): 40}
+    assert samples(families["db_pool_checkout_timeouts"])[
+        ("db_pool_checkout_timeouts_total", (("pool", "primary"),))
+    ] == 2
+    assert samples(families["password_hash_rejected"]) == {("password_hash_rejected_total", ()): 3}
+    # Current levels stay gauges
+    assert families["db_pool_waiting_checkouts"].type == "gauge"
+    assert samples(families["db_pool_connections"])[
+        ("db_pool_connections", (("pool", "primary"), ("state", "checked_out")))
+    ] == 2
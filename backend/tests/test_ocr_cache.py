@@ -0,0 +1,73 @@
+"""
+Page-level OCR cache scripts, run by fakeredis' Lua support.
+"""
+
+import itertools
+
+import fakeredis
+import pytest
+from PIL import Image
+
+from app.services import ocr_cache
+from app.services.ocr_cache import KEY_PREFIX, OCRPageCache, page_hash
+
+PAGE = "x" * 100
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    # Distinct, increasing LRU scores regardless of the clock's resolution
+    ticks = itertools.count(1)
+    monkeypatch.setattr(ocr_cache.time, "time", lambda: float(next(ticks)))
+    return OCRPageCache(client=fakeredis.FakeRedis(), max_bytes=250)
+
+
+def test_hit_and_miss_are_counted(cache):
+    assert cache.get("letterhead") is None
+    cache.set("letterhead", "Springfield Clinic – Dr. Müller")
+
+    assert cache.get("letterhead") == "Springfield Clinic – Dr. Müller"
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+    assert stats["entries"] == 1
+    assert stats["bytes"] == len("Springfield Clinic – Dr. Müller".encode("utf-8"))
+
+
+def test_least_recently_used_pages_are_evicted_over_budget(cache):
+    cache.set("a", PAGE)
+    cache.set("b", PAGE)
+    assert cache.get("a") == PAGE  # b is now the least recently used
+
+    cache.set("c", PAGE)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == PAGE and cache.get("c") == PAGE
+    stats = cache.stats()
+    assert (stats["evictions"], stats["entries"], stats["bytes"]) == (1, 2, 200)
+    assert not cache.client.exists(KEY_PREFIX + "b")
+
+
+def test_overwriting_a_page_keeps_the_size_exact(cache):
+    cache.set("a", PAGE)
+    cache.set("a", "short")
+
+    stats = cache.stats()
+    assert (stats["bytes"], stats["entries"], stats["evictions"]) == (5, 1, 0)
+
+
+def test_page_larger_than_the_budget_is_not_kept(cache):
+    cache.set("a", PAGE)
+    cache.set("huge", "y" * 300)
+
+    stats = cache.stats()
+    assert (stats["entries"], stats["bytes"], stats["evictions"]) == (0, 0, 2)
+
+
+def test_page_hash_depends_on_pixels_and_language():
+    white = Image.new("L", (20, 20), 255)
+    dotted = white.copy()
+    dotted.putpixel((3, 3), 0)
+
+    assert page_hash(white, "eng") == page_hash(white.copy(), "eng")
+    assert page_hash(white, "eng") != page_hash(dotted, "eng")
+    assert page_hash(white, "eng") != page_hash(white, "deu")
@@ -0,0 +1,245 @@
+"""
+OCR dispatcher claims, the conditional start of OCR processing and the
+fencing of a run's writes by its claim.
+"""
+
+import contextlib
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
+
+from app.models.document import Document
+from app.services.ocr import PageResult
+from app.tasks import ocr
+from tests.conftest import add_user, utc
+
+
+@pytest.fixture
+def published(monkeypatch, sync_session_factory):
+    """Route the tasks' sessions to the test database and record published OCR tasks"""
+    monkeypatch.setattr(ocr, "SyncSessionLocal", sync_session_factory)
+    monkeypatch.setattr(ocr.celery_app, "producer_or_acquire", lambda: contextlib.nullcontext())
+    messages = []
+    monkeypatch.setattr(
+        ocr.process_document_ocr, "apply_async", lambda args, **kwargs: messages.append(args[0])
+    )
+    return messages
+
+
+def _document(db, user, status="pending", created_at=None, claimed_at=None) -> Document:
+    document = Document(
+        user_id=user.id,
+        title="Scan",
+        document_type="lab_report",
+        filename="scan.pdf",
+        file_path=f"documents/{uuid.uuid4()}.pdf",
+        status=status,
+        created_at=created_at or datetime.now(timezone.utc),
+        claimed_at=claimed_at,
+    )
+    db.add(document)
+    db.commit()
+    return document
+
+
+def _statuses(db, documents):
+    db.expire_all()
+    return [db.get(Document, document.id).status for document in documents]
+
+
+def test_dispatcher_claims_the_oldest_pending_documents(sync_db, user, published):
+    documents = [_document(sync_db, user, created_at=utc(2024, 1, day)) for day in (3, 1, 2)]
+
+    result = ocr.process_pending_documents(batch_size=2)
+
+    assert (result["dispatched"], result["backlog"]) == (2, 1)
+    assert sorted(published) == sorted(str(documents[i].id) for i in (1, 2))
+    assert _statuses(sync_db, documents) == ["pending", "queued", "queued"]
+    assert all(sync_db.get(Document, documents[i].id).claimed_at for i in (1, 2))
+
+
+def test_dispatcher_reclaims_expired_claims(sync_db, user, published, monkeypatch):
+    monkeypatch.setattr(ocr.settings, "OCR_CLAIM_TIMEOUT_SECONDS", 60)
+    expired = datetime.now(timezone.utc) - timedelta(minutes=10)
+    lost = _document(sync_db, user, status="queued", claimed_at=expired)
+    dead = _document(sync_db, user, status="processing", claimed_at=expired)
+    running = _document(sync_db, user, status="processing", claimed_at=datetime.now(timezone.utc))
+    done = _document(sync_db, user, status="completed", claimed_at=expired)
+
+    result = ocr.process_pending_documents(batch_size=10)
+
+    assert (result["reclaimed"], result["dispatched"]) == (2, 2)
+    assert sorted(published) == sorted([str(lost.id), str(dead.id)])
+    assert _statuses(sync_db, [lost, dead, running, done]) == [
+        "queued", "queued", "processing", "completed"
+    ]
+
+
+def test_unpublished_documents_return_to_pending(sync_db, user, published, monkeypatch):
+    documents = [_document(sync_db, user, created_at=utc(2024, 1, day)) for day in (1, 2, 3)]
+
+    def publish(args, **kwargs):
+        if published:
+            raise ConnectionError("broker unavailable")
+        published.append(args[0])
+    monkeypatch.setattr(ocr.process_document_ocr, "apply_async", publish)
+
+    result = ocr.process_pending_documents(batch_size=10)
+
+    assert (result["dispatched"], result["failed"]) == (1, 2)
+    assert _statuses(sync_db, documents) == ["queued", "pending", "pending"]
+
+
+def test_ocr_starts_a_document_only_once(sync_db, user, published):
+    document = _document(sync_db, user, status="queued")
+
+    assert ocr._start_processing(sync_db, document.id)
+    assert not ocr._start_processing(sync_db, document.id)
+
+    # A redelivered message for the running document is skipped
+    result = ocr.process_document_ocr.run(str(document.id))
+    assert result["status"] == "skipped"
+    assert _statuses(sync_db, [document]) == ["processing"]
+
+
+@pytest.mark.postgres
+def test_dispatcher_skips_rows_locked_by_another_dispatcher(postgres_engine, monkeypatch):
+    factory = sessionmaker(postgres_engine, expire_on_commit=False)
+    monkeypatch.setattr(ocr, "SyncSessionLocal", factory)
+    monkeypatch.setattr(ocr.celery_app, "producer_or_acquire", lambda: contextlib.nullcontext())
+    monkeypatch.setattr(ocr.process_document_ocr, "apply_async", lambda args, **kwargs: None)
+
+    with factory() as db:
+        user = add_user(db)
+        documents = [_document(db, user, created_at=utc(2024, 1, day)) for day in (1, 2, 3)]
+
+    with factory() as locker:
+        # Another dispatcher holds the oldest row
+        locker.execute(
+            select(Document.id).where(Document.id == documents[0].id).with_for_update()
+        ).all()
+
+        outcome = {}
+        thread = threading.Thread(
+            target=lambda: outcome.update(ocr.process_pending_documents(batch_size=10))
+        )
+        thread.start()
+        thread.join(timeout=10)
+        assert not thread.is_alive(), "dispatcher blocked on a locked row"
+        locker.rollback()
+
+    assert outcome["dispatched"] == 2
+    with factory() as db:
+        assert _statuses(db, documents) == ["pending", "queued", "queued"]
+
+
+class FakeEngine:
+    """Yields fixed pages, running ``during`` before the given page"""
+    workers = 1
+
+    def __init__(self, pages, during=None, at_page=None):
+        self.pages, self.during, self.at_page = pages, during, at_page
+
+    def __call__(self, cache=None):
+        return self
+
+    def iter_pages(self, path, is_pdf):
+        for number, text in enumerate(self.pages, start=1):
+            if number == self.at_page:
+                self.during()
+            yield PageResult(number, text, 0.0, 0.0)
+
+
+@pytest.fixture
+def ocr_run(monkeypatch, published):
+    """Run OCR tasks without storage, search or embedding"""
+    class Storage:
+        def fget_object(self, bucket_name, object_name, path):
+            open(path, "wb").close()
+
+    monkeypatch.setattr(ocr, "get_minio_client", lambda: Storage())
+    monkeypatch.setattr(ocr, "index_document_sync", lambda db, document_id: None)
+    monkeypatch.setattr(ocr.embed_document, "delay", lambda document_id: None)
+    monkeypatch.setattr(ocr.settings, "OCR_FLUSH_PAGES", 1)
+    monkeypatch.setattr(ocr.settings, "OCR_CACHE_ENABLED", False)
+
+    def run(document, engine):
+        monkeypatch.setattr(ocr, "OCREngine", engine)
+        return ocr.process_document_ocr.run(str(document.id))
+    return run
+
+
+def test_ocr_run_completes_under_its_claim(sync_db, user, ocr_run):
+    document = _document(sync_db, user, status="queued")
+
+    result = ocr_run(document, FakeEngine(["one ", "two"]))
+
+    assert result["status"] == "completed"
+    sync_db.expire_all()
+    stored = sync_db.get(Document, document.id)
+    assert (stored.status, stored.ocr_text, stored.claim_token) == ("completed", "one two", None)
+    assert stored.extraction_metadata["ocr"]["pages"] == 2
+
+
+def test_reclaimed_run_stops_writing(sync_db, sync_session_factory, user, ocr_run):
+    document = _document(sync_db, user, status="queued")
+    tokens = []
+
+    def reclaimed_and_restarted():
+        # The lease ran out; the dispatcher reclaimed the row and a new worker started it
+        with sync_session_factory() as db:
+            db.get(Document, document.id).status = "pending"
+            db.commit()
+            tokens.append(ocr._start_processing(db, document.id))
+
+    result = ocr_run(document, FakeEngine(["one ", "two ", "three"], reclaimed_and_restarted, at_page=2))
+
+    assert result["status"] == "skipped"
+    sync_db.expire_all()
+    stored = sync_db.get(Document, document.id)
+    assert (stored.status, stored.ocr_text, stored.claim_token) == ("processing", "", tokens[0])
+
+
+def test_stale_claim_cannot_complete_or_fail_a_newer_run(sync_db, user, published):
+    document = _document(sync_db, user, status="queued")
+    stale = ocr._start_processing(sync_db, document.id)
+    sync_db.get(Document, document.id).status = "pending"
+    sync_db.commit()
+    current = ocr._start_processing(sync_db, document.id)
+
+    assert not ocr._append_ocr_text(sync_db, document.id, stale, ["late page"])
+    assert not ocr._finish_processing(sync_db, document.id, stale)
+    ocr._mark_document_failed(str(document.id), "worker died", stale)
+    assert _statuses(sync_db, [document]) == ["processing"]
+
+    assert ocr._append_ocr_text(sync_db, document.id, current, ["page"])
+    assert ocr._finish_processing(sync_db, document.id, current)
+    assert _statuses(sync_db, [document]) == ["completed"]
+    assert sync_db.get(Document, document.id).ocr_text == "page"
+
+
+def test_ocr_reuses_results_of_the_same_user_only(sync_db, user, ocr_run):
+    theirs = _document(sync_db, add_user(sync_db), status="completed")
+    theirs.content_hash, theirs.ocr_text = "a" * 64, "their text"
+    mine = _document(sync_db, user, status="queued")
+    mine.content_hash = "a" * 64
+    sync_db.commit()
+
+    result = ocr_run(mine, FakeEngine(["my text"]))
+
+    assert "pages" in result
+    sync_db.expire_all()
+    assert sync_db.get(Document, mine.id).ocr_text == "my text"
+
+    again = _document(sync_db, user, status="queued")
+    again.content_hash = "a" * 64
+    sync_db.commit()
+    result = ocr_run(again, FakeEngine(["not run"]))
+
+    assert result["message"] == "Reused OCR results of an identical document"
+    sync_db.expire_all()
+    assert sync_db.get(Document, again.id).ocr_text == "my text"
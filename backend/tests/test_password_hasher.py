@@ -0,0 +1,57 @@
+"""
+Bounded password hashing pool.
+"""
+
+import asyncio
+import threading
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app.core import metrics
+from app.core.exceptions import RateLimitError
+from app.services.password_hasher import PasswordHashingService
+
+
+@pytest.fixture
+def hasher():
+    service = PasswordHashingService(workers=1, max_queue=2)
+    yield service
+    service.shutdown()
+
+
+@pytest.fixture
+def release(hasher):
+    """Blocks the worker threads until set; always set on teardown so they can exit"""
+    event = threading.Event()
+    yield event
+    event.set()
+
+
+async def test_full_queue_rejects_new_operations(hasher, release, monkeypatch):
+    # One operation running and two waiting fill a one-worker pool with max_queue=2
+    admitted = [asyncio.create_task(hasher._run(release.wait)) for _ in range(3)]
+    await asyncio.sleep(0)
+    assert (hasher.stats()["in_flight"], hasher.queue_depth) == (3, 2)
+
+    with pytest.raises(RateLimitError):
+        await hasher._run(release.wait)
+    with pytest.raises(RateLimitError):
+        await hasher.verify("password", "hash")
+
+    monkeypatch.setattr(metrics, "password_hasher", hasher)
+    assert REGISTRY.get_sample_value("password_hash_rejected_total") == 2
+
+    release.set()
+    assert await asyncio.gather(*admitted) == [True, True, True]
+    stats = hasher.stats()
+    assert (stats["completed"], stats["rejected"], stats["in_flight"]) == (3, 2, 0)
+    assert stats["max_wait_seconds"] >= stats["avg_wait_seconds"] > 0
+
+
+async def test_hashes_verify_off_the_event_loop(hasher):
+    hashed = await hasher.hash("correct horse battery")
+
+    assert await hasher.verify("correct horse battery", hashed)
+    assert not await hasher.verify("wrong password", hashed)
+    assert hasher.stats()["completed"] == 3
@@ -0,0 +1,111 @@
+"""
+Opt-in request profiling.
+"""
+
+import logging
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app.core import profiling
+from app.core.profiling import (
+    ProfilingMiddleware,
+    StackSampler,
+    create_profile_token,
+    verify_profile_token,
+)
+
+
+def busy_handler_work(seconds: float = 0.05) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+@pytest.fixture
+def profiled(monkeypatch, tmp_path):
+    monkeypatch.setattr(profiling.settings, "PROFILING_OUTPUT_DIR", str(tmp_path / "profiles"))
+    monkeypatch.setattr(profiling.settings, "PROFILING_INTERVAL", 0.001)
+
+    api = FastAPI()
+
+    @api.get("/work/{item_id}")
+    async def work(item_id: int):
+        busy_handler_work()
+        return {"item_id": item_id}
+
+    api.add_middleware(ProfilingMiddleware)
+    return AsyncClient(transport=ASGITransport(app=api), base_url="http://test")
+
+
+async def test_profiled_request_stores_folded_stacks(profiled, tmp_path):
+    response = await profiled.get("/work/1", headers={"X-Profile": create_profile_token("/work/1")})
+
+    assert response.status_code == 200
+    profile_id = response.headers["X-Profile-Id"]
+    stored = tmp_path / "profiles" / "work_item_id" / f"{profile_id}.folded"
+    lines = stored.read_text().splitlines()
+    assert lines
+    assert any("busy_handler_work" in line for line in lines)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+
+
+@pytest.mark.parametrize("token", [
+    create_profile_token("/work/2"),  # Signed for another path
+    create_profile_token("/work/1", ttl=-1),
+    "123.not-a-signature",
+])
+async def test_invalid_tokens_are_not_profiled(profiled, tmp_path, token):
+    response = await profiled.get("/work/1", headers={"X-Profile": token})
+
+    assert response.status_code == 200
+    assert "X-Profile-Id" not in response.headers
+    assert not (tmp_path / "profiles").exists()
+
+
+async def test_unwritable_output_dir_does_not_fail_the_request(profiled, tmp_path, monkeypatch, caplog):
+    blocker = tmp_path / "not-a-directory"
+    blocker.write_text("")
+    monkeypatch.setattr(profiling.settings, "PROFILING_OUTPUT_DIR", str(blocker))
+
+    with caplog.at_level(logging.WARNING, logger=profiling.__name__):
+        response = await profiled.get("/work/1", headers={"X-Profile": create_profile_token("/work/1")})
+
+    assert response.status_code == 200
+    assert response.json() == {"item_id": 1}
+    assert "Failed to store profile" in caplog.text
+
+
+def test_token_is_bound_to_path_and_expiry():
+    path = "/api/v1/dashboard/timeline"
+    token = create_profile_token(path)
+
+    assert verify_profile_token(token, path)
+    assert not verify_profile_token(token, "/api/v1/dashboard/summary")
+    assert not verify_profile_token(create_profile_token(path, ttl=-1), path)
+
+
+def test_sampler_counts_stacks_of_the_target_thread():
+    started = threading.Event()
+    done = threading.Event()
+
+    def target():
+        started.set()
+        while not done.is_set():
+            busy_handler_work(0.001)
+
+    thread = threading.Thread(target=target)
+    thread.start()
+    started.wait()
+    sampler = StackSampler(thread.ident, interval=0.001, max_seconds=5)
+    sampler.start()
+    time.sleep(0.05)
+    sampler.stop()
+    done.set()
+    thread.join()
+
+    assert sum(sampler.samples.values()) > 0
+    assert all(stack.split(";")[-1].startswith(("busy_handler_work", "target")) for stack in sampler.samples)
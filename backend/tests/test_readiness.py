@@ -0,0 +1,71 @@
+"""
+Cached, concurrent dependency readiness probes.
+"""
+
+import asyncio
+
+import pytest
+
+from app.services import readiness
+from app.services.readiness import ReadinessChecker
+
+
+@pytest.fixture
+def probes(monkeypatch):
+    """Replace the real probes with stubs that count their calls"""
+    monkeypatch.setattr(readiness.settings, "READINESS_PROBE_TIMEOUT", 0.05)
+    calls = {"ok": 0, "hanging": 0, "failing": 0}
+
+    async def ok():
+        calls["ok"] += 1
+        await asyncio.sleep(0.01)
+
+    async def hanging():
+        calls["hanging"] += 1
+        await asyncio.sleep(10)
+
+    async def failing():
+        calls["failing"] += 1
+        raise ConnectionError("Connection refused")
+
+    monkeypatch.setattr(readiness, "PROBES", {"ok": ok, "hanging": hanging, "failing": failing})
+    return calls
+
+
+async def test_timeouts_and_errors_are_reported_per_probe(probes):
+    result = await ReadinessChecker(cache_seconds=60).check()
+
+    checks = result["checks"]
+    assert result["ready"] is False
+    assert (checks["ok"]["status"], checks["ok"]["error"]) == ("ok", None)
+    assert checks["hanging"]["status"] == "timeout"
+    assert checks["hanging"]["latency_ms"] < 1000
+    assert (checks["failing"]["status"], checks["failing"]["error"]) == ("error", "Connection refused")
+
+
+async def test_all_probes_passing_is_ready(probes, monkeypatch):
+    monkeypatch.setattr(readiness, "PROBES", {"ok": readiness.PROBES["ok"]})
+
+    result = await ReadinessChecker(cache_seconds=60).check()
+
+    assert result["ready"] is True
+    assert list(result["checks"]) == ["ok"]
+
+
+async def test_concurrent_callers_share_one_round(probes):
+    checker = ReadinessChecker(cache_seconds=60)
+
+    results = await asyncio.gather(*(checker.check() for _ in range(10)))
+
+    assert all(result is results[0] for result in results)
+    assert probes == {"ok": 1, "hanging": 1, "failing": 1}
+
+
+async def test_result_is_cached_until_it_expires(probes):
+    checker = ReadinessChecker(cache_seconds=60)
+    first = await checker.check()
+    assert await checker.check() is first
+
+    checker._expires_at = 0.0
+    assert await checker.check() is not first
+    assert probes == {"ok": 2, "hanging": 2, "failing": 2}
@@ -0,0 +1,186 @@
+"""
+Streaming PDF and CSV health reports.
+"""
+
+import csv
+import io
+import re
+import uuid
+import zlib
+from datetime import date
+
+import pytest
+
+from app.models.lab_result import LabResult
+from app.models.medical_visit import MedicalVisit
+from app.models.medication import Medication
+from app.services import reports
+from app.services.reports import CSVReportWriter, StreamingPDFWriter, render_report
+from app.tasks import reports as report_tasks
+from tests.conftest import utc
+
+LAB_RESULTS = 300
+
+
+@pytest.fixture
+def history(sync_db, profile):
+    sync_db.add(MedicalVisit(
+        user_id=profile.user_id, profile_id=profile.id, visit_date=utc(2024, 1, 5),
+        visit_type="office", provider_name="Dr. Lee", reason="Annual (routine) checkup",
+        diagnosis="Hypertension",
+    ))
+    sync_db.add_all(
+        LabResult(
+            profile_id=profile.id, test_name="Glucose", value=80.0 + i % 40, unit="mg/dL",
+            reference_low=70.0, reference_high=99.0, result_date=utc(2023, 1, 1 + i % 28, i % 24),
+        )
+        for i in range(LAB_RESULTS)
+    )
+    sync_db.add(Medication(
+        profile_id=profile.id, name="Lisinopril", dosage="10 mg", start_date=date(2024, 1, 5),
+        is_active=True, prescribed_by="Dr. Lee",
+    ))
+    sync_db.commit()
+
+
+class Sink:
+    """Collects what a report writer emits"""
+
+    def __init__(self):
+        self.parts = []
+
+    def __call__(self, data: bytes) -> None:
+        self.parts.append(data)
+
+    @property
+    def data(self) -> bytes:
+        return b"".join(self.parts)
+
+
+def test_csv_report_has_a_block_per_section(sync_db, profile, history, monkeypatch):
+    monkeypatch.setattr(CSVReportWriter, "flush_bytes", 1024)
+    sink = Sink()
+
+    rows = render_report(sync_db, profile, "full", CSVReportWriter(sink))
+
+    assert rows == LAB_RESULTS + 2
+    assert len(sink.parts) > 1  # Flushed as it goes, not at the end
+    lines = list(csv.reader(io.StringIO(sink.data.decode())))
+    assert lines[0] == ["Health report: Alex Doe"]
+    titles = [
+        line[0] for line, following in zip(lines, lines[1:])
+        if following and following[0] in ("Date", "Name")
+    ]
+    assert titles == ["Medical visits", "Lab results", "Medications"]
+    assert ["2024-01-05", "office", "Dr. Lee", "", "Annual (routine) checkup", "Hypertension"] in lines
+    assert ["Lisinopril", "10 mg", "", "2024-01-05", "", "yes", "Dr. Lee"] in lines
+
+
+def test_pdf_report_is_a_valid_paged_document(sync_db, profile, history):
+    sink = Sink()
+
+    rows = render_report(sync_db, profile, "lab_results", StreamingPDFWriter(sink))
+
+    assert rows == LAB_RESULTS
+    data = sink.data
+    assert data.startswith(b"%PDF-1.4") and data.endswith(b"%%EOF\n")
+    assert len(sink.parts) > 10  # Objects are written as pages fill up
+
+    # Every cross-reference entry points at its object
+    xref_offset = int(re.search(rb"startxref\n(\d+)\n", data).group(1))
+    assert data[xref_offset:].startswith(b"xref\n")
+    entries = re.findall(rb"(\d{10}) 00000 n ", data[xref_offset:])
+    for number, offset in enumerate(entries, start=1):
+        assert data[int(offset):].startswith(f"{number} 0 obj".encode())
+
+    pages = int(re.search(rb"/Type /Pages /Kids \[[^\]]*\] /Count (\d+)", data).group(1))
+    assert pages > 1
+    streams = re.findall(rb"stream\n(.*?)\nendstream", data, re.S)
+    text = b"".join(zlib.decompress(stream) for stream in streams)
+    assert text.count(b"(Glucose)") == LAB_RESULTS
+    assert f"(Page {pages})".encode() in text
+
+
+def test_long_values_are_truncated_to_their_column(sync_db, profile):
+    sync_db.add(Medication(profile_id=profile.id, name="X" * 300, is_active=True))
+    sync_db.commit()
+    sink = Sink()
+
+    render_report(sync_db, profile, "medications", StreamingPDFWriter(sink))
+
+    text = b"".join(
+        zlib.decompress(stream) for stream in re.findall(rb"stream\n(.*?)\nendstream", sink.data, re.S)
+    )
+    assert re.search(rb"\(X+\.\.\.\)", text)
+    assert b"X" * 300 not in text
+
+
+class FakeUpload:
+    """Multipart upload that keeps the parts in memory"""
+    uploads = {}
+
+    def __init__(self, object_name, content_type):
+        self.object_name = object_name
+        self.content_type = content_type
+        self.data = bytearray()
+        self.state = "open"
+
+    def write(self, data: bytes) -> None:
+        self.data += data
+
+    def complete(self) -> None:
+        self.state = "completed"
+        FakeUpload.uploads[self.object_name] = self
+
+    def abort(self) -> None:
+        self.state = "aborted"
+        FakeUpload.uploads[self.object_name] = self
+
+
+@pytest.fixture
+def storage(monkeypatch, sync_session_factory):
+    FakeUpload.uploads = {}
+    monkeypatch.setattr(report_tasks, "SyncSessionLocal", sync_session_factory)
+    monkeypatch.setattr(reports, "SyncMultipartObjectWriter", FakeUpload)
+    monkeypatch.setattr(
+        reports, "presigned_download_url",
+        lambda object_name, expires, filename: f"https://storage.test/{object_name}?filename={filename}",
+    )
+    return FakeUpload.uploads
+
+
+@pytest.mark.parametrize("output_format, content_type", [("pdf", "application/pdf"), ("csv", "text/csv")])
+def test_report_task_uploads_and_signs_the_report(profile, history, storage, output_format, content_type):
+    result = report_tasks.generate_health_report.run(str(profile.id), "full", output_format)
+
+    assert result["status"] == "completed", result
+    upload = storage[result["object_name"]]
+    assert (upload.state, upload.content_type) == ("completed", content_type)
+    assert result["object_name"].startswith(f"reports/{profile.user_id}/{profile.id}/")
+    assert result["size"] == len(upload.data)
+    assert result["rows"] == LAB_RESULTS + 2
+    assert result["url"].startswith(f"https://storage.test/{result['object_name']}")
+
+
+def test_report_task_aborts_the_upload_on_failure(profile, history, storage, monkeypatch):
+    def fail(*args):
+        raise RuntimeError("renderer crashed")
+    monkeypatch.setattr(CSVReportWriter, "row", fail)
+
+    result = report_tasks.generate_health_report.run(str(profile.id), "full", "csv")
+
+    assert result == {"status": "failed", "profile_id": str(profile.id), "error": "renderer crashed"}
+    [upload] = storage.values()
+    assert upload.state == "aborted"
+
+
+@pytest.mark.parametrize("args", [("full", "docx"), ("billing", "pdf")])
+def test_report_task_rejects_unknown_types_and_formats(profile, storage, args):
+    result = report_tasks.generate_health_report.run(str(profile.id), *args)
+    assert result["status"] == "failed"
+    assert storage == {}
+
+
+def test_report_task_reports_a_missing_profile(storage):
+    result = report_tasks.generate_health_report.run(str(uuid.uuid4()), "full", "pdf")
+    assert result["error"] == "Profile not found"
@@ -0,0 +1,86 @@
+"""
+Full-text document search; needs Postgres (tsvector, pg_trgm).
+"""
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.document import Document
+from app.services.search import index_document_sync, search_documents
+from tests.conftest import add_profile, add_user, utc
+
+pytestmark = pytest.mark.postgres
+
+DOCUMENTS = [
+    ("Lipid panel", "Total cholesterol 212 mg/dL, LDL cholesterol 140 mg/dL", utc(2024, 1, 1)),
+    ("Annual physical", "Blood pressure normal. Discussed cholesterol and diet.", utc(2024, 2, 1)),
+    ("Chest X-ray", "No acute cardiopulmonary findings", utc(2024, 3, 1)),
+]
+
+
+@pytest.fixture
+def library(postgres_engine):
+    """A user with indexed documents, and another user's matching document"""
+    with sessionmaker(postgres_engine, expire_on_commit=False)() as db:
+        user, stranger = add_user(db), add_user(db)
+        profile = add_profile(db, user)
+        entries = [(user, profile, *entry) for entry in DOCUMENTS]
+        entries.append((stranger, None, "Cholesterol results", "cholesterol cholesterol", utc(2024, 4, 1)))
+
+        documents = []
+        for owner, owner_profile, title, text, created_at in entries:
+            document = Document(
+                user_id=owner.id, profile_id=owner_profile.id if owner_profile else None,
+                title=title, document_type="lab_report", filename="doc.pdf",
+                ocr_text=text, status="completed", created_at=created_at,
+            )
+            db.add(document)
+            db.commit()
+            index_document_sync(db, document.id)
+            documents.append(document)
+        return user, profile, documents
+
+
+@pytest.fixture
+async def db(postgres_engine):
+    url = postgres_engine.url.set(drivername="postgresql+asyncpg")
+    engine = create_async_engine(url)
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        yield session
+    await engine.dispose()
+
+
+async def test_ranks_matches_and_highlights_snippets(db, library):
+    user, _, documents = library
+
+    result = await search_documents(db, user.id, "cholesterol")
+
+    assert [row["id"] for row in result["results"]] == [str(documents[0].id), str(documents[1].id)]
+    assert result["results"][0]["rank"] > result["results"][1]["rank"]
+    assert "<mark>cholesterol</mark>" in result["results"][0]["snippet"]
+    assert result["corrected_query"] is None
+
+
+async def test_web_search_syntax_and_pagination(db, library):
+    user, profile, documents = library
+
+    excluded = await search_documents(db, user.id, "cholesterol -LDL", profile_id=profile.id)
+    assert [row["id"] for row in excluded["results"]] == [str(documents[1].id)]
+
+    page = await search_documents(db, user.id, "cholesterol or x-ray", limit=2)
+    assert page["has_more"] is True
+    rest = await search_documents(db, user.id, "cholesterol or x-ray", limit=2, offset=2)
+    assert rest["has_more"] is False
+    found = [row["id"] for row in page["results"] + rest["results"]]
+    assert sorted(found) == sorted(str(document.id) for document in documents[:3])
+
+
+async def test_misspelt_query_is_corrected_from_own_vocabulary(db, library):
+    user, _, documents = library
+
+    result = await search_documents(db, user.id, "cholestrol")
+
+    assert result["corrected_query"] == "cholesterol"
+    assert str(documents[3].id) not in [row["id"] for row in result["results"]]
+    assert len(result["results"]) == 2
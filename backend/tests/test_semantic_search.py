@@ -0,0 +1,152 @@
+"""
+Document embeddings, the LSH vector index and semantic search.
+"""
+
+import numpy as np
+import pytest
+from sqlalchemy import update
+
+from app.core.config import settings
+from app.models.document import Document, DocumentChunk
+from app.services.embeddings import HashingEmbedder, chunk_text
+from app.services.vector_index import LSHIndex
+from app.tasks import ai_processing
+
+SEMANTIC_SEARCH = f"{settings.API_V1_STR}/documents/semantic-search"
+
+TEXTS = {
+    "diabetes": (
+        "Endocrinology follow up. Type 2 diabetes mellitus with rising HbA1c of 7.9 percent. "
+        "Metformin increased to 1000 mg twice daily; fasting glucose log reviewed."
+    ),
+    "cholesterol": (
+        "Lipid panel: LDL cholesterol 190 mg/dL, HDL 38 mg/dL, triglycerides elevated. "
+        "Started atorvastatin 40 mg nightly and advised a low saturated fat diet."
+    ),
+    "fracture": (
+        "Emergency department visit for a fall. X-ray shows a distal radius fracture of the "
+        "left wrist; cast applied and orthopaedic review booked in two weeks."
+    ),
+}
+
+
+@pytest.fixture
+def embedded(monkeypatch, sync_db, sync_session_factory, profile, other_profile):
+    """Completed documents embedded through the Celery task, keyed by topic"""
+    monkeypatch.setattr(ai_processing, "SyncSessionLocal", sync_session_factory)
+    documents = {}
+    for topic, text in TEXTS.items():
+        documents[topic] = Document(
+            user_id=profile.user_id, profile_id=profile.id, title=topic.title(),
+            document_type="clinical_note", filename=f"{topic}.pdf", status="completed", ocr_text=text,
+        )
+    # Another profile of the same user with a closely matching document
+    documents["other"] = Document(
+        user_id=profile.user_id, profile_id=other_profile.id, title="Other", document_type="clinical_note",
+        filename="other.pdf", status="completed", ocr_text=TEXTS["diabetes"],
+    )
+    sync_db.add_all(documents.values())
+    sync_db.commit()
+
+    for document in documents.values():
+        result = ai_processing.embed_document.run(str(document.id))
+        assert result == {"status": "completed", "document_id": str(document.id), "chunks": 1}
+    return documents
+
+
+async def _search(client, q, **params):
+    response = await client.get(SEMANTIC_SEARCH, params={"q": q, **params})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_hashing_embedder_is_deterministic_and_normalised():
+    embedder = HashingEmbedder(dimensions=256)
+    first, second = embedder.embed(["metformin dose increased", "metformin dose increased"])
+
+    assert np.array_equal(first, second)
+    assert np.linalg.norm(first) == pytest.approx(1.0)
+
+
+def test_chunks_overlap_and_cover_the_text():
+    text = " ".join(f"word{i}" for i in range(400))
+    chunks = chunk_text(text, 500, 100)
+
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 500 for chunk in chunks)
+    assert chunks[0].split()[0] == "word0" and chunks[-1].split()[-1] == "word399"
+
+
+def test_similar_vectors_share_buckets():
+    rng = np.random.default_rng(1)
+    index = LSHIndex(dimensions=64, tables=8, bits=8)
+    base = rng.standard_normal(64).astype(np.float32)
+    near = base + 0.1 * rng.standard_normal(64).astype(np.float32)
+    far = rng.standard_normal(64).astype(np.float32)
+
+    buckets = index.buckets(np.stack([base, near, far]))
+    probes = set(index.probes(base))
+
+    assert len(probes) == 8 * 9
+    assert len(probes & set(buckets[1])) > len(probes & set(buckets[2]))
+
+
+QUERIES = {
+    "diabetes": "Type 2 diabetes mellitus with rising HbA1c; metformin increased to 1000 mg twice daily",
+    "cholesterol": "LDL cholesterol 190 mg/dL; started atorvastatin 40 mg nightly, low saturated fat diet",
+    "fracture": "X-ray shows a distal radius fracture of the left wrist after a fall",
+}
+
+
+# The hashing embedder only matches shared words, so queries restate the note
+@pytest.mark.parametrize("topic", list(QUERIES))
+async def test_semantic_search_ranks_the_matching_document_first(client, profile, embedded, topic):
+    result = await _search(client, QUERIES[topic], profile_id=str(profile.id))
+
+    assert result["results"][0]["document_id"] == str(embedded[topic].id)
+    assert result["results"][0]["title"] == topic.title()
+    scores = [item["score"] for item in result["results"]]
+    assert scores == sorted(scores, reverse=True)
+
+
+async def test_candidates_are_filtered_before_the_limit(client, profile, embedded, monkeypatch):
+    # The other profile's identical chunk must not take the only candidate slot
+    monkeypatch.setattr(settings, "VECTOR_SEARCH_CANDIDATES", 1)
+
+    result = await _search(client, QUERIES["diabetes"], profile_id=str(profile.id))
+
+    assert result["candidates"] == 1
+    assert [item["document_id"] for item in result["results"]] == [str(embedded["diabetes"].id)]
+
+
+async def test_semantic_search_filters_profile_and_embedding_space(client, db, profile, embedded):
+    query = QUERIES["diabetes"]
+
+    everything = await _search(client, query)
+    assert {str(embedded["diabetes"].id), str(embedded["other"].id)} <= {
+        item["document_id"] for item in everything["results"]
+    }
+    in_profile = await _search(client, query, profile_id=str(profile.id))
+    assert str(embedded["other"].id) not in {item["document_id"] for item in in_profile["results"]}
+
+    # Chunks embedded under other settings are ignored
+    await db.execute(
+        update(DocumentChunk)
+        .where(DocumentChunk.document_id == embedded["diabetes"].id)
+        .values(space="retired-model")
+    )
+    await db.commit()
+    in_profile = await _search(client, query, profile_id=str(profile.id))
+    assert str(embedded["diabetes"].id) not in {item["document_id"] for item in in_profile["results"]}
+
+
+def test_embedding_skips_documents_without_ocr(monkeypatch, sync_db, sync_session_factory, profile):
+    monkeypatch.setattr(ai_processing, "SyncSessionLocal", sync_session_factory)
+    document = Document(
+        user_id=profile.user_id, profile_id=profile.id, title="Pending", document_type="other",
+        filename="pending.pdf", status="queued",
+    )
+    sync_db.add(document)
+    sync_db.commit()
+
+    assert ai_processing.embed_document.run(str(document.id))["status"] == "skipped"
@@ -0,0 +1,103 @@
+"""
+Medical timeline streaming and keyset pagination.
+"""
+
+import json
+
+import pytest
+
+from app.api import dashboard as dashboard_api
+from app.core.config import settings
+from app.models.document import Document
+from app.models.lab_result import LabResult
+from app.models.medical_visit import MedicalVisit
+from app.models.medication import Medication
+from tests.conftest import utc
+
+TIMELINE = f"{settings.API_V1_STR}/dashboard/timeline"
+
+
+@pytest.fixture
+def history(sync_db, profile, other_profile):
+    """Records of every type, several sharing a timestamp"""
+    same_day = utc(2024, 2, 1, 9)
+    records = [
+        MedicalVisit(
+            user_id=profile.user_id, profile_id=profile.id, visit_date=same_day, reason="Checkup",
+        ),
+        MedicalVisit(
+            user_id=profile.user_id, profile_id=profile.id, visit_date=utc(2023, 5, 4), reason="Flu",
+        ),
+        Document(
+            user_id=profile.user_id, profile_id=profile.id, title="Referral", document_type="letter",
+            filename="referral.pdf", document_date=same_day, created_at=utc(2024, 3, 1),
+        ),
+        Document(
+            user_id=profile.user_id, profile_id=profile.id, title="Scan", document_type="imaging",
+            filename="scan.pdf", created_at=utc(2023, 11, 20),
+        ),
+        Medication(profile_id=profile.id, name="Metformin", created_at=same_day),
+        Medication(profile_id=profile.id, name="Vitamin D", created_at=utc(2022, 1, 1)),
+        MedicalVisit(
+            user_id=other_profile.user_id, profile_id=other_profile.id, visit_date=same_day, reason="Other",
+        ),
+    ]
+    records += [
+        LabResult(
+            profile_id=profile.id, test_name="HbA1c", value=6.0 + i / 10, unit="%",
+            result_date=same_day if i < 3 else utc(2023, 1, i),
+        )
+        for i in range(8)
+    ]
+    sync_db.add_all(records)
+    sync_db.commit()
+    return records
+
+
+@pytest.fixture(autouse=True)
+def timeline_sessions(monkeypatch, session_factory):
+    # The stream opens its own read session after the request's is closed
+    monkeypatch.setattr(dashboard_api, "read_session", session_factory)
+
+
+async def _page(client, profile, limit, cursor=None):
+    params = {"profile_id": str(profile.id), "limit": limit}
+    if cursor:
+        params["cursor"] = cursor
+    response = await client.get(TIMELINE, params=params)
+    assert response.status_code == 200
+    *events, page = [json.loads(line) for line in response.text.splitlines()]
+    assert page["type"] == "page" and page["count"] == len(events)
+    return events, page["next_cursor"]
+
+
+async def test_cursor_pages_continue_the_timeline_exactly(client, profile, history):
+    everything, cursor = await _page(client, profile, limit=1000)
+    assert cursor is None
+    assert len(everything) == 14  # The other profile's visit is left out
+    timestamps = [event["timestamp"] for event in everything]
+    assert timestamps == sorted(timestamps, reverse=True)
+
+    for limit in (1, 3, 5):
+        paged, cursor = [], None
+        while True:
+            events, cursor = await _page(client, profile, limit, cursor)
+            paged.extend(events)
+            if cursor is None:
+                break
+        assert [event["id"] for event in paged] == [event["id"] for event in everything]
+
+
+async def test_timeline_filters_event_types(client, profile, history):
+    response = await client.get(
+        TIMELINE, params={"profile_id": str(profile.id), "types": ["visit", "medication"]}
+    )
+    events = [json.loads(line) for line in response.text.splitlines()][:-1]
+    assert {event["type"] for event in events} == {"visit", "medication"}
+    assert len(events) == 4
+
+
+async def test_timeline_rejects_unknown_types_and_cursors(client, profile):
+    for params in ({"types": ["invoice"]}, {"cursor": "not-a-cursor"}):
+        response = await client.get(TIMELINE, params={"profile_id": str(profile.id), **params})
+        assert response.status_code == 422
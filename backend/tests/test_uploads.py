@@ -0,0 +1,212 @@
+"""
+Streamed document upload and content-addressed storage.
+"""
+
+import hashlib
+import uuid
+
+import pytest
+from sqlalchemy import select
+
+from app.api import documents
+from app.models.document import Document, DocumentBlob
+from app.services import storage
+from app.services.storage import SyncMultipartObjectWriter
+
+PDF = b"%PDF-1.4\n" + b"1 0 obj << /Type /Catalog >> endobj\n" * 200 + b"%%EOF\n"
+
+
+class FakeMinio:
+    """In-memory stand-in for the MinIO client"""
+
+    def __init__(self):
+        self.objects = {}
+        self._uploads = {}
+
+    def put_object(self, bucket_name, object_name, data, length, content_type=None):
+        self.objects[object_name] = data.read(length)
+
+    def remove_object(self, bucket_name, object_name):
+        self.objects.pop(object_name, None)
+
+    def _create_multipart_upload(self, bucket_name, object_name, headers):
+        upload_id = str(uuid.uuid4())
+        self._uploads[upload_id] = []
+        return upload_id
+
+    def _upload_part(self, bucket_name, object_name, data, headers, upload_id, part_number):
+        self._uploads[upload_id].append(data)
+        return f"etag-{part_number}"
+
+    def _complete_multipart_upload(self, bucket_name, object_name, upload_id, parts):
+        self.objects[object_name] = b"".join(self._uploads.pop(upload_id))
+
+    def _abort_multipart_upload(self, bucket_name, object_name, upload_id):
+        self._uploads.pop(upload_id)
+
+
+@pytest.fixture
+def minio(monkeypatch):
+    client = FakeMinio()
+    monkeypatch.setattr(storage, "get_minio_client", lambda: client)
+    return client
+
+
+@pytest.fixture
+def enqueued(monkeypatch):
+    """Document ids sent to OCR; the search index needs Postgres"""
+    calls = []
+
+    async def index_document(db, document_id):
+        pass
+
+    monkeypatch.setattr(documents, "index_document", index_document)
+    monkeypatch.setattr(documents.process_document_ocr, "delay", calls.append)
+    monkeypatch.setattr(documents.embed_document, "delay", lambda document_id: None)
+    return calls
+
+
+async def upload(client, profile, content=PDF, filename="scan.pdf"):
+    return await client.post(
+        "/api/v1/documents/upload",
+        files={"file": (filename, content, "application/pdf")},
+        data={"title": "Blood panel", "document_type": "lab_report", "profile_id": str(profile.id)},
+    )
+
+
+async def test_upload_streams_file_to_storage(client, db, profile, minio, enqueued):
+    response = await upload(client, profile)
+
+    assert response.status_code == 201
+    body = response.json()
+    assert body["status"] == "queued"
+    assert body["deduplicated"] is False
+    assert body["content_hash"] == hashlib.sha256(PDF).hexdigest()
+    assert enqueued == [body["id"]]
+
+    document = await db.get(Document, uuid.UUID(body["id"]))
+    assert document.title == "Blood panel"
+    assert document.profile_id == profile.id
+    assert document.claimed_at is not None
+    assert minio.objects[document.file_path] == PDF
+
+
+@pytest.mark.parametrize("profile_id", ["other", str(uuid.uuid4()), "not-a-uuid"])
+async def test_rejects_profiles_of_other_users(
+    client, db, profile, other_profile, minio, enqueued, profile_id
+):
+    if profile_id == "other":
+        profile_id = str(other_profile.id)
+
+    response = await client.post(
+        "/api/v1/documents/upload",
+        files={"file": ("scan.pdf", PDF, "application/pdf")},
+        data={"profile_id": profile_id},
+    )
+
+    assert response.status_code == 404
+    assert minio.objects == {}
+    assert enqueued == []
+    assert (await db.execute(select(Document))).scalar_one_or_none() is None
+    assert (await db.execute(select(DocumentBlob))).scalar_one_or_none() is None
+
+
+async def test_identical_upload_reuses_stored_content(client, db, profile, minio, enqueued):
+    first = (await upload(client, profile)).json()
+    document = await db.get(Document, uuid.UUID(first["id"]))
+    document.status, document.ocr_text = "completed", "Glucose 92 mg/dL"
+    await db.commit()
+    object_name = document.file_path
+
+    second = (await upload(client, profile, filename="copy.pdf")).json()
+
+    assert second["deduplicated"] is True
+    assert second["status"] == "completed"
+    assert enqueued == [first["id"]]
+    assert list(minio.objects) == [object_name]
+
+    copy = await db.get(Document, uuid.UUID(second["id"]))
+    assert copy.file_path == object_name
+    assert copy.ocr_text == "Glucose 92 mg/dL"
+    blob = (await db.execute(
+        select(DocumentBlob).execution_options(populate_existing=True)
+    )).scalar_one()
+    assert blob.ref_count == 2
+
+
+async def test_other_users_copies_share_storage_but_not_results(
+    client, db, profile, other_profile, minio, enqueued
+):
+    theirs = (await upload(client, profile)).json()
+    document = await db.get(Document, uuid.UUID(theirs["id"]))
+    document.user_id, document.profile_id = other_profile.user_id, other_profile.id
+    document.status, document.ocr_text = "completed", "Glucose 92 mg/dL"
+    await db.commit()
+
+    mine = (await upload(client, profile)).json()
+
+    # Nothing reveals that someone else uploaded the same file
+    assert mine["deduplicated"] is False
+    assert mine["status"] == "queued"
+    assert enqueued == [theirs["id"], mine["id"]]
+    assert len(minio.objects) == 1
+    blob = (await db.execute(
+        select(DocumentBlob).execution_options(populate_existing=True)
+    )).scalar_one()
+    assert blob.ref_count == 2
+
+
+async def test_deleting_the_last_copy_removes_the_object(client, db, profile, minio, enqueued):
+    first = (await upload(client, profile)).json()
+    second = (await upload(client, profile)).json()
+    assert len(minio.objects) == 1
+
+    assert (await client.delete(f"/api/v1/documents/{first['id']}")).status_code == 200
+    assert len(minio.objects) == 1
+
+    assert (await client.delete(f"/api/v1/documents/{second['id']}")).status_code == 200
+    assert minio.objects == {}
+    assert (await db.execute(select(DocumentBlob))).scalar_one_or_none() is None
+
+
+async def test_failed_enqueue_leaves_document_for_dispatcher(client, db, profile, minio, monkeypatch):
+    def unavailable(document_id):
+        raise ConnectionError("broker unavailable")
+
+    async def index_document(db, document_id):
+        pass
+
+    monkeypatch.setattr(documents, "index_document", index_document)
+    monkeypatch.setattr(documents.process_document_ocr, "delay", unavailable)
+
+    response = await upload(client, profile)
+
+    assert response.status_code == 201
+    assert response.json()["status"] == "pending"
+
+
+@pytest.mark.parametrize("content,filename", [
+    (b"MZ\x90\x00" + b"\x00" * 64, "tool.pdf"),
+    (b"\x89PNG\r\n\x1a\n" + b"\x00" * 64, "scan.pdf"),
+])
+async def test_rejects_files_that_are_not_what_they_claim(
+    client, db, profile, minio, enqueued, content, filename
+):
+    response = await upload(client, profile, content=content, filename=filename)
+
+    assert response.status_code == 422
+    assert minio.objects == {}
+    assert enqueued == []
+    assert (await db.execute(select(Document))).scalar_one_or_none() is None
+
+
+def test_writer_uploads_full_parts_as_they_fill(minio):
+    writer = SyncMultipartObjectWriter("large.pdf", part_size=1024)
+    for offset in range(0, len(PDF), 300):
+        writer.write(PDF[offset:offset + 300])
+        assert writer.buffered < 1024
+
+    writer.complete()
+
+    assert minio.objects["large.pdf"] == PDF
+    assert minio._uploads == {}